@@ -122,12 +122,24 @@ Trace-driven workload
     * n_warmup: number of warmup requests
     * n_measured: number of measured requests
 
+Link or node failures interleaved with the requests of another workload
+ * name: FAILURE
+ * args:
+    * workload: the workload issuing requests, with its name and args
+    * failure_rate: mean rate of failures per second
+    * repair_time: mean time to repair a failed link or node
+    * target: 'link' (default) or 'node'
+    * seed: seed of the failure process
+
 
 content_placement
 -----------------
 Uniform (content uniformly distributed among servers)
  * name: UNIFORM 
- * args: None 
+ * args:
+    * seed: seed of the placement (optional)
+    * catalog: 'array' (default) stores the source of each content in an
+      array, 'hash' computes it from a hash of the content without storing it
 
 
 cache_placement
@@ -142,6 +154,10 @@ cache_placement
        * network_cache: overall network cache (in number of entries) as fraction of content catalogue 
     * For CONSOLIDATED
        * spread: The fraction of top centrality nodes on which caches are deployed (optional, default: 0.5)
+ * roles (optional): dictionary of weights of the cache size of nodes by role
+   (e.g. edge, aggregation, core), keeping the overall network cache
+ * nodes (optional): dictionary of weights of the cache size of given nodes,
+   overriding the weight of their role
 
 
 strategy
@@ -165,6 +181,13 @@ strategy
     * For HR_HYBRID_AM
        * max_stretch: float, optional, default=0.2.
          The max detour stretch for selecting multicast 
+    * For all HR_* strategies
+       * mapping: 'modulo' (default), 'weighted' or 'consistent'. The mapping
+         of contents to caches. 'weighted' makes the share of contents of
+         each cache proportional to its size, 'consistent' uses a consistent
+         hashing ring
+       * vnodes: int, optional, default=100. The number of virtual nodes of
+         each cache on the ring, if mapping is 'consistent'
 
 
 cache_policy
@@ -176,9 +199,53 @@ cache_policy
     * NULL  -> No cache
     * RAND  -> Random eviction
     * FIFO  -> First In First Out
+    * CLOCK -> CLOCK (second chance)
+    * CLOCK_PRO -> CLOCK-Pro
+    * BYTE_LRU  -> Least Recently Used with capacity in bytes
+    * BYTE_FIFO -> First In First Out with capacity in bytes
+    * GDSF  -> Greedy Dual-Size Frequency (capacity in bytes)
+    * SAMPLED -> Evict lowest-priority item among k random samples
+    * LRU_K -> LRU-K
+    * 2Q    -> 2Q
  * args:
     * For SLRU:
        * segments: int, optional, default=2. Number of segments 
+    * For SAMPLED:
+       * k: int, optional, default=5. Number of items sampled on eviction
+       * priority: str, optional, default='HYPERBOLIC'. HYPERBOLIC, LRU or LFU
+    * For LRU_K:
+       * k: int, optional, default=2. Number of requests considered per item
+       * history: int, optional. Max non-resident items with retained history
+    * For 2Q:
+       * kin: float, optional, default=0.25. Target size of A1in (fraction)
+       * kout: float, optional, default=0.5. Size of A1out (fraction)
+ * Cache sizes of policies with capacity in bytes are converted from number of
+   contents to bytes using the mean content size of the workload
+ * admission (optional): name of a cache admission policy, or a dictionary
+   with its name and arguments, deciding which contents are inserted:
+    * K_HITS -> Insert contents at the k-th request (args: k, memory)
+    * PROB   -> Insert contents with probability p (args: p, seed)
+    * SKETCH -> Insert contents whose request count estimated by a count-min
+                sketch reaches k (args: k, width, depth, window)
+ * summary (optional): True or a dictionary of arguments (fingerprint_size,
+   bucket_size, load, capacity) to have each cache maintain a cuckoo filter
+   summary of its content, looked up by neighbors before the cache (CMEDGECF)
+    * interval (optional): neighbors see a digest of the summary broadcast
+      every interval requests (refresh='requests', default) or seconds
+      (refresh='time') as a 'delta' (default) or 'full' update
+ * tiers (optional, only with name PATH, TREE or ARRAY): list of dictionaries
+   describing the tiers of the cache of each node (e.g. RAM and SSD), each
+   with the name of its policy, its fraction of the cache size (size), its
+   access latency (latency, added to the latency of hits) and policy args.
+   Tiers are looked up in order (PATH), as leaves of a root which is the last
+   tier (TREE) or at random (ARRAY). Not supported with admission or summary
+ * roles (optional): dictionary of cache policies (each a dictionary like
+   cache_policy itself) overriding the policy of nodes by role in the topology
+   (e.g. edge, aggregation, core). Roles are assigned by the EATREE, CEATREE
+   and SINET-EDGE topologies, otherwise nodes attached to receivers are edge
+   nodes and other nodes are core nodes
+ * nodes (optional): dictionary of cache policies overriding the policy of
+   given nodes, also overriding the policy of their role
 
 
 desc
@@ -236,6 +303,7 @@ DATA_COLLECTORS = [
            'LATENCY',           # Measure request and response latency (based on static link delays)
            # 'LINK_LOAD',         # Measure link loads
            # 'PATH_STRETCH',      # Measure path stretch
+           # 'CACHE_SUMMARY',     # Measure false positives and memory of cache summaries
                    ]
 
 
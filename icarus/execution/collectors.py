@@ -21,6 +21,7 @@ __all__ = [
     'DataCollector',
     'CollectorProxy',
     'CacheHitRatioCollector',
+    'CacheSummaryCollector',
     'LinkLoadCollector',
     'LatencyCollector',
     'PathStretchCollector',
@@ -84,6 +85,38 @@ class DataCollector(object):
         """
         pass
 
+    def summary_lookup(self, node, summary_hit, cache_hit):
+        """Reports that the summary of the content of the cache at node *node*
+        has been looked up for the requested content.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node whose cache summary was looked up
+        summary_hit : bool
+            *True* if the summary reported the content, *False* otherwise
+        cache_hit : bool
+            *True* if the cache actually stores the content. It is always
+            *False* if *summary_hit* is *False*, since then the cache is not
+            looked up
+        """
+        pass
+
+    def tier_hit(self, node, tier, delay):
+        """Reports that the requested content has been served by a tier of
+        the tiered cache at node *node*.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node whose cache served the content
+        tier : int
+            The index of the tier which served the content
+        delay : float
+            The access latency of the tier
+        """
+        pass
+
     def server_hit(self, node):
         """Reports that the requested content has been served by the server at
         node *node*.
@@ -128,6 +161,40 @@ class DataCollector(object):
         """
         pass
 
+    def control_hop(self, u, v, size):
+        """Reports that a control message, e.g. a summary of the content of a
+        cache, has traversed the link *(u, v)*
+
+        Parameters
+        ----------
+        u : any hashable type
+            Origin node
+        v : any hashable type
+            Destination node
+        size : int
+            The size of the message in bytes
+        """
+        pass
+
+    def flood(self, node, radius, size=None, delay=0.0):
+        """Reports that a message has been flooded to all the nodes within a
+        number of hops from node *node*, traversing all the links of its ball
+        (see `NetworkView.flood_ball`)
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node the message was flooded from
+        radius : int
+            The time to live of the message, in hops
+        size : int, optional
+            If specified, the message is a control message of this size in
+            bytes, otherwise it is a copy of the request
+        delay : float, optional
+            The latency added to the session by the flood
+        """
+        pass
+
     def end_session(self, success=True):
         """Reports that the session is closed, i.e. the content has been
         successfully delivered to the receiver or a failure blocked the
@@ -164,7 +231,8 @@ class CollectorProxy(DataCollector):
     """
 
     EVENTS = ('start_session', 'end_session', 'cache_hit', 'cache_miss', 'server_hit',
-              'request_hop', 'content_hop', 'results')
+              'summary_lookup', 'tier_hit', 'request_hop', 'content_hop',
+              'control_hop', 'flood', 'results')
 
     def __init__(self, view, collectors):
         """Constructor
@@ -200,6 +268,16 @@ class CollectorProxy(DataCollector):
         for c in self.collectors['server_hit']:
             c.server_hit(node)
 
+    @inheritdoc(DataCollector)
+    def summary_lookup(self, node, summary_hit, cache_hit):
+        for c in self.collectors['summary_lookup']:
+            c.summary_lookup(node, summary_hit, cache_hit)
+
+    @inheritdoc(DataCollector)
+    def tier_hit(self, node, tier, delay):
+        for c in self.collectors['tier_hit']:
+            c.tier_hit(node, tier, delay)
+
     @inheritdoc(DataCollector)
     def request_hop(self, u, v, main_path=True):
         for c in self.collectors['request_hop']:
@@ -210,6 +288,16 @@ class CollectorProxy(DataCollector):
         for c in self.collectors['content_hop']:
             c.content_hop(u, v, main_path)
 
+    @inheritdoc(DataCollector)
+    def control_hop(self, u, v, size):
+        for c in self.collectors['control_hop']:
+            c.control_hop(u, v, size)
+
+    @inheritdoc(DataCollector)
+    def flood(self, node, radius, size=None, delay=0.0):
+        for c in self.collectors['flood']:
+            c.flood(node, radius, size, delay)
+
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
         for c in self.collectors['end_session']:
@@ -223,6 +311,13 @@ class CollectorProxy(DataCollector):
 @register_data_collector('LINK_LOAD')
 class LinkLoadCollector(DataCollector):
     """Data collector measuring the link load
+
+    The load of each link includes requests, contents and control messages,
+    such as broadcasts of cache summaries. The load due to control messages
+    only is also reported separately.
+
+    Floods are counted per ball and the load of the links of each ball is
+    only calculated with the results.
     """
 
     def __init__(self, view, req_size=150, content_size=1500):
@@ -235,11 +330,15 @@ class LinkLoadCollector(DataCollector):
         req_size : int
             Average size (in bytes) of a request
         content_size : int
-            Average size (in byte) of a content
+            Average size (in byte) of a content. It is used only for contents
+            whose size is not known by the network view
         """
         self.view = view
         self.req_count = collections.defaultdict(int)
-        self.cont_count = collections.defaultdict(int)
+        self.cont_bytes = collections.defaultdict(int)
+        self.ctrl_bytes = collections.defaultdict(int)
+        # Number of floods keyed by ball and message size
+        self.floods = collections.defaultdict(int)
         if req_size <= 0 or content_size <= 0:
             raise ValueError('req_size and content_size must be positive')
         self.req_size = req_size
@@ -252,6 +351,8 @@ class LinkLoadCollector(DataCollector):
         if self.t_start < 0:
             self.t_start = timestamp
         self.t_end = timestamp
+        size = self.view.content_size(content)
+        self.curr_size = size if size is not None else self.content_size
 
     @inheritdoc(DataCollector)
     def request_hop(self, u, v, main_path=True):
@@ -259,14 +360,32 @@ class LinkLoadCollector(DataCollector):
 
     @inheritdoc(DataCollector)
     def content_hop(self, u, v, main_path=True):
-        self.cont_count[(u, v)] += 1
+        self.cont_bytes[(u, v)] += self.curr_size
+
+    @inheritdoc(DataCollector)
+    def control_hop(self, u, v, size):
+        self.ctrl_bytes[(u, v)] += size
+
+    @inheritdoc(DataCollector)
+    def flood(self, node, radius, size=None, delay=0.0):
+        self.floods[(self.view.flood_ball(node, radius), size)] += 1
 
     @inheritdoc(DataCollector)
     def results(self):
         duration = self.t_end - self.t_start
-        used_links = set(self.req_count.keys()).union(set(self.cont_count.keys()))
-        link_loads = dict((link, (self.req_size * self.req_count[link] +
-                                  self.content_size * self.cont_count[link]) / duration)
+        req_count = collections.defaultdict(int, self.req_count)
+        ctrl_bytes = collections.defaultdict(int, self.ctrl_bytes)
+        for (ball, size), n in self.floods.items():
+            for link in ball.links:
+                if size is None:
+                    req_count[link] += n
+                else:
+                    ctrl_bytes[link] += n * size
+        used_links = set(req_count.keys()).union(set(self.cont_bytes.keys()),
+                                                 set(ctrl_bytes.keys()))
+        link_loads = dict((link, (self.req_size * req_count[link] +
+                                  self.cont_bytes[link] +
+                                  ctrl_bytes[link]) / duration)
                           for link in used_links)
         link_loads_int = dict((link, load)
                               for link, load in link_loads.items()
@@ -281,7 +400,8 @@ class LinkLoadCollector(DataCollector):
         return Tree({'MEAN_INTERNAL':     mean_load_int,
                      'MEAN_EXTERNAL':     mean_load_ext,
                      'PER_LINK_INTERNAL': link_loads_int,
-                     'PER_LINK_EXTERNAL': link_loads_ext})
+                     'PER_LINK_EXTERNAL': link_loads_ext,
+                     'CONTROL':           sum(ctrl_bytes.values()) / duration})
 
 
 @register_data_collector('LATENCY')
@@ -323,6 +443,14 @@ class LatencyCollector(DataCollector):
         if main_path:
             self.sess_latency += self.view.link_delay(u, v)
 
+    @inheritdoc(DataCollector)
+    def tier_hit(self, node, tier, delay):
+        self.sess_latency += delay
+
+    @inheritdoc(DataCollector)
+    def flood(self, node, radius, size=None, delay=0.0):
+        self.sess_latency += delay
+
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
         if not success:
@@ -345,7 +473,8 @@ class CacheHitRatioCollector(DataCollector):
     requests served by a cache.
     """
 
-    def __init__(self, view, off_path_hits=False, per_node=True, content_hits=False):
+    def __init__(self, view, off_path_hits=False, per_node=True,
+                 content_hits=False, byte_hits=False):
         """Constructor
 
         Parameters
@@ -358,11 +487,15 @@ class CacheHitRatioCollector(DataCollector):
         content_hits : bool, optional
             If *True* also records cache hits per content instead of just
             globally
+        byte_hits : bool, optional
+            If *True* also records the byte hit ratio, i.e. the portion of
+            requested bytes served by a cache
         """
         self.view = view
         self.off_path_hits = off_path_hits
         self.per_node = per_node
         self.cont_hits = content_hits
+        self.byte_hits = byte_hits
         self.sess_count = 0
         self.cache_hits = 0
         self.cuckoo_hits = 0
@@ -376,6 +509,10 @@ class CacheHitRatioCollector(DataCollector):
             self.curr_cont = None
             self.cont_cache_hits = collections.defaultdict(int)
             self.cont_serv_hits = collections.defaultdict(int)
+        if byte_hits:
+            self.curr_size = 1
+            self.cache_hit_bytes = 0
+            self.serv_hit_bytes = 0
 
     @inheritdoc(DataCollector)
     def start_session(self, timestamp, receiver, content):
@@ -385,10 +522,15 @@ class CacheHitRatioCollector(DataCollector):
             self.curr_path = self.view.shortest_path(receiver, source)
         if self.cont_hits:
             self.curr_cont = content
+        if self.byte_hits:
+            size = self.view.content_size(content)
+            self.curr_size = size if size is not None else 1
 
     @inheritdoc(DataCollector)
     def cache_hit(self, node):
         self.cache_hits += 1
+        if self.byte_hits:
+            self.cache_hit_bytes += self.curr_size
         if self.off_path_hits and node not in self.curr_path:
             self.off_path_hit_count += 1
         if self.cont_hits:
@@ -399,6 +541,8 @@ class CacheHitRatioCollector(DataCollector):
     @inheritdoc(DataCollector)
     def server_hit(self, node):
         self.serv_hits += 1
+        if self.byte_hits:
+            self.serv_hit_bytes += self.curr_size
         if self.cont_hits:
             self.cont_serv_hits[self.curr_cont] += 1
         if self.per_node:
@@ -412,6 +556,9 @@ class CacheHitRatioCollector(DataCollector):
         if self.off_path_hits:
             results['MEAN_OFF_PATH'] = self.off_path_hit_count / n_sess
             results['MEAN_ON_PATH'] = results['MEAN'] - results['MEAN_OFF_PATH']
+        if self.byte_hits:
+            results['BYTE_HIT_RATIO'] = self.cache_hit_bytes / \
+                                (self.cache_hit_bytes + self.serv_hit_bytes)
         if self.cont_hits:
             cont_set = set(list(self.cont_cache_hits.keys()) + list(self.cont_serv_hits.keys()))
             cont_hits = dict((i, (self.cont_cache_hits[i] / (self.cont_cache_hits[i] + self.cont_serv_hits[i])))
@@ -427,6 +574,77 @@ class CacheHitRatioCollector(DataCollector):
         return results
 
 
+@register_data_collector('CACHE_SUMMARY')
+class CacheSummaryCollector(DataCollector):
+    """Data collector measuring the accuracy and the memory of the summaries
+    of the content of caches looked up by neighbor nodes.
+
+    A false positive occurs when a summary reports a content which is not in
+    the cache. Each summary lookup not reporting the content saves a lookup
+    of the actual cache. Contents which could not be inserted in full
+    summaries are reported as overflows.
+    """
+
+    def __init__(self, view, per_node=True):
+        """Constructor
+
+        Parameters
+        ----------
+        view : NetworkView
+            The NetworkView instance
+        per_node : bool, optional
+            If *True* also records the lookups and false positives of the
+            summary of each node
+        """
+        self.view = view
+        self.per_node = per_node
+        self.lookups = 0
+        self.positives = 0
+        self.false_positives = 0
+        if per_node:
+            self.per_node_lookups = collections.defaultdict(int)
+            self.per_node_false_positives = collections.defaultdict(int)
+
+    @inheritdoc(DataCollector)
+    def summary_lookup(self, node, summary_hit, cache_hit):
+        self.lookups += 1
+        if summary_hit:
+            self.positives += 1
+            if not cache_hit:
+                self.false_positives += 1
+        if self.per_node:
+            self.per_node_lookups[node] += 1
+            if summary_hit and not cache_hit:
+                self.per_node_false_positives[node] += 1
+
+    @inheritdoc(DataCollector)
+    def results(self):
+        # Lookups of contents not in cache, i.e. of potential false positives
+        negatives = self.lookups - self.positives + self.false_positives
+        memory = {}
+        overflows = 0
+        for v in self.view.cache_nodes():
+            summary = self.view.cache_summary(v)
+            if summary is not None:
+                memory[v] = summary.get_memory()
+                overflows += summary.overflows
+        results = Tree(**{
+            'LOOKUPS': self.lookups,
+            'SAVED_LOOKUPS': self.lookups - self.positives,
+            'FALSE_POSITIVES': self.false_positives,
+            'FALSE_POSITIVE_RATE': self.false_positives / negatives
+                                   if negatives > 0 else 0,
+            'MEAN_MEMORY': sum(memory.values()) / len(memory)
+                           if len(memory) > 0 else 0,
+            'PER_NODE_MEMORY': memory,
+            'OVERFLOWS': overflows})
+        if self.per_node:
+            results['PER_NODE_LOOKUPS'] = dict(self.per_node_lookups)
+            results['PER_NODE_FALSE_POSITIVES'] = \
+                    dict(self.per_node_false_positives)
+        return results
+
+
 @register_data_collector('PATH_STRETCH')
 class PathStretchCollector(DataCollector):
     """Collector measuring the path stretch, i.e. the ratio between the actual
@@ -522,7 +740,7 @@ class TestCollector(DataCollector):
     def start_session(self, timestamp, receiver, content):
         self.session = dict(timestamp=timestamp, receiver=receiver,
                             content=content, cache_misses=[],
-                            request_hops=[], content_hops=[])
+                            request_hops=[], content_hops=[], floods=[])
 
     @inheritdoc(DataCollector)
     def cache_hit(self, node):
@@ -544,6 +762,10 @@ class TestCollector(DataCollector):
     def content_hop(self, u, v, main_path=True):
         self.session['content_hops'].append((u, v))
 
+    @inheritdoc(DataCollector)
+    def flood(self, node, radius, size=None, delay=0.0):
+        self.session['floods'].append((node, radius, size))
+
     @inheritdoc(DataCollector)
     def end_session(self, success=True):
         self.session['success'] = success
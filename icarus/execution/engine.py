@@ -24,7 +24,10 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
         An iterable object whose elements are (time, event) tuples, where time
         is a float type indicating the timestamp of the event to be executed
         and event is a dictionary storing all the attributes of the event to
-        execute
+        execute. If the workload has a *content_size* attribute, it is used
+        as table of content sizes. Events with a *changes* attribute are
+        applied to the topology (see `NetworkController.update_topology`)
+        instead of being passed to the strategy
     netconf : dict
         Dictionary of attributes to inizialize the network model
     strategy : tree
@@ -43,7 +46,9 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
     results : Tree
         A tree with the aggregated simulation results from all collectors
     """
-    model = NetworkModel(topology, cache_policy, **netconf)
+    model = NetworkModel(topology, cache_policy,
+                         content_size=getattr(workload, 'content_size', None),
+                         **netconf)
     view = NetworkView(model)
     controller = NetworkController(model)
 
@@ -57,5 +62,9 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
     strategy_inst = STRATEGY[strategy_name](view, controller, **strategy_args)
 
     for time, event in workload:
-        strategy_inst.process_event(time, **event)
+        if 'changes' in event:
+            # Topology changes, e.g. failures and repairs of links or nodes
+            controller.update_topology(event['changes'])
+        else:
+            strategy_inst.process_event(time, **event)
     return collector.results()
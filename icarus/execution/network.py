@@ -12,12 +12,20 @@ about the network status by calling methods of the `NetworkView` instance.
 The `NetworkController` is also responsible to notify a `DataCollectorProxy`
 of all relevant events.
 """
+import collections
+import functools
+import heapq
+import itertools
 import logging
 
+import numpy as np
 import networkx as nx
 import fnss
 
 from icarus.registry import CACHE_POLICY
+from icarus.models.cache import admission_cache, summary_cache, tiered_cache, \
+                                 hooked_cache, LruCacheStore, LruCacheStoreNode
+from icarus.scenarios.topology import node_role
 from icarus.util import path_links, iround
 
 __all__ = [
@@ -54,6 +62,379 @@ def symmetrify_paths(shortest_paths):
     return shortest_paths
 
 
+class DynamicShortestPaths(object):
+    """All-pair shortest paths of a topology, repaired incrementally when
+    links and nodes are removed or restored.
+
+    The shortest path tree of each source is kept as the distance and the
+    predecessor of each node. When links are removed, only the nodes of the
+    subtrees hanging from the removed links are settled again, starting from
+    the distances of their neighbors outside the subtrees. When links are
+    restored, decreases of distances are propagated from the restored links
+    only. Paths are made symmetric as by `symmetrify_paths` and only the paths
+    of the pairs whose distance or predecessor changed are rebuilt.
+    """
+
+    def __init__(self, topology):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : fnss.Topology
+            The topology
+        """
+        self.topology = topology
+        # Symmetric all-pair shortest paths, keyed by source and destination
+        self.paths = {}
+        # Distance and predecessor of each node in the tree of each source
+        self._dist = {}
+        self._pred = {}
+        for s in topology.nodes():
+            self._compute(s)
+
+    def _weight(self, u, v):
+        """Return the weight of a link"""
+        return self.topology.edge[u][v].get('weight', 1)
+
+    def _out_arcs(self, u):
+        """Return an iterator over the links leaving a node and their weights"""
+        for v, attr in self.topology.edge[u].items():
+            yield v, attr.get('weight', 1)
+
+    def _in_arcs(self, v):
+        """Return an iterator over the links entering a node and their
+        weights"""
+        if not self.topology.is_directed():
+            return self._out_arcs(v)
+        return ((u, attr.get('weight', 1))
+                for u, attr in self.topology.pred[v].items())
+
+    def _compute(self, s):
+        """Compute the shortest path tree of a source and make the paths of
+        all pairs including the source symmetric to the paths of the tree"""
+        dist, paths = nx.single_source_dijkstra(self.topology, s)
+        self._dist[s] = dist
+        self._pred[s] = {v: p[-2] for v, p in paths.items() if len(p) > 1}
+        self.paths[s] = paths
+        for v, path in paths.items():
+            if v != s:
+                self.paths.setdefault(v, {})[s] = list(reversed(path))
+
+    def _repair(self, s, removed_arcs, removed_nodes, restored_arcs):
+        """Repair the shortest path tree of a source and return the nodes
+        whose distance or predecessor changed and the nodes no longer
+        reachable"""
+        dist, pred = self._dist[s], self._pred[s]
+        for v in removed_nodes:
+            dist.pop(v, None)
+            pred.pop(v, None)
+        # Nodes of the subtrees hanging from removed links
+        roots = [v for u, v in removed_arcs if pred.get(v) == u]
+        detached = set()
+        if roots:
+            children = collections.defaultdict(list)
+            for v, u in pred.items():
+                children[u].append(v)
+            stack = roots
+            while stack:
+                v = stack.pop()
+                if v not in detached:
+                    detached.add(v)
+                    stack.extend(children[v])
+            for v in detached:
+                del dist[v]
+                del pred[v]
+        # Detached nodes are settled again from their neighbors, then
+        # decreases of distances are propagated from detached nodes and
+        # restored links
+        # Heap entries include a sequence number, so that nodes are never
+        # compared with each other
+        heap = []
+        seq = itertools.count()
+        for v in detached:
+            for u, w in self._in_arcs(v):
+                if u in dist:
+                    heapq.heappush(heap, (dist[u] + w, next(seq), v, u))
+        settled = set()
+        while heap:
+            d, _, v, u = heapq.heappop(heap)
+            if v in settled:
+                continue
+            settled.add(v)
+            dist[v] = d
+            pred[v] = u
+            for x, w in self._out_arcs(v):
+                if x in detached and x not in settled:
+                    heapq.heappush(heap, (d + w, next(seq), x, v))
+        unreachable = detached - settled
+        changed = set(settled)
+        for u, v, w in restored_arcs:
+            if u in dist:
+                heap.append((dist[u] + w, next(seq), v, u))
+        for u in settled:
+            for v, w in self._out_arcs(u):
+                if v in dist:
+                    heap.append((dist[u] + w, next(seq), v, u))
+        heapq.heapify(heap)
+        while heap:
+            d, _, v, u = heapq.heappop(heap)
+            if d >= dist.get(v, float('inf')):
+                continue
+            dist[v] = d
+            pred[v] = u
+            changed.add(v)
+            unreachable.discard(v)
+            for x, w in self._out_arcs(v):
+                if d + w < dist.get(x, float('inf')):
+                    heapq.heappush(heap, (d + w, next(seq), x, v))
+        return changed, unreachable
+
+    def _tree_path(self, s, v, built):
+        """Return the path from a source to a node in the tree of the source,
+        reusing the paths already built"""
+        pred = self._pred[s]
+        branch = []
+        while v not in built and v != s:
+            branch.append(v)
+            v = pred[v]
+        path = built[v] if v != s else [s]
+        for x in reversed(branch):
+            path = path + [x]
+            built[x] = path
+        return path
+
+    def update(self, removed_links=(), restored_links=(), removed_nodes=(),
+               restored_nodes=()):
+        """Repair the shortest paths after a batch of changes has been applied
+        to the topology.
+
+        Parameters
+        ----------
+        removed_links : iterable of tuples, optional
+            The links removed from the topology
+        restored_links : iterable of tuples, optional
+            The links added to the topology
+        removed_nodes : iterable, optional
+            The nodes removed from the topology. Their links must be included
+            in *removed_links*
+        restored_nodes : iterable, optional
+            The nodes added to the topology. Their links must be included in
+            *restored_links*
+
+        Returns
+        -------
+        affected : set
+            The sources whose shortest path trees changed
+        """
+        topology = self.topology
+
+        def arcs(links):
+            for u, v in links:
+                yield u, v
+                if not topology.is_directed():
+                    yield v, u
+
+        removed_nodes = set(v for v in removed_nodes if v not in topology)
+        restored_nodes = set(v for v in restored_nodes if v in topology)
+        for v in removed_nodes:
+            for d in (self.paths, self._dist, self._pred):
+                d.pop(v, None)
+        removed_arcs = [(u, v) for u, v in arcs(removed_links)
+                        if v not in removed_nodes]
+        restored_arcs = [(u, v, self._weight(u, v)) for u, v in arcs(restored_links)
+                         if topology.has_edge(u, v)]
+        affected = set(restored_nodes)
+        for s in topology.nodes():
+            if s in restored_nodes:
+                continue
+            paths = self.paths[s]
+            for v in removed_nodes:
+                paths.pop(v, None)
+            changed, unreachable = self._repair(s, removed_arcs, removed_nodes,
+                                                restored_arcs)
+            for v in unreachable:
+                paths.pop(v, None)
+                self.paths[v].pop(s, None)
+            if changed or unreachable:
+                affected.add(s)
+            built = {}
+            for v in changed:
+                path = self._tree_path(s, v, built)
+                paths[v] = path
+                self.paths.setdefault(v, {})[s] = list(reversed(path))
+        # Restored nodes are new sources, whose trees are computed from scratch
+        for s in topology.nodes():
+            if s in restored_nodes:
+                self._compute(s)
+        return affected
+
+
+class PathRecord(object):
+    """Shortest path between a pair of nodes together with the positions of
+    the caches on it, so that strategies can visit caches without checking
+    each node of the path.
+
+    Attributes
+    ----------
+    path : tuple
+        The nodes of the path, origin and destination included
+    cache_nodes : tuple
+        The nodes of the path having a cache, in path order
+    cache_positions : tuple
+        The position in the path of each node of *cache_nodes*
+    position : dict
+        Dictionary mapping each node of the path to its position
+    edge_cache : any hashable type
+        The first node having a cache after the origin or *None* if there is
+        none
+    """
+
+    __slots__ = ['path', 'cache_nodes', 'cache_positions', 'position',
+                 'edge_cache']
+
+    def __init__(self, path, cache):
+        """Constructor
+
+        Parameters
+        ----------
+        path : list
+            The nodes of the path
+        cache : dict
+            The caches of the network, keyed by node
+        """
+        self.path = tuple(path)
+        self.position = {v: i for i, v in enumerate(self.path)}
+        self.cache_positions = tuple(i for i, v in enumerate(self.path)
+                                     if v in cache)
+        self.cache_nodes = tuple(self.path[i] for i in self.cache_positions)
+        self.edge_cache = next((self.path[i] for i in self.cache_positions
+                                if i > 0), None)
+
+
+class FloodBall(object):
+    """Nodes within a number of hops from a node, together with the links
+    traversed by a message flooded from it with that number of hops as time
+    to live.
+
+    A flooded message is forwarded by each node closer than *radius* hops to
+    the origin to all its neighbors but the one it first received the
+    message from, i.e. its parent in a breadth-first search tree rooted at
+    the origin.
+
+    Attributes
+    ----------
+    origin : any hashable type
+        The node the message is flooded from
+    radius : int
+        The time to live of the message, in hops
+    hops : dict
+        Dictionary mapping each node of the ball to its distance in hops from
+        the origin
+    links : tuple
+        The links traversed by the message, as (u, v) tuples
+    """
+
+    __slots__ = ['origin', 'radius', 'hops', 'links']
+
+    def __init__(self, topology, origin, radius):
+        """Constructor
+
+        Parameters
+        ----------
+        topology : Topology
+            The topology
+        origin : any hashable type
+            The node the message is flooded from
+        radius : int
+            The time to live of the message, in hops
+        """
+        self.origin = origin
+        self.radius = radius
+        self.hops = {origin: 0}
+        parent = {origin: None}
+        links = []
+        frontier = [origin]
+        for d in range(1, radius + 1):
+            reached = []
+            for u in frontier:
+                for v in topology.edge[u]:
+                    if v == parent[u]:
+                        continue
+                    links.append((u, v))
+                    if v not in self.hops:
+                        self.hops[v] = d
+                        parent[v] = u
+                        reached.append(v)
+            frontier = reached
+        self.links = tuple(links)
+
+
+def _cache_factory(cache_policy, content_size=None):
+    """Return a function building the caches of a cache policy descriptor
+
+    Parameters
+    ----------
+    cache_policy : dict
+        The cache policy descriptor (see `NetworkModel`)
+    content_size : dict, optional
+        The size (in bytes) of each content object
+
+    Returns
+    -------
+    factory : callable
+        Function returning a new cache given its size in number of contents.
+        Caches notify subscribers of inserted and evicted items (see
+        `hooked_cache`)
+    cache_class : type
+        The class of the caches, without hooks
+    summary_broadcast : dict
+        The parameters of the broadcast of summary digests or *None* if
+        summaries are not broadcast
+    """
+    policy_name = cache_policy['name']
+    policy_args = {k: v for k, v in cache_policy.items()
+                   if k not in ('name', 'admission', 'summary', 'tiers')}
+    cache_class = CACHE_POLICY[policy_name]
+    tiers = cache_policy.get('tiers', None)
+    if tiers is not None and ('admission' in cache_policy
+                              or cache_policy.get('summary', False)):
+        raise ValueError('Tiered caches do not support admission policies '
+                         'and summaries')
+    if 'admission' in cache_policy:
+        cache_class = admission_cache(cache_class, cache_policy['admission'])
+    summary = cache_policy.get('summary', False)
+    summary_broadcast = None
+    if summary:
+        summary_args = dict(summary) if isinstance(summary, dict) else {}
+        if 'interval' in summary_args:
+            broadcast = {'interval': summary_args.pop('interval'),
+                         'refresh': summary_args.pop('refresh', 'requests'),
+                         'update': summary_args.pop('update', 'delta')}
+            if broadcast['interval'] <= 0:
+                raise ValueError('The summary broadcast interval must be '
+                                 'positive')
+            if broadcast['refresh'] not in ('requests', 'time'):
+                raise ValueError('refresh must be either requests or time')
+            if broadcast['update'] not in ('delta', 'full'):
+                raise ValueError('update must be either delta or full')
+            summary_args['broadcast'] = True
+            summary_broadcast = broadcast
+        cache_class = summary_cache(cache_class, **summary_args)
+    hooked_class = hooked_cache(cache_class)
+    if tiers is not None:
+        return (lambda size: tiered_cache(hooked_class, size, tiers, **policy_args),
+                cache_class, summary_broadcast)
+    if getattr(cache_class, 'byte_capacity', False):
+        mean_size = sum(content_size.values()) / len(content_size) \
+                    if content_size else 1
+        policy_args['sizes'] = content_size
+        return (lambda size: hooked_class(max(1, iround(size * mean_size)),
+                                          **policy_args),
+                cache_class, summary_broadcast)
+    return (lambda size: hooked_class(size, **policy_args),
+            cache_class, summary_broadcast)
+
+
 class NetworkView(object):
     """Network view
 
@@ -91,12 +472,58 @@ class NetworkView(object):
         nodes : set
             A set of all nodes currently storing the given content
         """
-        loc = set(v for v in self.model.cache if self.model.cache[v].has(k))
+        cache = self.model.cache
+        loc = set(v for v in self.model.content_index.get(k, ()) if v in cache)
         source = self.content_source(k)
         if source:
             loc.add(source)
         return loc
 
+    def location_nodes(self):
+        """Return the cache nodes in the order of the elements of content
+        location bitmaps (see `content_location_bitmap`).
+
+        Returns
+        -------
+        nodes : list
+            The cache nodes
+        """
+        if self.model.location_bitmaps is None:
+            self.model.index_location_bitmaps()
+        return list(self.model.location_nodes)
+
+    def content_location_bitmap(self, k):
+        """Return a boolean array flagging the cache nodes currently storing
+        a specific content.
+
+        Bitmaps are built when first requested and then kept up to date as
+        caches insert and evict contents. Content sources are not included.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        bitmap : numpy.ndarray
+            Array whose i-th element is *True* if the i-th node of
+            `location_nodes` stores the content, or *None* if no cache stores
+            it. The array must not be modified
+        """
+        model = self.model
+        if model.location_bitmaps is None:
+            model.index_location_bitmaps()
+        bitmap = model.location_bitmaps.get(k, None)
+        if bitmap is not None and model.removed_caches:
+            # Removed caches keep their content but cannot be reached
+            index = model.location_index
+            bitmap = bitmap.copy()
+            bitmap[[index[v] for v in model.removed_caches]] = False
+            if not bitmap.any():
+                return None
+        return bitmap
+
     def content_source(self, k):
         """Return the node identifier where the content is persistently stored.
 
@@ -111,8 +538,30 @@ class NetworkView(object):
             The node persistently storing the given content or None if the
             source is unavailable
         """
+        catalog = self.model.content_catalog
+        if catalog is not None:
+            source = catalog.source(k)
+            return source if source in self.model.source_node else None
         return self.model.content_source.get(k, None)
 
+    def content_size(self, k):
+        """Return the size of a content object.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        size : int
+            The size (in bytes) of the content or None if content sizes are
+            not known
+        """
+        if self.model.content_size is None:
+            return None
+        return self.model.content_size.get(k, None)
+
     def shortest_path(self, s, t):
         """Return the shortest path from *s* to *t*
 
@@ -131,6 +580,59 @@ class NetworkView(object):
         """
         return self.model.shortest_path[s][t]
 
+    def path_record(self, s, t):
+        """Return the shortest path from *s* to *t* together with the
+        positions of the caches on it.
+
+        Records are built when first requested and rebuilt only after the
+        topology or the set of caches changes.
+
+        Parameters
+        ----------
+        s : any hashable type
+            Origin node
+        t : any hashable type
+            Destination node
+
+        Returns
+        -------
+        record : PathRecord
+            The record of the path
+        """
+        try:
+            return self.model.path_records[(s, t)]
+        except KeyError:
+            record = PathRecord(self.model.shortest_path[s][t],
+                                self.model.cache)
+            self.model.path_records[(s, t)] = record
+            return record
+
+    def flood_ball(self, v, radius):
+        """Return the nodes within a number of hops from a node and the links
+        traversed by a message flooded from it.
+
+        Balls are built when first requested and rebuilt only after the
+        topology changes.
+
+        Parameters
+        ----------
+        v : any hashable type
+            The node the message is flooded from
+        radius : int
+            The time to live of the message, in hops
+
+        Returns
+        -------
+        ball : FloodBall
+            The ball
+        """
+        try:
+            return self.model.flood_balls[(v, radius)]
+        except KeyError:
+            ball = FloodBall(self.model.topology, v, radius)
+            self.model.flood_balls[(v, radius)] = ball
+            return ball
+
     def all_pairs_shortest_paths(self):
         """Return all pairs shortest paths
 
@@ -230,6 +732,27 @@ class NetworkView(object):
         return {v: c.maxlen for v, c in self.model.cache.items()} if size \
                 else list(self.model.cache.keys())
 
+    def cache_neighbors(self, v):
+        """Return the neighbors of a node having a cache.
+
+        Neighbors are indexed when the network is built and indexed again
+        only after the topology changes.
+
+        Parameters
+        ----------
+        v : any hashable type
+            The node
+
+        Returns
+        -------
+        cache_neighbors : tuple
+            The neighbors of the node having a cache
+        """
+        cache_neighbors = self.model.cache_neighbors
+        if cache_neighbors is None:
+            cache_neighbors = self.model.index_cache_neighbors()
+        return cache_neighbors[v]
+
     def has_cache(self, node):
         """Check if a node has a content cache.
 
@@ -270,6 +793,34 @@ class NetworkView(object):
         if node in self.model.cache:
             return self.model.cache[node].has(content)
 
+    def first_cache_hit(self, nodes, content):
+        """Return the position of the first node of a sequence whose cache has
+        a content object, without changing the internal state of the caches.
+
+        If caches are kept in a network-wide store, all nodes are looked up
+        with a single vectorized operation.
+
+        Parameters
+        ----------
+        nodes : list
+            The nodes to look up, e.g. a path. Nodes without cache are allowed
+        content : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        index : int
+            The position in *nodes* of the first node whose cache has the
+            content or *None* if no cache has it
+        """
+        if self.model.cache_store is not None and not self.model.removed_caches:
+            return self.model.cache_store.first_hit(nodes, content)
+        cache = self.model.cache
+        for i, v in enumerate(nodes):
+            if v in cache and cache[v].has(content):
+                return i
+        return None
+
     def local_cache_lookup(self, node, content):
         """Check if the local cache of a node has a content object, without
         changing the internal state of the cache.
@@ -317,6 +868,24 @@ class NetworkView(object):
         if node in self.model.cache:
             return self.model.cache[node].dump()
 
+    def cache_summary(self, node):
+        """Returns the summary of the content of the cache of a node, if the
+        cache maintains one
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node identifier
+
+        Returns
+        -------
+        summary : CuckooFilter
+            The cuckoo filter summarizing the content of the cache or *None*
+            if the node has no cache or its cache has no summary
+        """
+        if node in self.model.cache:
+            return getattr(self.model.cache[node], 'summary', None)
+
 
 class NetworkModel(object):
     """Models the internal state of the network.
@@ -325,7 +894,8 @@ class NetworkModel(object):
     calls to the network controller.
     """
 
-    def __init__(self, topology, cache_policy, shortest_path=None):
+    def __init__(self, topology, cache_policy, shortest_path=None,
+                 content_size=None, cache_store=False):
         """Constructor
 
         Parameters
@@ -335,24 +905,63 @@ class NetworkModel(object):
         cache_policy : dict or Tree
             cache policy descriptor. It has the name attribute which identify
             the cache policy name and keyworded arguments specific to the
-            policy
+            policy. It may also have an admission attribute with the name of
+            a cache admission policy or a dictionary with its name and
+            arguments and a summary attribute, which is either *True* or a
+            dictionary of arguments of a cuckoo filter summarizing the
+            content of each cache. If the summary dictionary has an
+            interval attribute, neighbors see a digest of the summary
+            broadcast every *interval* requests or, if its refresh attribute
+            is *time*, every *interval* seconds, as a *delta* (default) or
+            *full* update according to its update attribute. If the name
+            is *PATH*, *TREE* or *ARRAY* and the descriptor has a tiers
+            attribute, the cache of each node is split in tiers, each
+            described by a dictionary with its policy name, its fraction of
+            the cache size (size), its access latency (latency) and any other
+            argument of its policy. The roles and nodes attributes are
+            dictionaries of cache policy descriptors overriding the policy of
+            nodes with a given role in the topology (see `node_role`) or of
+            given nodes
         shortest_path : dict of dict, optional
             The all-pair shortest paths of the network
+        content_size : dict, optional
+            The size (in bytes) of each content object. If not given, all
+            contents are assumed to have the same size
+        cache_store : bool, optional
+            If *True*, the state of all caches is kept in a single
+            network-wide store, which allows to look up the caches of many
+            nodes with a single vectorized operation. This is only supported
+            if all nodes use the LRU cache policy without admission policy
+
+        Notes
+        -----
+        Cache sizes assigned to the topology are always expressed in number
+        of content objects. If the cache policy has a capacity expressed in
+        bytes, cache sizes are converted to bytes by multiplying them by the
+        mean content size.
         """
         # Filter inputs
         if not isinstance(topology, fnss.Topology):
             raise ValueError('The topology argument must be an instance of '
                              'fnss.Topology or any of its subclasses.')
 
-        # Shortest paths of the network
+        # Shortest paths of the network, repaired incrementally when the
+        # topology changes. If paths are given, the structure repairing them
+        # is only built before the first change
+        self.path_repair = DynamicShortestPaths(topology) \
+                           if shortest_path is None else None
         self.shortest_path = shortest_path if shortest_path is not None \
-                             else symmetrify_paths(nx.all_pairs_dijkstra_path(topology))
+                             else self.path_repair.paths
 
         # Network topology
         self.topology = topology
 
+        # Catalog mapping each content object to its source, if contents were
+        # placed in a catalog (see icarus.scenarios.contentplacement)
+        self.content_catalog = topology.graph.get('content_catalog', None)
         # Dictionary mapping each content object to its source
-        # dict of location of contents keyed by content ID
+        # dict of location of contents keyed by content ID. It is only used
+        # if contents are not placed in a catalog
         self.content_source = {}
         # Dictionary mapping the reverse, i.e. nodes to set of contents stored
         self.source_node = {}
@@ -379,8 +988,9 @@ class NetworkModel(object):
             elif stack_name == 'source':
                 contents = stack_props['contents']
                 self.source_node[node] = contents
-                for content in contents:
-                    self.content_source[content] = node
+                if self.content_catalog is None:
+                    for content in contents:
+                        self.content_source[content] = node
         if any(c < 1 for c in cache_size.values()):
             logger.warn('Some content caches have size equal to 0. '
                         'I am setting them to 1 and run the experiment anyway')
@@ -388,11 +998,74 @@ class NetworkModel(object):
                 if cache_size[node] < 1:
                     cache_size[node] = 1
 
-        policy_name = cache_policy['name']
-        policy_args = {k: v for k, v in cache_policy.items() if k != 'name'}
+        # Dictionary mapping each content object to its size (in bytes), or
+        # None if all contents have the same size
+        self.content_size = content_size
+
+        # Cache policy descriptors overriding the default one for nodes with
+        # a given role in the topology or for specific nodes
+        role_policy = cache_policy.get('roles', {})
+        node_policy = cache_policy.get('nodes', {})
+        default_policy = {k: v for k, v in cache_policy.items()
+                          if k not in ('roles', 'nodes')}
+        # Parameters of the broadcast of summary digests, if any
+        self.summary_broadcast = None
+        # Cache policy descriptor of each node
+        self.cache_policy = {}
+        factories = {}
+        for node in cache_size:
+            policy = node_policy.get(node, None)
+            if policy is None:
+                policy = role_policy.get(node_role(topology, node),
+                                         default_policy)
+            self.cache_policy[node] = policy
+            if id(policy) not in factories:
+                factory = _cache_factory(policy, content_size)
+                broadcast = factory[2]
+                if broadcast is not None:
+                    if self.summary_broadcast not in (None, broadcast):
+                        raise ValueError('All summaries must be broadcast '
+                                         'with the same parameters')
+                    self.summary_broadcast = broadcast
+                factories[id(policy)] = factory
         # The actual cache objects storing the content
-        self.cache = {node: CACHE_POLICY[policy_name](cache_size[node], **policy_args)
+        if cache_store:
+            if any(factories[id(self.cache_policy[node])][1] is not CACHE_POLICY['LRU']
+                   for node in cache_size):
+                raise ValueError('A network-wide cache store is only supported '
+                                 'by the LRU cache policy')
+            self.cache_store = LruCacheStore(cache_size)
+            store_node_class = hooked_cache(LruCacheStoreNode)
+            self.cache = {node: store_node_class(self.cache_store, node)
                           for node in cache_size}
+        else:
+            self.cache_store = None
+            self.cache = {node: factories[id(self.cache_policy[node])][0](cache_size[node])
+                          for node in cache_size}
+        # Dictionary mapping each content object to the set of nodes whose
+        # caches store it, kept up to date by the hooks of the caches
+        self.content_index = collections.defaultdict(set)
+        for node in self.cache:
+            self.index_cache(node)
+        # Dictionary mapping each content object to a boolean array flagging
+        # the nodes of location_nodes whose caches store it. It is only built
+        # when first requested through the view
+        self.location_nodes = None
+        self.location_index = None
+        self.location_bitmaps = None
+
+        # Dictionary mapping each node to the tuple of its neighbors having a
+        # cache. It is set to None whenever the topology changes and rebuilt
+        # when next needed
+        self.cache_neighbors = None
+        self.index_cache_neighbors()
+        # Records of the shortest paths requested by strategies, keyed by
+        # origin and destination. They are cleared whenever paths or caches
+        # change
+        self.path_records = {}
+        # Balls of the nodes flooded by strategies, keyed by origin and radius.
+        # They are cleared whenever the topology changes
+        self.flood_balls = {}
 
         # This is for a local un-coordinated cache (currently used only by
         # Hashrouting with edge cache)
@@ -410,6 +1083,78 @@ class NetworkModel(object):
         self.removed_caches = {}
         self.removed_local_caches = {}
 
+    def index_cache(self, node):
+        """Add the content of the cache of a node to the content index and
+        subscribe to its insertions and evictions to keep the index up to
+        date.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        """
+        cache = self.cache[node]
+        for k in cache.dump():
+            self.content_index[k].add(node)
+        cache.subscribe(on_insert=functools.partial(self._content_inserted, node),
+                        on_evict=functools.partial(self._content_evicted, node))
+
+    def index_location_bitmaps(self):
+        """Build the content location bitmaps from the content index. After
+        this call, bitmaps are kept up to date by the hooks of the caches.
+
+        Returns
+        -------
+        location_bitmaps : dict
+            Dictionary mapping each content to the boolean array flagging the
+            nodes of *location_nodes* storing it
+        """
+        self.location_nodes = list(self.cache) + list(self.removed_caches)
+        self.location_index = {v: i for i, v in enumerate(self.location_nodes)}
+        self.location_bitmaps = {}
+        for k, nodes in self.content_index.items():
+            bitmap = np.zeros(len(self.location_nodes), dtype=bool)
+            bitmap[[self.location_index[v] for v in nodes]] = True
+            self.location_bitmaps[k] = bitmap
+        return self.location_bitmaps
+
+    def index_cache_neighbors(self):
+        """Build the index of the neighbors having a cache of each node.
+
+        Returns
+        -------
+        cache_neighbors : dict
+            Dictionary mapping each node to the tuple of its neighbors having
+            a cache
+        """
+        cache = self.cache
+        self.cache_neighbors = {v: tuple(u for u in self.topology.edge[v]
+                                         if u in cache)
+                                for v in self.topology.nodes_iter()}
+        return self.cache_neighbors
+
+    def _content_inserted(self, node, k):
+        """Record that the cache of a node stores a content"""
+        self.content_index[k].add(node)
+        if self.location_bitmaps is not None:
+            bitmap = self.location_bitmaps.get(k, None)
+            if bitmap is None:
+                bitmap = np.zeros(len(self.location_nodes), dtype=bool)
+                self.location_bitmaps[k] = bitmap
+            bitmap[self.location_index[node]] = True
+
+    def _content_evicted(self, node, k):
+        """Record that the cache of a node no longer stores a content"""
+        nodes = self.content_index.get(k, None)
+        if nodes is not None:
+            nodes.discard(node)
+            if not nodes:
+                del self.content_index[k]
+                if self.location_bitmaps is not None:
+                    del self.location_bitmaps[k]
+            elif self.location_bitmaps is not None:
+                self.location_bitmaps[k][self.location_index[node]] = False
+
 
 class NetworkController(object):
     """Network controller
@@ -430,6 +1175,11 @@ class NetworkController(object):
         self.session = None
         self.model = model
         self.collector = None
+        # Requests and time of the last broadcast of summary digests
+        self._summary_requests = 0
+        self._summary_time = None
+        # Topology changes applied since shortest paths were last repaired
+        self._path_changes = collections.defaultdict(list)
 
     def attach_collector(self, collector):
         """Attach a data collector to which all events will be reported.
@@ -467,6 +1217,45 @@ class NetworkController(object):
                             log=log)
         if self.collector is not None and self.session['log']:
             self.collector.start_session(timestamp, receiver, content)
+        broadcast = self.model.summary_broadcast
+        if broadcast is not None:
+            if broadcast['refresh'] == 'requests':
+                self._summary_requests += 1
+                if self._summary_requests >= broadcast['interval']:
+                    self._summary_requests = 0
+                    self.broadcast_summaries()
+            elif self._summary_time is None:
+                self._summary_time = timestamp
+            elif timestamp - self._summary_time >= broadcast['interval']:
+                self._summary_time = timestamp
+                self.broadcast_summaries()
+
+    def broadcast_summaries(self, full=None):
+        """Publish the digests of the summaries of all caches and send them
+        to the neighbors of each cache.
+
+        Only caches whose summary is broadcast are published. The size of each
+        update is reported to the collector as control traffic on the links
+        towards the cache neighbors of the node.
+
+        Parameters
+        ----------
+        full : bool, optional
+            If *True*, the whole summaries are sent, if *False* only the
+            entries changed since the last broadcast are sent. If not
+            specified, the update type of the network model is used
+        """
+        if full is None:
+            full = self.model.summary_broadcast['update'] == 'full'
+        log = self.collector is not None and self.session is not None \
+              and self.session['log']
+        for v, cache in self.model.cache.items():
+            if not hasattr(cache, 'publish_summary'):
+                continue
+            size = cache.publish_summary(full)
+            if log and size > 0:
+                for u in self.get_neighbors(v):
+                    self.collector.control_hop(v, u, size)
 
     def forward_request_path(self, s, t, path=None, main_path=True):
         """Forward a request from node *s* to node *t* over the provided path.
@@ -546,6 +1335,30 @@ class NetworkController(object):
         if self.collector is not None and self.session['log']:
             self.collector.content_hop(u, v, main_path)
 
+    def flood(self, v, radius, size=None, delay=0.0):
+        """Flood a message from a node to all the nodes within a number of
+        hops from it.
+
+        The flood is reported to the collector as a single event rather than
+        as a hop event per link, and collectors derive the load of each link
+        from the ball of the flood (see `NetworkView.flood_ball`).
+
+        Parameters
+        ----------
+        v : any hashable type
+            The node the message is flooded from
+        radius : int
+            The time to live of the message, in hops
+        size : int, optional
+            If specified, the message is a control message of this size in
+            bytes, otherwise it is a copy of the request
+        delay : float, optional
+            The latency added to the session by the flood, e.g. the delay
+            taken by the message to reach the node serving the request
+        """
+        if self.collector is not None and self.session['log']:
+            self.collector.flood(v, radius, size, delay)
+
     def put_content(self, node):
         """Store content in the specified node.
 
@@ -581,7 +1394,7 @@ class NetworkController(object):
             True if the content is available, False otherwise
         """
         if node in self.model.cache:
-            cache_hit = self.model.cache[node].get(self.session['content'])
+            cache_hit = self._cache_get(node, self.session['content'])
             if cache_hit:
                 if self.session['log']:
                     self.collector.cache_hit(node)
@@ -589,16 +1402,133 @@ class NetworkController(object):
                 if self.session['log']:
                     self.collector.cache_miss(node)
             return cache_hit
-        name, props = fnss.get_stack(self.model.topology, node)
-        if name == 'source' and self.session['content'] in props['contents']:
+        if node in self.model.source_node and \
+                self.session['content'] in self.model.source_node[node]:
             if self.collector is not None and self.session['log']:
                 self.collector.server_hit(node)
             return True
         else:
             return False
 
+    def _cache_get(self, node, content, update=True):
+        """Get a content from the cache of a node.
+
+        If the cache of the node is tiered, the access latency of the tier
+        serving the content is reported to the collector.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node where the content is retrieved
+        content : any hashable type
+            The content identifier
+        update : bool, optional
+            If *False*, the content is only looked up, without changing the
+            internal state of the cache
+
+        Returns
+        -------
+        cache_hit : bool
+            True if the cache stores the content, False otherwise
+        """
+        cache = self.model.cache[node]
+        if not hasattr(cache, 'get_tier'):
+            return cache.get(content) if update else cache.has(content)
+        tier = cache.get_tier(content) if update else cache.peek_tier(content)
+        if tier is None:
+            return False
+        if self.collector is not None and self.session['log']:
+            self.collector.tier_hit(node, tier, cache.tier_latency[tier])
+        return True
+
+    def lookup_many(self, nodes, content=None, update='serving'):
+        """Look up a content in the caches of a sequence of nodes and get it
+        from the first cache storing it.
+
+        All caches are looked up in a single call. If caches are kept in a
+        network-wide store, the lookup is a single vectorized operation.
+        A cache hit is reported for the serving node and a cache miss is
+        reported for each node looked up before it, at most once per session
+        for each node.
+
+        Only caches are looked up, not content sources.
+
+        Parameters
+        ----------
+        nodes : list
+            The nodes to look up, in order of preference. Nodes without cache
+            are skipped
+        content : any hashable type, optional
+            The content identifier. If not specified, it is the content of the
+            current session
+        update : str, optional
+            Which caches storing the content have their internal state updated
+            as if the content was retrieved from them: *serving* updates only
+            the cache of the serving node, *all* updates the caches of all
+            nodes and *none* does not update any cache
+
+        Returns
+        -------
+        serving_node : any hashable type
+            The first node whose cache stores the content or *None* if no
+            cache stores it
+        """
+        if update not in ('serving', 'all', 'none'):
+            raise ValueError('update must be any of serving, all or none')
+        if content is None:
+            content = self.session['content']
+        cache = self.model.cache
+        store = self.model.cache_store
+        if store is not None and not self.model.removed_caches:
+            index = store.first_hit(nodes, content, update=(update == 'serving'))
+            if update == 'all':
+                for v in nodes:
+                    if v in cache:
+                        cache[v].get(content)
+        else:
+            index = None
+            # Caches whose state was updated while looking up the content
+            accessed = set()
+            for i, v in enumerate(nodes):
+                if v not in cache:
+                    continue
+                # The tier of a tiered cache serving a content is only known
+                # when it is retrieved
+                if update != 'none' and hasattr(cache[v], 'get_tier'):
+                    accessed.add(v)
+                    if self._cache_get(v, content):
+                        index = i
+                        break
+                elif cache[v].has(content):
+                    if update != 'none':
+                        accessed.add(v)
+                    self._cache_get(v, content, update != 'none')
+                    index = i
+                    break
+            if update == 'all':
+                for v in nodes:
+                    if v in cache and v not in accessed:
+                        cache[v].get(content)
+        serving_node = nodes[index] if index is not None else None
+        if self.collector is not None and self.session['log']:
+            missed = self.session.setdefault('missed', set())
+            for v in (nodes[:index] if index is not None else nodes):
+                if v in cache and v not in missed:
+                    missed.add(v)
+                    self.collector.cache_miss(v)
+            if serving_node is not None:
+                self.collector.cache_hit(serving_node)
+        return serving_node
+
     def get_content_from_neighbor(self, node):
-        """Get a content from a server or a cache.
+        """Get a content from a server or a cache of a neighbor node.
+
+        If the cache of the node maintains a summary of its content, the
+        digest of the summary seen by neighbors is looked up first and the
+        cache is looked up only if the digest reports the content. Lookups
+        of the summary are reported to the collector and, if the summary does
+        not report the content, no cache miss is reported, since the cache is
+        not queried.
 
         Parameters
         ----------
@@ -611,17 +1541,26 @@ class NetworkController(object):
             True if the content is available, False otherwise
         """
         if node in self.model.cache:
-            cache_hit = self.model.cache[node].get(self.session['content'])
-            cuckoo_hit = self.model.cache[node].get_cuckoo(self.session['content'])
-            if cache_hit:
-                if self.session['log']:
-                    self.collector.cache_hit(node)
+            cache = self.model.cache[node]
+            content = self.session['content']
+            log = self.collector is not None and self.session['log']
+            if hasattr(cache, 'summary'):
+                summary_hit = cache.digest_contains(content)
+                cache_hit = summary_hit and cache.get(content)
+                if log:
+                    self.collector.summary_lookup(node, summary_hit, cache_hit)
+                if not summary_hit:
+                    return False
             else:
-                if self.session['log']:
+                cache_hit = self._cache_get(node, content)
+            if log:
+                if cache_hit:
+                    self.collector.cache_hit(node)
+                else:
                     self.collector.cache_miss(node)
             return cache_hit
-        name, props = fnss.get_stack(self.model.topology, node)
-        if name == 'source' and self.session['content'] in props['contents']:
+        if node in self.model.source_node and \
+                self.session['content'] in self.model.source_node[node]:
             if self.collector is not None and self.session['log']:
                 self.collector.server_hit(node)
             return True
@@ -675,12 +1614,13 @@ class NetworkController(object):
         up, vp : any hashable type
             Endpoints of link after rewiring
         """
+        self._record_change('removed_links', (u, v))
+        self._record_change('restored_links', (up, vp))
         link = self.model.topology.edge[u][v]
         self.model.topology.remove_edge(u, v)
         self.model.topology.add_edge(up, vp, **link)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.repair_paths()
 
     def remove_link(self, u, v, recompute_paths=True):
         """Remove a link from the topology and update the network model.
@@ -702,13 +1642,14 @@ class NetworkController(object):
         v : any hashable type
             Destination node
         recompute_paths: bool, optional
-            If True, recompute all shortest paths
+            If True, repair shortest paths, also after previous changes
+            applied without repairing them
         """
+        self._record_change('removed_links', (u, v))
         self.model.removed_links[(u, v)] = self.model.topology.edge[u][v]
         self.model.topology.remove_edge(u, v)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.repair_paths()
 
     def restore_link(self, u, v, recompute_paths=True):
         """Restore a previously-removed link and update the network model
@@ -720,16 +1661,60 @@ class NetworkController(object):
         v : any hashable type
             Destination node
         recompute_paths: bool, optional
-            If True, recompute all shortest paths
+            If True, repair shortest paths, also after previous changes
+            applied without repairing them
         """
+        self._record_change('restored_links', (u, v))
         self.model.topology.add_edge(u, v, **self.model.removed_links.pop((u, v)))
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.repair_paths()
+
+    def _record_change(self, change, item):
+        """Record a change of the topology, before applying it, to repair
+        shortest paths later"""
+        if self.model.path_repair is None:
+            self.model.path_repair = DynamicShortestPaths(self.model.topology)
+            self.model.shortest_path = self.model.path_repair.paths
+        self._path_changes[change].append(item)
+        self.model.cache_neighbors = None
+        self.model.path_records.clear()
+        self.model.flood_balls.clear()
+
+    def repair_paths(self):
+        """Repair the shortest paths of the network after all the topology
+        changes applied without recomputing paths.
+
+        Only the shortest path trees of the sources affected by the changes
+        are recomputed.
+        """
+        if self._path_changes:
+            self.model.path_repair.update(**self._path_changes)
+            self._path_changes = collections.defaultdict(list)
+            self.model.path_records.clear()
+
+    def update_topology(self, changes):
+        """Apply a batch of topology changes and repair shortest paths once
+        all changes have been applied.
+
+        Parameters
+        ----------
+        changes : iterable of tuples
+            The changes. Each change is a tuple whose first element is the
+            name of the method applying it, i.e. *remove_link*,
+            *restore_link*, *remove_node*, *restore_node* or *rewire_link*,
+            and whose other elements are the arguments of the method, e.g.
+            *('remove_link', u, v)*
+        """
+        for change in changes:
+            if change[0] not in ('remove_link', 'restore_link', 'remove_node',
+                                 'restore_node', 'rewire_link'):
+                raise ValueError('Unknown topology change %s' % str(change[0]))
+            getattr(self, change[0])(*change[1:], recompute_paths=False)
+        self.repair_paths()
 
     def get_neighbors(self, v):
-        """Get the neighbors of node v
-        
+        """Get the neighbors of node v having a cache
+
         Parameters
         ----------
         v : any hashable type
@@ -738,13 +1723,10 @@ class NetworkController(object):
         Return:
         v's neighbors
         """
-        node_neighbors = self.model.topology.neighbors(v)
-        neighbors = []
-        for node in node_neighbors:
-            if node in self.model.cache:
-                neighbors.append(node)
-        
-        return neighbors
+        cache_neighbors = self.model.cache_neighbors
+        if cache_neighbors is None:
+            cache_neighbors = self.model.index_cache_neighbors()
+        return list(cache_neighbors[v])
 
     def remove_node(self, v, recompute_paths=True):
         """Remove a node from the topology and update the network model.
@@ -777,7 +1759,8 @@ class NetworkController(object):
         v : any hashable type
             Node to remove
         recompute_paths: bool, optional
-            If True, recompute all shortest paths
+            If True, repair shortest paths, also after previous changes
+            applied without repairing them
         """
         self.model.removed_nodes[v] = self.model.topology.node[v]
         # First need to remove all links the removed node as endpoint
@@ -785,6 +1768,7 @@ class NetworkController(object):
         self.model.disconnected_neighbors[v] = set(neighbors.keys())
         for u in self.model.disconnected_neighbors[v]:
             self.remove_link(v, u, recompute_paths=False)
+        self._record_change('removed_nodes', v)
         self.model.topology.remove_node(v)
         if v in self.model.cache:
             self.model.removed_caches[v] = self.model.cache.pop(v)
@@ -792,11 +1776,11 @@ class NetworkController(object):
             self.model.removed_local_caches[v] = self.model.local_cache.pop(v)
         if v in self.model.source_node:
             self.model.removed_sources[v] = self.model.source_node.pop(v)
-            for content in self.model.removed_sources[v]:
-                self.model.countent_source.pop(content)
+            if self.model.content_catalog is None:
+                for content in self.model.removed_sources[v]:
+                    self.model.content_source.pop(content)
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.repair_paths()
 
     def restore_node(self, v, recompute_paths=True):
         """Restore a previously-removed node and update the network model.
@@ -806,12 +1790,20 @@ class NetworkController(object):
         v : any hashable type
             Node to restore
         recompute_paths: bool, optional
-            If True, recompute all shortest paths
+            If True, repair shortest paths, also after previous changes
+            applied without repairing them
         """
+        self._record_change('restored_nodes', v)
         self.model.topology.add_node(v, **self.model.removed_nodes.pop(v))
         for u in self.model.disconnected_neighbors[v]:
             if (v, u) in self.model.removed_links:
-                self.restore_link(v, u, recompute_paths=False)
+                if u in self.model.removed_nodes:
+                    # The link is restored when the neighbor is restored
+                    self.model.removed_links[(u, v)] = \
+                            self.model.removed_links.pop((v, u))
+                    self.model.disconnected_neighbors[u].add(v)
+                else:
+                    self.restore_link(v, u, recompute_paths=False)
         self.model.disconnected_neighbors.pop(v)
         if v in self.model.removed_caches:
             self.model.cache[v] = self.model.removed_caches.pop(v)
@@ -819,11 +1811,11 @@ class NetworkController(object):
             self.model.local_cache[v] = self.model.removed_local_caches.pop(v)
         if v in self.model.removed_sources:
             self.model.source_node[v] = self.model.removed_sources.pop(v)
-            for content in self.model.source_node[v]:
-                self.model.countent_source[content] = v
+            if self.model.content_catalog is None:
+                for content in self.model.source_node[v]:
+                    self.model.content_source[content] = v
         if recompute_paths:
-            shortest_path = nx.all_pairs_dijkstra_path(self.model.topology)
-            self.model.shortest_path = symmetrify_paths(shortest_path)
+            self.repair_paths()
 
     def reserve_local_cache(self, ratio=0.1):
         """Reserve a fraction of cache as local.
@@ -843,10 +1835,18 @@ class NetworkController(object):
         """
         if ratio < 0 or ratio > 1:
             raise ValueError("ratio must be between 0 and 1")
+        if self.model.cache_store is not None:
+            raise ValueError('Local caches cannot be reserved if caches are '
+                             'kept in a network-wide store')
         for v, c in list(self.model.cache.items()):
+            args = {'sizes': self.model.content_size} \
+                   if getattr(c, 'byte_capacity', False) else {}
+            for k in c.dump():
+                self.model._content_evicted(v, k)
             maxlen = iround(c.maxlen * (1 - ratio))
             if maxlen > 0:
-                self.model.cache[v] = type(c)(maxlen)
+                self.model.cache[v] = type(c)(maxlen, **args)
+                self.model.index_cache(v)
             else:
                 # If the coordinated cache size is zero, then remove cache
                 # from that location
@@ -854,7 +1854,11 @@ class NetworkController(object):
                     self.model.cache.pop(v)
             local_maxlen = iround(c.maxlen * (ratio))
             if local_maxlen > 0:
-                self.model.local_cache[v] = type(c)(local_maxlen)
+                self.model.local_cache[v] = type(c)(local_maxlen, **args)
+        # Nodes whose coordinated cache was removed are no longer cache
+        # neighbors nor caches on paths
+        self.model.cache_neighbors = None
+        self.model.path_records.clear()
 
     def get_content_local_cache(self, node):
         """Get content from local cache of node (if any)
@@ -14,7 +14,8 @@ class TestLinkLoadCollector(unittest.TestCase):
         link_type = {(1, 2): 'internal', (2, 3): 'external',
                      (2, 1): 'internal', (3, 2): 'external'}
 
-        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)]})()
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: None})()
 
         c = collectors.LinkLoadCollector(view, req_size=req_size, content_size=cont_size)
 
@@ -51,7 +52,8 @@ class TestLinkLoadCollector(unittest.TestCase):
         link_type = {(1, 2): 'internal', (2, 3): 'internal',
                      (2, 1): 'internal', (3, 2): 'internal'}
 
-        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)]})()
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: None})()
 
         c = collectors.LinkLoadCollector(view, req_size=req_size, content_size=cont_size)
 
@@ -81,7 +83,8 @@ class TestLinkLoadCollector(unittest.TestCase):
         link_type = {(1, 2): 'external', (2, 3): 'external',
                      (2, 1): 'external', (3, 2): 'external'}
 
-        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)]})()
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: None})()
 
         c = collectors.LinkLoadCollector(view, req_size=req_size, content_size=cont_size)
 
@@ -104,6 +107,98 @@ class TestLinkLoadCollector(unittest.TestCase):
         self.assertEqual(0, len(ext_load))
 
 
+    def test_content_size(self):
+
+        req_size = 500
+        cont_size = 700
+
+        link_type = {(1, 2): 'internal', (2, 1): 'internal'}
+        content_size = {4: 2000, 5: 100}
+
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: content_size.get(k)})()
+
+        c = collectors.LinkLoadCollector(view, req_size=req_size, content_size=cont_size)
+
+        c.start_session(3.0, 1, 4)
+        c.request_hop(1, 2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        c.start_session(4.0, 1, 5)
+        c.request_hop(1, 2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        c.start_session(5.0, 1, 6)
+        c.request_hop(1, 2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        res = c.results()
+        int_load = res['PER_LINK_INTERNAL']
+        self.assertEqual(3 * req_size / 2, int_load[(1, 2)])
+        self.assertEqual((2000 + 100 + cont_size) / 2, int_load[(2, 1)])
+
+
+    def test_control(self):
+
+        link_type = {(1, 2): 'internal', (2, 1): 'internal'}
+
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: None})()
+
+        c = collectors.LinkLoadCollector(view, req_size=100, content_size=200)
+
+        c.start_session(3.0, 1, 4)
+        c.control_hop(1, 2, 60)
+        c.request_hop(1, 2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        c.start_session(5.0, 1, 4)
+        c.control_hop(2, 1, 40)
+        c.end_session()
+
+        res = c.results()
+        int_load = res['PER_LINK_INTERNAL']
+        self.assertEqual((100 + 60) / 2, int_load[(1, 2)])
+        self.assertEqual((200 + 40) / 2, int_load[(2, 1)])
+        self.assertEqual(100 / 2, res['CONTROL'])
+
+    def test_flood(self):
+
+        link_type = {(1, 2): 'internal', (2, 1): 'internal',
+                     (2, 3): 'internal', (3, 2): 'internal'}
+        balls = {(2, 1): type('MockFloodBall', (), {'links': ((2, 1), (2, 3))})()}
+
+        view = type('MockNetworkView', (), {'link_type': lambda s, u, v: link_type[(u, v)],
+                                            'content_size': lambda s, k: None,
+                                            'flood_ball': lambda s, v, r: balls[(v, r)]})()
+
+        c = collectors.LinkLoadCollector(view, req_size=100, content_size=200)
+
+        c.start_session(3.0, 1, 4)
+        c.request_hop(1, 2)
+        c.flood(2, 1)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        c.start_session(5.0, 1, 4)
+        c.flood(2, 1, 30)
+        c.flood(2, 1, 30)
+        c.end_session()
+
+        res = c.results()
+        int_load = res['PER_LINK_INTERNAL']
+        self.assertEqual(100 / 2, int_load[(1, 2)])
+        self.assertEqual((100 + 200 + 2 * 30) / 2, int_load[(2, 1)])
+        self.assertEqual((100 + 2 * 30) / 2, int_load[(2, 3)])
+        self.assertEqual(2 * 2 * 30 / 2, res['CONTROL'])
+        # Flood loads are not added to the counters of the collector
+        self.assertEqual((100 + 2 * 30) / 2, c.results()['PER_LINK_INTERNAL'][(2, 3)])
+
+
 class TestLatencyCollector(unittest.TestCase):
 
     def test_base(self):
@@ -154,6 +249,39 @@ class TestLatencyCollector(unittest.TestCase):
         res = c.results()
         self.assertEqual((10 + 20 + 2 * (2 + 4)) / 2, res['MEAN'])
 
+    def test_tier_hit(self):
+
+        link_delay = {(1, 2): 2, (2, 1): 4}
+        view = type('MockNetworkView', (), {'link_delay': lambda s, u, v: link_delay[(u, v)]})()
+
+        c = collectors.LatencyCollector(view)
+
+        c.start_session(3.0, 1, 'CONTENT')
+        c.request_hop(1, 2)
+        c.tier_hit(2, 1, 0.5)
+        c.cache_hit(2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        res = c.results()
+        self.assertEqual(2 + 0.5 + 4, res['MEAN'])
+
+    def test_flood(self):
+
+        link_delay = {(1, 2): 2, (2, 1): 4}
+        view = type('MockNetworkView', (), {'link_delay': lambda s, u, v: link_delay[(u, v)]})()
+
+        c = collectors.LatencyCollector(view)
+
+        c.start_session(3.0, 1, 'CONTENT')
+        c.flood(1, 2, 30, 6)
+        c.request_hop(1, 2)
+        c.content_hop(2, 1)
+        c.end_session()
+
+        res = c.results()
+        self.assertEqual(6 + 2 + 4, res['MEAN'])
+
 
 class TestCacheHitRatioCollector(unittest.TestCase):
 
@@ -236,3 +364,58 @@ class TestCacheHitRatioCollector(unittest.TestCase):
 
         res = c.results()
         self.assertEqual({1: 0.5, 2: 0.25}, res['PER_CONTENT'])
+
+    def test_byte_hits(self):
+
+        content_size = {1: 100, 2: 300}
+
+        view = type('MockNetworkView', (), {'content_size': lambda s, k: content_size.get(k)})()
+
+        c = collectors.CacheHitRatioCollector(view, byte_hits=True)
+
+        c.start_session(3.0, 'RECV', 1)
+        c.cache_hit(1)
+        c.end_session()
+
+        c.start_session(4.0, 'RECV', 2)
+        c.server_hit(2)
+        c.end_session()
+
+        res = c.results()
+        self.assertEqual(0.5, res['MEAN'])
+        self.assertEqual(0.25, res['BYTE_HIT_RATIO'])
+
+
+class TestCacheSummaryCollector(unittest.TestCase):
+
+    def test_base(self):
+
+        summary = type('MockSummary', (), {'get_memory': lambda s: 64,
+                                           'overflows': 1})()
+        summaries = {1: summary, 2: summary, 3: None}
+
+        view = type('MockNetworkView', (), {'cache_nodes': lambda s: [1, 2, 3],
+                                            'cache_summary': lambda s, v: summaries[v]})()
+
+        c = collectors.CacheSummaryCollector(view)
+
+        c.start_session(3.0, 'RECV', 1)
+        c.summary_lookup(1, True, True)
+        c.summary_lookup(2, True, False)
+        c.end_session()
+
+        c.start_session(4.0, 'RECV', 2)
+        c.summary_lookup(1, False, False)
+        c.summary_lookup(2, False, False)
+        c.end_session()
+
+        res = c.results()
+        self.assertEqual(4, res['LOOKUPS'])
+        self.assertEqual(2, res['SAVED_LOOKUPS'])
+        self.assertEqual(1, res['FALSE_POSITIVES'])
+        self.assertAlmostEqual(1 / 3, res['FALSE_POSITIVE_RATE'])
+        self.assertEqual({1: 64, 2: 64}, res['PER_NODE_MEMORY'])
+        self.assertEqual(64, res['MEAN_MEMORY'])
+        self.assertEqual(2, res['OVERFLOWS'])
+        self.assertEqual({1: 2, 2: 2}, res['PER_NODE_LOOKUPS'])
+        self.assertEqual({2: 1}, res['PER_NODE_FALSE_POSITIVES'])
@@ -5,7 +5,9 @@ import networkx as nx
 import fnss
 
 from icarus.scenarios import IcnTopology
+import icarus.scenarios.contentplacement as contentplacement
 from icarus.execution.collectors import TestCollector
+import icarus.models.cache as cache
 
 import icarus.execution.network as network
 
@@ -20,6 +22,60 @@ class TestSymmetrifyPaths(unittest.TestCase):
         network.symmetrify_paths(path)
         self.assertEqual(list(path[1][5]), list(reversed(path[5][1])))
 
+
+class TestDynamicShortestPaths(unittest.TestCase):
+
+    def assert_shortest(self, topology, dsp):
+        length = dict(nx.all_pairs_dijkstra_path_length(topology))
+        for s in topology.nodes():
+            self.assertEqual(set(length[s]), set(dsp.paths[s]))
+            for t, path in dsp.paths[s].items():
+                self.assertEqual((s, t), (path[0], path[-1]))
+                self.assertEqual(length[s][t], sum(topology.edge[u][v]['weight']
+                                                   for u, v in zip(path[:-1], path[1:])))
+                self.assertEqual(list(reversed(path)), dsp.paths[t][s])
+
+    def test_update(self):
+        topology = fnss.Topology(nx.connected_watts_strogatz_graph(40, 4, 0.3, seed=1))
+        for i, (u, v) in enumerate(sorted(topology.edges())):
+            topology.edge[u][v]['weight'] = 1 + i % 3
+        dsp = network.DynamicShortestPaths(topology)
+        self.assert_shortest(topology, dsp)
+        links = sorted(topology.edges())[::5]
+        attrs = [dict(topology.edge[u][v]) for u, v in links]
+        topology.remove_edges_from(links)
+        dsp.update(removed_links=links)
+        self.assert_shortest(topology, dsp)
+        topology.add_edges_from((u, v, a) for (u, v), a in zip(links, attrs))
+        dsp.update(restored_links=links)
+        self.assert_shortest(topology, dsp)
+        node_links = [(3, v, dict(topology.edge[3][v])) for v in topology.edge[3]]
+        topology.remove_node(3)
+        affected = dsp.update(removed_nodes=[3],
+                              removed_links=[(3, v) for _, v, _ in node_links])
+        self.assert_shortest(topology, dsp)
+        self.assertNotIn(3, dsp.paths)
+        self.assertLess(len(affected), len(topology))
+        topology.add_node(3)
+        topology.add_edges_from(node_links)
+        dsp.update(restored_nodes=[3],
+                   restored_links=[(3, v) for _, v, _ in node_links])
+        self.assert_shortest(topology, dsp)
+
+    def test_disconnected(self):
+        topology = fnss.Topology()
+        topology.add_path([1, 2, 3, 4], weight=1)
+        dsp = network.DynamicShortestPaths(topology)
+        topology.remove_edge(2, 3)
+        self.assertEqual({1, 2, 3, 4}, dsp.update(removed_links=[(2, 3)]))
+        self.assertNotIn(4, dsp.paths[1])
+        self.assertNotIn(1, dsp.paths[4])
+        topology.add_edge(2, 3, weight=1)
+        dsp.update(restored_links=[(2, 3)])
+        self.assertEqual([1, 2, 3, 4], dsp.paths[1][4])
+        self.assertEqual([4, 3, 2, 1], dsp.paths[4][1])
+
+
 class TestNetworkMvc(unittest.TestCase):
 
     @classmethod
@@ -52,6 +108,255 @@ class TestNetworkMvc(unittest.TestCase):
         self.collector = TestCollector(self.view)
         self.controller.attach_collector(self.collector)
 
+    def test_byte_capacity_cache(self):
+        content_size = {1: 100, 2: 200, 3: 300}
+        model = network.NetworkModel(self.topology, cache_policy={'name': 'BYTE_LRU'},
+                                     content_size=content_size)
+        view = network.NetworkView(model)
+        self.assertEqual(200, view.content_size(2))
+        self.assertEqual(200, view.cache_nodes(size=True)[1])
+        self.assertIs(None, self.view.content_size(2))
+
+    def test_admission_cache(self):
+        model = network.NetworkModel(self.topology,
+                                     cache_policy={'name': 'LRU',
+                                                   'admission': {'name': 'K_HITS', 'k': 2}})
+        controller = network.NetworkController(model)
+        controller.start_session(0, 0, 1, False)
+        controller.put_content(1)
+        self.assertFalse(model.cache[1].has(1))
+        controller.put_content(1)
+        self.assertTrue(model.cache[1].has(1))
+        self.assertFalse(model.cache[2].has(1))
+
+    def test_cache_store(self):
+        model = network.NetworkModel(self.topology, cache_policy={'name': 'LRU'},
+                                     cache_store=True)
+        view = network.NetworkView(model)
+        controller = network.NetworkController(model)
+        controller.start_session(0, 0, 1, False)
+        controller.put_content(3)
+        self.assertEqual(3, view.first_cache_hit([0, 1, 2, 3, 4], 1))
+        self.assertTrue(view.cache_lookup(3, 1))
+        self.assertIsNone(view.first_cache_hit([0, 1, 2, 3, 4], 2))
+        self.assertRaises(ValueError, network.NetworkModel, self.topology,
+                          {'name': 'FIFO'}, cache_store=True)
+
+    def test_cache_summary(self):
+        model = network.NetworkModel(self.topology,
+                                     cache_policy={'name': 'LRU', 'summary': True})
+        view = network.NetworkView(model)
+        controller = network.NetworkController(model)
+        collector = TestCollector(view)
+        controller.attach_collector(collector)
+        self.assertIsNotNone(view.cache_summary(1))
+        self.assertIsNone(view.cache_summary(0))
+        self.assertIsNone(self.view.cache_summary(1))
+        controller.start_session(0, 0, 1, True)
+        controller.put_content(2)
+        self.assertTrue(controller.get_content_from_neighbor(2))
+        self.assertFalse(controller.get_content_from_neighbor(3))
+        summary = collector.session_summary()
+        self.assertEqual(2, summary['serving_node'])
+        self.assertEqual([], summary['cache_misses'])
+
+    def test_summary_broadcast(self):
+        model = network.NetworkModel(self.topology,
+                                     cache_policy={'name': 'LRU',
+                                                   'summary': {'interval': 2}})
+        controller = network.NetworkController(model)
+        collector = type('MockCollector', (), {})()
+        collector.control = []
+        collector.start_session = lambda t, r, c: None
+        collector.control_hop = lambda u, v, size: collector.control.append((u, v, size))
+        controller.attach_collector(collector)
+        controller.start_session(0, 0, 1, True)
+        controller.put_content(2)
+        self.assertFalse(model.cache[2].digest_contains(1))
+        self.assertEqual([], collector.control)
+        controller.start_session(1, 0, 1, True)
+        self.assertTrue(model.cache[2].digest_contains(1))
+        size = model.cache[2].summary.item_fingerprint_size + \
+               model.cache[2].delta_index_size
+        self.assertEqual(sorted([(2, 1, size), (2, 3, size)]),
+                         sorted(collector.control))
+        self.assertRaises(ValueError, network.NetworkModel, self.topology,
+                          {'name': 'LRU', 'summary': {'interval': 2, 'update': 'foo'}})
+
+    def test_lookup_many(self):
+        self.controller.start_session(0, 0, 1, True)
+        self.controller.put_content(3)
+        self.assertEqual(3, self.controller.lookup_many([1, 2, 3, 4]))
+        summary = self.collector.session_summary()
+        self.assertEqual([1, 2], summary['cache_misses'])
+        self.assertEqual(3, summary['serving_node'])
+        self.assertIsNone(self.controller.lookup_many([2, 1, 5]))
+        self.assertEqual([1, 2, 5], summary['cache_misses'])
+        self.assertRaises(ValueError, self.controller.lookup_many, [1], 1, 'first')
+
+    def test_lookup_many_cache_store(self):
+        model = network.NetworkModel(self.topology, cache_policy={'name': 'LRU'},
+                                     cache_store=True)
+        controller = network.NetworkController(model)
+        collector = TestCollector(network.NetworkView(model))
+        controller.attach_collector(collector)
+        controller.start_session(0, 0, 1, True)
+        controller.put_content(2)
+        controller.put_content(3)
+        self.assertEqual(2, controller.lookup_many([0, 1, 2, 3]))
+        self.assertEqual([1], collector.session_summary()['cache_misses'])
+        self.assertIsNone(controller.lookup_many([5, 6], update='none'))
+
+    def test_tiered_cache(self):
+        tiers = [{'name': 'LRU', 'size': 0.5, 'latency': 0.1},
+                 {'name': 'FIFO', 'size': 0.5, 'latency': 2}]
+        model = network.NetworkModel(self.topology,
+                                     cache_policy={'name': 'PATH', 'tiers': tiers})
+        controller = network.NetworkController(model)
+        tier_hits = []
+        collector = type('TierCollector', (TestCollector,),
+                         {'tier_hit': lambda s, *args: tier_hits.append(args)})(
+                                network.NetworkView(model))
+        controller.attach_collector(collector)
+        controller.start_session(0, 0, 1, True)
+        controller.put_content(1)
+        self.assertTrue(controller.get_content(1))
+        model.cache[1]._caches[0].remove(1)
+        self.assertTrue(controller.get_content(1))
+        self.assertEqual([(1, 0, 0.1), (1, 1, 2)], tier_hits)
+        self.assertEqual(1, controller.lookup_many([2, 1]))
+        self.assertEqual((1, 0, 0.1), tier_hits[-1])
+        # Tier latency is reported whichever caches are updated
+        model.cache[1]._caches[0].remove(1)
+        self.assertEqual(1, controller.lookup_many([2, 1], update='none'))
+        self.assertEqual((1, 1, 2), tier_hits[-1])
+        self.assertFalse(model.cache[1]._caches[0].has(1))
+        self.assertEqual(1, controller.lookup_many([2, 1], update='all'))
+        self.assertEqual((1, 1, 2), tier_hits[-1])
+        self.assertTrue(model.cache[1]._caches[0].has(1))
+        self.assertEqual(5, len(tier_hits))
+        self.assertRaises(ValueError, network.NetworkModel, self.topology,
+                          {'name': 'PATH', 'tiers': tiers, 'summary': True})
+
+    def test_cache_policy_overrides(self):
+        model = network.NetworkModel(self.topology, cache_policy={
+                    'name': 'LRU',
+                    'roles': {'core': {'name': 'IN_CACHE_LFU'}},
+                    'nodes': {5: {'name': 'FIFO'}}})
+        self.assertEqual('LRU', model.cache_policy[1]['name'])
+        self.assertIsInstance(model.cache[1], cache.LruCache)
+        self.assertIsInstance(model.cache[2], cache.InCacheLfuCache)
+        self.assertIsInstance(model.cache[5], cache.FifoCache)
+        self.assertRaises(ValueError, network.NetworkModel, self.topology,
+                          {'name': 'LRU', 'nodes': {5: {'name': 'FIFO'}}},
+                          cache_store=True)
+
+    def test_content_locations(self):
+        self.controller.start_session(0, 0, 1, True)
+        self.controller.put_content(1)
+        self.controller.put_content(2)
+        self.assertEqual({1, 2, 4}, self.view.content_locations(1))
+        self.controller.start_session(1, 0, 2, True)
+        self.controller.put_content(2)
+        self.assertEqual({1, 4}, self.view.content_locations(1))
+        self.assertEqual({2, 4}, self.view.content_locations(2))
+        self.controller.remove_content(2)
+        self.assertEqual({4}, self.view.content_locations(2))
+        self.controller.start_session(2, 0, 1, True)
+        self.controller.remove_node(1, recompute_paths=False)
+        self.assertEqual({4}, self.view.content_locations(1))
+
+    def test_content_location_bitmap(self):
+        self.controller.start_session(0, 0, 1, True)
+        self.controller.put_content(1)
+        nodes = self.view.location_nodes()
+        self.assertEqual({1, 2, 3, 5, 6, 7, 8}, set(nodes))
+
+        def located(k):
+            bitmap = self.view.content_location_bitmap(k)
+            return None if bitmap is None else \
+                   set(v for v, b in zip(nodes, bitmap) if b)
+        self.assertEqual({1}, located(1))
+        self.controller.put_content(2)
+        self.assertEqual({1, 2}, located(1))
+        self.assertIsNone(located(2))
+        self.controller.start_session(1, 0, 2, True)
+        self.controller.put_content(2)
+        self.assertEqual({1}, located(1))
+        self.assertEqual({2}, located(2))
+        self.controller.remove_node(1, recompute_paths=False)
+        self.assertIsNone(located(1))
+        self.controller.restore_node(1, recompute_paths=False)
+        self.assertEqual({1}, located(1))
+
+    def test_flood_ball(self):
+        ball = self.view.flood_ball(1, 2)
+        self.assertEqual({1: 0, 0: 1, 2: 1, 5: 1, 3: 2, 6: 2}, ball.hops)
+        self.assertEqual({(1, 0), (1, 2), (1, 5), (2, 3), (5, 6)},
+                         set(ball.links))
+        self.assertIs(ball, self.view.flood_ball(1, 2))
+        # Nodes 6 and 7 are both reached after 3 hops and flood each other
+        ball = self.view.flood_ball(2, 4)
+        self.assertEqual(3, ball.hops[7])
+        self.assertEqual(10, len(ball.links))
+        self.assertIn((6, 7), ball.links)
+        self.assertIn((7, 6), ball.links)
+        self.controller.remove_link(2, 3)
+        ball = self.view.flood_ball(1, 2)
+        self.assertEqual({1: 0, 0: 1, 2: 1, 5: 1, 6: 2}, ball.hops)
+        self.assertEqual({(1, 0), (1, 2), (1, 5), (5, 6)}, set(ball.links))
+
+    def test_cache_neighbors(self):
+        self.assertEqual((2, 5), self.view.cache_neighbors(1))
+        self.assertEqual((1,), self.view.cache_neighbors(0))
+        self.assertEqual([2, 5], self.controller.get_neighbors(1))
+        self.controller.remove_node(2)
+        self.assertEqual((5,), self.view.cache_neighbors(1))
+        self.controller.remove_link(1, 5)
+        self.assertEqual((), self.view.cache_neighbors(1))
+        self.controller.restore_link(1, 5)
+        self.controller.restore_node(2)
+        self.assertEqual({2, 5}, set(self.view.cache_neighbors(1)))
+
+    def test_content_catalog(self):
+        topology = self.build_topology()
+        contentplacement.uniform_content_placement(topology, range(1, 4),
+                                                   catalog='hash')
+        model = network.NetworkModel(topology, cache_policy={'name': 'FIFO'})
+        view = network.NetworkView(model)
+        controller = network.NetworkController(model)
+        self.assertEqual({}, model.content_source)
+        self.assertEqual(4, view.content_source(2))
+        self.assertIsNone(view.content_source(4))
+        controller.start_session(1, 0, 2, False)
+        self.assertTrue(controller.get_content(4))
+        self.assertFalse(controller.get_content(3))
+        controller.end_session()
+        controller.remove_node(4)
+        self.assertIsNone(view.content_source(2))
+        controller.restore_node(4)
+        self.assertEqual(4, view.content_source(2))
+
+    def test_path_record(self):
+        record = self.view.path_record(0, 4)
+        self.assertEqual((0, 1, 2, 3, 4), record.path)
+        self.assertEqual((1, 2, 3), record.cache_nodes)
+        self.assertEqual((1, 2, 3), record.cache_positions)
+        self.assertEqual(3, record.position[3])
+        self.assertEqual(1, record.edge_cache)
+        self.assertIs(record, self.view.path_record(0, 4))
+        self.assertIsNone(self.view.path_record(0, 0).edge_cache)
+        self.controller.remove_link(2, 3)
+        record = self.view.path_record(0, 4)
+        self.assertEqual((0, 1, 5, 6, 7, 8, 3, 4), record.path)
+        self.assertEqual((1, 5, 6, 7, 8, 3), record.cache_nodes)
+        self.controller.remove_node(1)
+        self.controller.restore_node(1)
+        self.assertEqual((1, 5, 6, 7, 8, 3),
+                         self.view.path_record(0, 4).cache_nodes)
+        self.controller.reserve_local_cache(1)
+        self.assertEqual((), self.view.path_record(0, 4).cache_nodes)
+
     def test_remove_restore_link(self):
         self.assertEqual([0, 1, 2, 3, 4], self.view.shortest_path(0, 4))
         self.assertEqual(1, self.topology.edge[2][3]['a'])
@@ -93,3 +398,14 @@ class TestNetworkMvc(unittest.TestCase):
         self.controller.rewire_link(1, 8, 1, 5, recompute_paths=True)
         self.assertEqual([0, 1, 2, 3, 4], self.view.shortest_path(0, 4))
         self.assertEqual(1, self.topology.edge[2][3]['a'])
+
+    def test_update_topology(self):
+        self.controller.update_topology([('remove_link', 2, 3),
+                                         ('remove_node', 6)])
+        self.assertNotIn(4, self.view.all_pairs_shortest_paths()[0])
+        self.controller.update_topology([('restore_node', 6)])
+        self.assertEqual([0, 1, 5, 6, 7, 8, 3, 4], self.view.shortest_path(0, 4))
+        self.controller.update_topology([('restore_link', 2, 3)])
+        self.assertEqual([0, 1, 2, 3, 4], self.view.shortest_path(0, 4))
+        self.assertRaises(ValueError, self.controller.update_topology,
+                          [('fail_link', 2, 3)])
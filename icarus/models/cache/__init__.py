@@ -1,2 +1,6 @@
 from .policies import *
+from .admission import *
+from .summary import *
+from .hooks import *
 from .systems import *
+from .store import *
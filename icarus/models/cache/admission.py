@@ -0,0 +1,340 @@
+"""Cache admission policies implementations
+
+This module contains the implementations of cache admission policies, which
+decide whether an item is inserted in a cache, independently of the cache
+replacement policy deciding which item is evicted.
+
+An admission policy is combined with a cache replacement policy by the
+`admission_cache` function, which returns a new cache class deriving from
+both. Instances of this class are regular caches whose *put* method first
+checks whether the item is admitted and then inserts it according to the
+replacement policy. All other methods are those of the replacement policy.
+
+Admission policies can be selected in the cache policy configuration, for
+example::
+
+    cache_policy = {'name': 'LRU', 'admission': {'name': 'K_HITS', 'k': 2}}
+"""
+from __future__ import division
+import itertools
+import random
+
+import numpy as np
+
+from icarus.registry import register_cache_admission, CACHE_ADMISSION, \
+                            CACHE_POLICY
+from .policies import LinkedSet
+from icarus.util import key_to_int, mix64
+
+
+__all__ = [
+        'AdmissionPolicy',
+        'KHitsAdmission',
+        'ProbabilisticAdmission',
+        'SketchAdmission',
+        'admission_cache',
+           ]
+
+
+class AdmissionPolicy(object):
+    """Base implementation of a cache admission policy.
+
+    Admission policies are not caches themselves and are meant to be combined
+    with a cache replacement policy using the `admission_cache` function.
+    Subclasses must implement the *init_admission* method, initializing the
+    state of the admission policy, and override the *put* method, calling the
+    *put* method of the replacement policy only for admitted items.
+    """
+
+    # Arguments of the admission policy, bound by admission_cache
+    admission_args = {}
+
+    # Counter of the instances of the class, bound by admission_cache
+    _admission_ids = itertools.count()
+
+    def __init__(self, maxlen, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of items the cache can store
+        *args, **kwargs
+            Arguments of the cache replacement policy
+        """
+        super(AdmissionPolicy, self).__init__(maxlen, *args, **kwargs)
+        # Position of the cache among the instances of its class
+        self.admission_id = next(self._admission_ids)
+        self.init_admission(**self.admission_args)
+
+    def init_admission(self, **kwargs):
+        """Initialize the state of the admission policy
+
+        Parameters
+        ----------
+        **kwargs
+            Arguments of the admission policy
+        """
+        raise NotImplementedError('This method is not implemented')
+
+    def clear_admission(self):
+        """Reset the state of the admission policy"""
+        self.init_admission(**self.admission_args)
+
+    def clear(self):
+        """Empty the cache and reset the state of the admission policy"""
+        super(AdmissionPolicy, self).clear()
+        self.clear_admission()
+
+
+@register_cache_admission('K_HITS')
+class KHitsAdmission(AdmissionPolicy):
+    """Admission policy inserting items only at the k-th request.
+
+    Requests for items not yet admitted are counted in a metacache storing
+    only the reference to each item and its number of requests. The metacache
+    is a FIFO queue of size *memory*, or is unbounded if *memory* is None.
+    """
+
+    def init_admission(self, k=2, memory=None):
+        """Initialize the state of the admission policy
+
+        Parameters
+        ----------
+        k : int, optional
+            The number of requests after which the item is inserted
+        memory : int, optional
+            The size of the metacache counting the requests of items not yet
+            inserted
+        """
+        if k < 1:
+            raise ValueError('k must be positive')
+        if memory is not None and memory < 1:
+            raise ValueError('memory must be positive')
+        self._admission_k = k
+        self._admission_memory = memory
+        self._admission_hits = {}
+        self._admission_queue = LinkedSet() if memory is not None else None
+
+    def put(self, k, force_insert=False, *args, **kwargs):
+        """Insert an item in the cache if it has been requested at least *k*
+        times, or if already inserted.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+        force_insert : bool, optional
+            If *True*, the item is inserted regardless of its number of
+            requests
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        hits = self._admission_hits
+        if k in hits:
+            hits[k] += 1
+            if hits[k] < self._admission_k and not force_insert:
+                return None
+            del hits[k]
+            if self._admission_queue is not None:
+                self._admission_queue.remove(k)
+        elif not force_insert and self._admission_k > 1 and not self.has(k):
+            hits[k] = 1
+            if self._admission_queue is not None:
+                self._admission_queue.append_top(k)
+                if len(self._admission_queue) > self._admission_memory:
+                    del hits[self._admission_queue.pop_bottom()]
+            return None
+        return super(KHitsAdmission, self).put(k, *args, **kwargs)
+
+
+@register_cache_admission('PROB')
+class ProbabilisticAdmission(AdmissionPolicy):
+    """Admission policy inserting items with a fixed probability.
+
+    Each cache instance has its own random number generator. Its seed is
+    derived from the seed of the policy and the order in which the cache was
+    created among the caches of its class, so that caches sharing a seed do
+    not admit items in lockstep, while admissions remain reproducible.
+    """
+
+    def init_admission(self, p=0.5, seed=None):
+        """Initialize the state of the admission policy
+
+        Parameters
+        ----------
+        p : float, optional
+            The insertion probability
+        seed : any hashable type, optional
+            The seed from which the seed of the random number generator of
+            each cache is derived
+        """
+        if p < 0 or p > 1:
+            raise ValueError('p must be a value between 0 and 1')
+        self._admission_p = p
+        if seed is not None:
+            seed = mix64(key_to_int(seed) ^ self.admission_id)
+        self._admission_random = random.Random(seed).random
+
+    def put(self, k, *args, **kwargs):
+        """Insert an item in the cache with probability *p*.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        if self._admission_random() < self._admission_p:
+            return super(ProbabilisticAdmission, self).put(k, *args, **kwargs)
+        return None
+
+
+@register_cache_admission('SKETCH')
+class SketchAdmission(AdmissionPolicy):
+    """Admission policy inserting items whose estimated number of recent
+    requests reaches a threshold.
+
+    The number of requests of each item is estimated with a count-min sketch
+    of *depth* rows of *width* counters each, stored in a numpy array. Unlike
+    the K_HITS admission policy, memory does not depend on the number of
+    distinct items requested. Every *window* requests all counters are halved,
+    so that only recent requests are taken into account. Counters are
+    selected with hash functions which do not depend on the hash seed of the
+    interpreter, so that admissions are reproducible.
+
+    References
+    ----------
+    G. Einziger, R. Friedman, B. Manes, TinyLFU: a highly efficient cache
+    admission policy, ACM Transactions on Storage, 13(4), 2017
+    """
+
+    def init_admission(self, k=2, width=None, depth=4, window=None):
+        """Initialize the state of the admission policy
+
+        Parameters
+        ----------
+        k : int, optional
+            The estimated number of requests after which the item is inserted
+        width : int, optional
+            The number of counters of each row of the sketch. If not
+            specified, it is equal to 4 times the cache size, up to 2^20
+        depth : int, optional
+            The number of rows of the sketch
+        window : int, optional
+            The number of requests after which counters are halved. If not
+            specified, it is equal to 10 times the cache size
+        """
+        if k < 1:
+            raise ValueError('k must be positive')
+        width = min(max(16, 4 * self.maxlen), 2 ** 20) if width is None \
+                else int(width)
+        window = 10 * self.maxlen if window is None else int(window)
+        if width < 1 or depth < 1 or window < 1:
+            raise ValueError('width, depth and window must be positive')
+        self._admission_k = k
+        self._admission_width = width
+        self._admission_rows = np.arange(depth)
+        # Seed of the hash function of each row
+        self._admission_seeds = [mix64(i) for i in range(depth)]
+        self._admission_counters = np.zeros((depth, width), dtype=np.uint32)
+        self._admission_window = window
+        self._admission_count = 0
+
+    def estimate(self, k):
+        """Return the estimated number of recent requests of an item.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item
+
+        Returns
+        -------
+        count : int
+            The estimated number of requests
+        """
+        cols = self._admission_cols(k)
+        return int(self._admission_counters[self._admission_rows, cols].min())
+
+    def _admission_cols(self, k):
+        """Return the counter of an item in each row of the sketch"""
+        h = key_to_int(k)
+        return [mix64(h ^ seed) % self._admission_width
+                for seed in self._admission_seeds]
+
+    def put(self, k, *args, **kwargs):
+        """Insert an item in the cache if its estimated number of recent
+        requests reaches *k*, or if already inserted.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        if not self.has(k):
+            rows = self._admission_rows
+            cols = self._admission_cols(k)
+            counters = self._admission_counters
+            counters[rows, cols] += 1
+            self._admission_count += 1
+            admit = counters[rows, cols].min() >= self._admission_k
+            if self._admission_count >= self._admission_window:
+                counters >>= 1
+                self._admission_count = 0
+            if not admit:
+                return None
+        return super(SketchAdmission, self).put(k, *args, **kwargs)
+
+
+def admission_cache(policy, admission, **kwargs):
+    """Return a cache class applying an admission policy to a cache
+    replacement policy.
+
+    The returned class derives from both the admission policy class and the
+    replacement policy class, so that its instances can be used as any other
+    cache, without wrapping or patching their methods.
+
+    Parameters
+    ----------
+    policy : str or type
+        The cache replacement policy class or its name
+    admission : str, dict or type
+        The admission policy class or its name or a dictionary with the name
+        of the admission policy (key *name*) and its arguments
+    **kwargs
+        Arguments of the admission policy
+
+    Returns
+    -------
+    cache_class : type
+        The cache class
+    """
+    if isinstance(admission, dict):
+        kwargs = dict(admission, **kwargs)
+        admission = kwargs.pop('name')
+    if not isinstance(admission, type):
+        if admission not in CACHE_ADMISSION:
+            raise ValueError('No admission policy named %s' % str(admission))
+        admission = CACHE_ADMISSION[admission]
+    if not isinstance(policy, type):
+        if policy not in CACHE_POLICY:
+            raise ValueError('No cache policy named %s' % str(policy))
+        policy = CACHE_POLICY[policy]
+    if not issubclass(admission, AdmissionPolicy):
+        raise TypeError('admission must be a subclass of AdmissionPolicy')
+    name = admission.__name__.replace('Admission', '') + policy.__name__
+    return type(name, (admission, policy), {'admission_args': kwargs,
+                                            '_admission_ids': itertools.count()})
@@ -1,2 +1,3 @@
 from .cuckoofilter import CuckooFilter
-from .counting_bloom_filter import CountingBloomFilter
\ No newline at end of file
+from .counting_bloom_filter import CountingBloomFilter
+from icarus.util import key_to_int, keys_to_array, mix64, mix64_many
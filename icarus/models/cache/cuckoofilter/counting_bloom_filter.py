@@ -1,10 +1,12 @@
 """
-This file is a copy paste of the counting bloom filter 
+This file is derived from the counting bloom filter
 implementation in https://github.com/mynameisfiber/fuggetaboutit
 
-See that repository for implementations details, further tests etc. 
+Counters are 4-bit saturating counters packed two per byte and the counters
+of batches of keys are computed, updated and looked up with vectorized numpy
+operations. Integer keys are hashed directly (see `icarus.util.key_to_int`).
 """
-
+from __future__ import division
 import logging
 import os
 import json
@@ -12,14 +14,27 @@ import shutil
 
 import numpy as np
 import math
-import mmh3
 
-#from .exceptions import PersistenceDisabledException
+from icarus.util import keys_to_array, mix64_many
+
+
+__all__ = [
+    'CountingBloomFilter',
+    'PersistenceDisabledException',
+           ]
 
 
 BLOOM_FILENAME = 'bloom.npy'
 META_FILENAME = 'meta.json'
 
+# Maximum value of a counter, at which it saturates
+COUNTER_MAX = 15
+
+
+class PersistenceDisabledException(Exception):
+    """Exception raised when saving a filter without a data path"""
+    pass
+
 
 def remove_recursive(path):
     if os.path.isdir(path):
@@ -29,16 +44,44 @@ def remove_recursive(path):
 
 
 class CountingBloomFilter(object):
-    _ENTRIES_PER_8BYTE = 1
-
-    def __init__(self, capacity, data_path=None, error=0.005, id=None):
+    """Counting Bloom filter with 4-bit counters packed two per byte.
+
+    Counter *j* is stored in the low nibble of byte *j // 2* if *j* is even
+    and in its high nibble otherwise. Counters saturate at 15. Saturated
+    counters are not decremented when a key is removed, since their actual
+    value is unknown, but they are decremented by `remove_all`, which ages
+    all counters.
+    """
+    _COUNTERS_PER_BYTE = 2
+
+    def __init__(self, capacity, data_path=None, error=0.005, id=None,
+                 mmap=False):
+        """Constructor
+
+        Parameters
+        ----------
+        capacity : int
+            The number of keys the filter is sized for
+        data_path : str, optional
+            The directory where the filter is saved. If it already stores a
+            saved filter, its counters are loaded
+        error : float, optional
+            The target false positive probability at full capacity
+        id : any JSON serializable type, optional
+            Identifier of the filter, saved with its metadata
+        mmap : bool, optional
+            If *True*, saved counters are memory-mapped rather than read in
+            memory, so that updates are written directly to the saved file
+        """
         self.capacity = capacity
         self.error = error
         self.data_path = data_path
         self.id = id
 
-        self.num_bytes = int(-capacity * math.log(error) / math.log(2)**2) + 1
-        self.num_hashes = int(self.num_bytes / capacity * math.log(2)) + 1
+        self.num_counters = int(-capacity * math.log(error) / math.log(2)**2) + 1
+        self.num_hashes = int(self.num_counters / capacity * math.log(2)) + 1
+        self.num_bytes = int(
+            math.ceil(self.num_counters / float(self._COUNTERS_PER_BYTE)))
 
         bloom_filename = None
 
@@ -47,80 +90,124 @@ class CountingBloomFilter(object):
             bloom_filename = os.path.join(data_path, BLOOM_FILENAME)
 
         if bloom_filename and os.path.exists(bloom_filename):
-            self.data = np.load(bloom_filename)
-            self.num_non_zero = np.count_nonzero(self.data)
+            self.data = np.load(bloom_filename,
+                                mmap_mode='r+' if mmap else None)
+            if self.data.shape != (self.num_bytes,) or self.data.dtype != np.uint8:
+                raise ValueError('The saved counters do not match the '
+                                 'capacity and error of the filter')
+            self.num_non_zero = int(np.count_nonzero(self.data & 0x0F) +
+                                    np.count_nonzero(self.data >> 4))
         else:
-            size = int(
-                math.ceil(self.num_bytes / float(self._ENTRIES_PER_8BYTE)))
-            self.data = np.zeros((size,), dtype=np.uint8, order='C')
+            self.data = np.zeros((self.num_bytes,), dtype=np.uint8, order='C')
             self.num_non_zero = 0
 
+    def get_indexes_many(self, keys):
+        """
+        Generates the matrix of the indicies corresponding to the given keys,
+        with a row per key and a column per hash function
+        """
+        h1 = mix64_many(keys_to_array(keys))
+        h2 = mix64_many(h1) | np.uint64(1)
+        i = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            indexes = (h1[:, np.newaxis] + i * h2[:, np.newaxis]) % \
+                      np.uint64(self.num_counters)
+        return indexes.astype(np.int64)
+
     def get_indexes(self, key):
         """
         Generates the indicies corresponding to the given key
         """
-        h1, h2 = mmh3.hash64(key)
-        for i in range(self.num_hashes):
-            yield (h1 + i * h2) % self.num_bytes
+        return self.get_indexes_many([key])[0]
 
-    def add(self, key, N=1):
+    def get_counters(self, indexes):
         """
-        Adds `N` counts to the indicies given by the key
+        Returns the values of the counters at the given indicies
         """
-        assert isinstance(key, str)
-        for index in self.get_indexes(key):
-            self.num_non_zero += (self.data[index] == 0)
-            self.data[index] += N
+        indexes = np.asarray(indexes)
+        return (self.data[indexes >> 1] >> ((indexes & 1) << 2)) & 0x0F
 
-    def decrement_bucket(self, index, N=1):
+    def _set_counters(self, indexes, values):
         """
-        Safely and efficiently decrements the value of a given bucket
+        Sets the values of the counters at the given (unique) indicies
         """
-        data = self.data
-        old_value = data[index]
-        new_value = 0
-
-        if old_value == 0:
-            return 0
-
-        if old_value <= N:
-            new_value = 0
-            self.num_non_zero -= 1
+        # Counters sharing a byte are written in two separate passes
+        for nibble in (0, 1):
+            sel = (indexes & 1) == nibble
+            byte = indexes[sel] >> 1
+            shift = 4 * nibble
+            self.data[byte] = (self.data[byte] & (0xF0 >> shift)) | \
+                              (values[sel].astype(np.uint8) << shift)
+
+    def _update(self, indexes, delta):
+        """
+        Adds `delta` counts for each occurrence of an index, saturating at
+        15 and flooring at 0
+        """
+        indexes, counts = np.unique(indexes, return_counts=True)
+        old = self.get_counters(indexes).astype(np.int64)
+        if delta > 0:
+            new = np.minimum(old + delta * counts, COUNTER_MAX)
         else:
-            new_value = old_value - N
+            new = np.where(old == COUNTER_MAX, old,
+                           np.maximum(old + delta * counts, 0))
+        self.num_non_zero += int(np.count_nonzero(new) - np.count_nonzero(old))
+        self._set_counters(indexes, new)
+
+    def add(self, key, N=1):
+        """
+        Adds `N` counts to the indicies given by the key
+        """
+        self.add_many([key], N)
 
-        data[index] = new_value
-        return new_value
+    def add_many(self, keys, N=1):
+        """
+        Adds `N` counts to the indicies given by each of the keys
+        """
+        self._update(self.get_indexes_many(keys).ravel(), N)
 
     def remove(self, key, N=1):
         """
         Removes `N` counts to the indicies given by the key
         """
-        assert isinstance(key, str)
-        indexes = list(self.get_indexes(key))
-        for index in indexes:
-            self.decrement_bucket(index, N)
+        self.remove_many([key], N)
+
+    def remove_many(self, keys, N=1):
+        """
+        Removes `N` counts to the indicies given by each of the keys
+        """
+        self._update(self.get_indexes_many(keys).ravel(), -N)
 
     def remove_all(self, N=1):
         """
         Removes `N` counts to all indicies.  Useful for expirations
         """
-        for i in range(self.num_bytes):
-            self.decrement_bucket(i, N)
+        low = self.data & 0x0F
+        high = self.data >> 4
+        low = np.where(low > N, low - N, 0).astype(np.uint8)
+        high = np.where(high > N, high - N, 0).astype(np.uint8)
+        self.data[:] = low | (high << 4)
+        self.num_non_zero = int(np.count_nonzero(low) + np.count_nonzero(high))
 
     def contains(self, key):
         """
         Check if the current bloom contains the key `key`
         """
-        assert isinstance(key, str)
-        return all(self.data[index] != 0 for index in self.get_indexes(key))
+        return bool(self.contains_many([key])[0])
+
+    def contains_many(self, keys):
+        """
+        Check if the current bloom contains each of the keys, returning an
+        array of booleans
+        """
+        return (self.get_counters(self.get_indexes_many(keys)) != 0).all(axis=1)
 
     def get_size(self):
         """
         Returns the density of the bloom which can be used to determine if the bloom is "full"
         """
-        return (-self.num_bytes *
-                math.log(1 - self.num_non_zero / float(self.num_bytes)) /
+        return (-self.num_counters *
+                math.log(1 - self.num_non_zero / float(self.num_counters)) /
                 float(self.num_hashes)
                 )
 
@@ -133,6 +220,11 @@ class CountingBloomFilter(object):
 
     def flush_data(self, data_path=None):
         _, _, bloom_path = self._get_paths(data_path)
+        if isinstance(self.data, np.memmap) and \
+                os.path.abspath(self.data.filename) == os.path.abspath(bloom_path):
+            # Counters are memory-mapped to the saved file
+            self.data.flush()
+            return
         tmp_bloom_path = bloom_path + ".tmp"
 
         self._save_data(tmp_bloom_path)
@@ -169,16 +261,22 @@ class CountingBloomFilter(object):
             json.dump(self.get_meta(), meta_file)
 
     def _save_data(self, filename):
-        np.save(filename, self.data)
+        # Write to an open file so that numpy does not append .npy to the
+        # name of temporary files
+        with open(filename, 'wb') as bloom_file:
+            np.save(bloom_file, self.data)
 
     def number_of_hashes(self):
         return self.num_hashes
 
+    def number_of_counters(self):
+        return self.num_counters
+
     def number_of_bytes(self):
         return self.num_bytes
 
     @classmethod
-    def load(cls, data_path):
+    def load(cls, data_path, mmap=False):
         logging.info("Loading counting bloom from %s" % data_path)
         kwargs = None
 
@@ -186,6 +284,7 @@ class CountingBloomFilter(object):
             kwargs = json.load(meta_file)
 
         kwargs['data_path'] = data_path
+        kwargs['mmap'] = mmap
 
         capacity = kwargs['capacity']
         del kwargs['capacity']
@@ -204,4 +303,4 @@ class CountingBloomFilter(object):
         return self
 
     def __len__(self):
-        return self.get_size()
+        return int(self.get_size())
@@ -1,157 +1,330 @@
-import mmh3  # murmur hashing
+"""Cuckoo filter
+
+A cuckoo filter is a compact set representation supporting insertions,
+removals and membership tests with a bounded false positive probability and
+no false negatives. Each item is represented by a short fingerprint stored in
+either of two candidate buckets.
+
+Fingerprints are stored in a single numpy matrix with a row per bucket, so
+that the memory of the filter is exactly that of the fingerprints and batches
+of items can be looked up and inserted with vectorized operations.
+
+References
+----------
+B. Fan, D. G. Andersen, M. Kaminsky, M. D. Mitzenmacher, Cuckoo Filter:
+Practically Better Than Bloom, in Proc. of ACM CoNEXT'14
+"""
+from __future__ import division
 import random
 
-from . import cuckootable
+import numpy as np
 
+from icarus.util import key_to_int, keys_to_array, mix64, mix64_many
 
-class CuckooFilter:
 
-    def __init__(self, filter_capacity,
-                 item_fingerprint_size, num_swaps=500, bucket_size=4):
+__all__ = ['CuckooFilter']
 
-        self.filter_capacity = filter_capacity
-        self.item_fingerprint_size = item_fingerprint_size
-        self.num_swaps = num_swaps
-        self.bucket_size = bucket_size
-        self.cuckoo_size = 0
-        self.table = []
 
-        # initialize the entire table.
-        for i in range(self.filter_capacity):
-            self.table.append(cuckootable.CuckooTable(size=self.bucket_size))
+# Numpy type of fingerprints by fingerprint size (in bytes)
+_FINGERPRINT_DTYPE = {1: np.uint8, 2: np.uint16, 4: np.uint32}
 
-    # fingerprint of an item is a reduced bit string of
-    # of an input string.
-    def obtain_fingerprint(self, string_item):
-        hash_value = mmh3.hash_bytes(string_item)
-        fingerprint = hash_value[:self.item_fingerprint_size]
-        return fingerprint
 
-    def obtain_index_from_hash(self, string_item):
+class CuckooFilter(object):
+    """Cuckoo filter backed by a numpy matrix of fingerprints.
 
-        hash_value = mmh3.hash_bytes(string_item)
+    Keys are hashed directly if they are integers, e.g. content identifiers,
+    and from their string representation otherwise. The alternate bucket of
+    a fingerprint stored in bucket *i* is *(h(f) - i) mod n*, where *n* is the
+    number of buckets, so that the number of buckets needs not be a power of
+    two. Fingerprint *0* denotes an empty slot.
 
-        # this is new for python 3, i.e. how you go from
-        # bytes/bits to int/index values
-        # index = int.from_bytes(hash_value, byteorder="big")
-        # The below expression is for python 2.7
-        index = int(hash_value.encode('hex'), 16) 
+    If a fingerprint cannot be inserted after *num_swaps* relocations, the
+    fingerprint left over is kept in a small stash, so that no item is lost.
+    When the stash is full, items are no longer inserted and are counted as
+    overflows instead, since the filter is then effectively full.
+    """
 
-        # modulo the obtained index by the filter capacity
-        # this helps to restrict indices to 0 - filter_capacity
-        index = index % self.filter_capacity
+    def __init__(self, filter_capacity, item_fingerprint_size, num_swaps=500,
+                 bucket_size=4, seed=None, stash_size=1):
+        """Constructor
+
+        Parameters
+        ----------
+        filter_capacity : int
+            The number of buckets
+        item_fingerprint_size : int
+            The size of fingerprints in bytes. It must be 1, 2 or 4
+        num_swaps : int, optional
+            The maximum number of fingerprints relocated to insert an item
+        bucket_size : int, optional
+            The number of fingerprints stored in each bucket
+        seed : any hashable type, optional
+            The seed of the random number generator selecting the
+            fingerprints to relocate
+        stash_size : int, optional
+            The maximum number of fingerprints kept in the stash
+        """
+        if filter_capacity < 1 or bucket_size < 1 or num_swaps < 0 \
+                or stash_size < 0:
+            raise ValueError('filter_capacity and bucket_size must be '
+                             'positive and num_swaps and stash_size not '
+                             'negative')
+        if item_fingerprint_size not in _FINGERPRINT_DTYPE:
+            raise ValueError('item_fingerprint_size must be 1, 2 or 4')
+        self.filter_capacity = int(filter_capacity)
+        self.item_fingerprint_size = item_fingerprint_size
+        self.num_swaps = num_swaps
+        self.bucket_size = int(bucket_size)
+        self.cuckoo_size = 0
+        self._fp_mask = (1 << (8 * item_fingerprint_size)) - 1
+        # Fingerprints of each bucket, stored in the first count[i] slots
+        self.table = np.zeros((self.filter_capacity, self.bucket_size),
+                              dtype=_FINGERPRINT_DTYPE[item_fingerprint_size])
+        self.count = np.zeros(self.filter_capacity, dtype=np.int64)
+        self._random = random.Random(seed)
+        # Bucket and fingerprint of each stashed fingerprint
+        self.stash_size = stash_size
+        self.stash = []
+        # Number of items not inserted because the filter was full
+        self.overflows = 0
+
+    def _alt_index(self, index, fingerprint):
+        """Return the alternate bucket of a fingerprint"""
+        return (mix64(fingerprint) - index) % self.filter_capacity
+
+    def _hash(self, key):
+        """Return the fingerprint and the two buckets of a key"""
+        h = mix64(key_to_int(key))
+        fingerprint = ((h >> 32) & self._fp_mask) or 1
+        index_1 = (h & 0xFFFFFFFF) % self.filter_capacity
+        return fingerprint, index_1, self._alt_index(index_1, fingerprint)
+
+    def _hash_many(self, keys):
+        """Return the arrays of fingerprints and buckets of keys"""
+        h = mix64_many(keys_to_array(keys))
+        fingerprint = (h >> np.uint64(32)) & np.uint64(self._fp_mask)
+        fingerprint[fingerprint == 0] = 1
+        n = np.uint64(self.filter_capacity)
+        index_1 = (h & np.uint64(0xFFFFFFFF)) % n
+        # (h(f) - i) mod n computed without unsigned underflow
+        index_2 = (mix64_many(fingerprint) % n + n - index_1) % n
+        return (fingerprint.astype(self.table.dtype), index_1.astype(np.int64),
+                index_2.astype(np.int64))
+
+    def _insert(self, index, fingerprint):
+        """Insert a fingerprint in a bucket if not full"""
+        slot = self.count[index]
+        if slot < self.bucket_size:
+            self.table[index, slot] = fingerprint
+            self.count[index] = slot + 1
+            return True
+        return False
 
+    def _delete(self, index, fingerprint):
+        """Remove a fingerprint from a bucket if present"""
+        n = self.count[index]
+        row = self.table[index]
+        slots = np.flatnonzero(row[:n] == fingerprint)
+        if len(slots) == 0:
+            return False
+        # Keep fingerprints in the first slots of the bucket
+        row[slots[0]] = row[n - 1]
+        row[n - 1] = 0
+        self.count[index] = n - 1
+        return True
+
+    def _relocate(self, index, fingerprint):
+        """Insert a fingerprint whose buckets are both full by relocating
+        other fingerprints, starting from one of the buckets, and stash the
+        fingerprint left over if relocations are exhausted. Return the bucket
+        of the last fingerprint inserted or stashed, or *None* if the stash
+        is full and the filter was not changed"""
+        if len(self.stash) >= self.stash_size:
+            self.overflows += 1
+            return None
+        self.cuckoo_size += 1
+        for _ in range(self.num_swaps):
+            slot = self._random.randrange(self.bucket_size)
+            fingerprint, self.table[index, slot] = \
+                    int(self.table[index, slot]), fingerprint
+            index = self._alt_index(index, fingerprint)
+            if self._insert(index, fingerprint):
+                return index
+        self.stash.append((index, fingerprint))
         return index
 
-    def obtain_indices_from_item(self, string_item):
-
-        # obtain the first index
-        index_1 = self.obtain_index_from_hash(string_item)
-
-        # obtain finger print of item
-        fingerprint = self.obtain_fingerprint(string_item)
-
-        # derive the index from the fingerprint
-        # second index -> first_index xor index
-        # derived from hash(fingerprint)
-        index_2 = index_1 ^ self.obtain_index_from_hash(fingerprint)
-        index_2 = index_2 % self.filter_capacity
-
-        return index_1, index_2
+    def _unstash(self):
+        """Move stashed fingerprints to their buckets if they have room"""
+        for entry in list(self.stash):
+            index, fingerprint = entry
+            if self._insert(index, fingerprint) or \
+                    self._insert(self._alt_index(index, fingerprint),
+                                 fingerprint):
+                self.stash.remove(entry)
+
+    def _stash_contains(self, index_1, index_2, fingerprint):
+        """Return the position in the stash of a fingerprint stashed from
+        either of two buckets or *None* if not stashed"""
+        for i, (index, f) in enumerate(self.stash):
+            if f == fingerprint and index in (index_1, index_2):
+                return i
+        return None
 
     def insert(self, item):
         """Here for legacy reasons... use .add"""
         return self.add(item)
 
     def add(self, item_to_insert):
-        # check that item_to_insert is a string.
-        if not isinstance(item_to_insert, str):
-            raise ValueError("Item being inserted not of type string")
-
-        # obtain the two possible indices where this item
-        # can be inserted.
-        index_1, index_2 = self.obtain_indices_from_item(item_to_insert)
-        item_fingerprint = self.obtain_fingerprint(item_to_insert)
-
-        # default is to insert into the first index.
-        if self.table[index_1].insert(item_fingerprint):
-            self.cuckoo_size += 1
-            return index_1
-
-        # if the first location is occupied, then insert
-        # in the second location.
-        if self.table[index_2].insert(item_fingerprint):
-            self.cuckoo_size += 1
-            return index_2
-
-        # if both indices are full, now we need to swap all current entries.
-        # first randomly pick btw index 1 and 2
-        # then swap one item in that bucket for its
-        # alternative location.
-        random_index = random.choice((index_1, index_2))
-
-        for swap in range(self.num_swaps):
-            item_fingerprint = self.table[
-                random_index].swap_fingerprints(item_fingerprint)
-
-            random_index = random_index ^ self.obtain_index_from_hash(
-                item_fingerprint)
-            random_index = random_index % self.filter_capacity
-
-            if self.table[random_index].insert(item_fingerprint):
+        """Insert an item in the filter.
+
+        If both buckets of the item are full, fingerprints are relocated to
+        their alternate buckets, up to *num_swaps* times.
+
+        Parameters
+        ----------
+        item_to_insert : any hashable type
+            The item
+
+        Returns
+        -------
+        index : int
+            The bucket in which the fingerprint of the item, or of the last
+            fingerprint relocated, was inserted or *None* if the item was not
+            inserted because the filter is full
+        """
+        fingerprint, index_1, index_2 = self._hash(item_to_insert)
+        for index in (index_1, index_2):
+            if self._insert(index, fingerprint):
                 self.cuckoo_size += 1
-                return random_index
-
-        # Notifies that the table is now full.
-        raise Exception("CuckooFilter has filled up!")
+                return index
+        return self._relocate(self._random.choice((index_1, index_2)),
+                              fingerprint)
+
+    def add_many(self, items):
+        """Insert a batch of items in the filter.
+
+        Items are hashed and inserted in their first and then in their second
+        bucket with vectorized operations. Only items whose buckets are both
+        full are inserted one by one, relocating other fingerprints.
+
+        Parameters
+        ----------
+        items : iterable
+            The items
+
+        Returns
+        -------
+        overflows : int
+            The number of items not inserted because the filter is full
+        """
+        fingerprint, index_1, index_2 = self._hash_many(items)
+        placed = self._insert_many(index_1, fingerprint)
+        pending = np.flatnonzero(~placed)
+        placed = self._insert_many(index_2[pending], fingerprint[pending])
+        self.cuckoo_size += len(fingerprint) - np.count_nonzero(~placed)
+        overflows = 0
+        for i in pending[~placed]:
+            index = int(self._random.choice((index_1[i], index_2[i])))
+            if self._relocate(index, int(fingerprint[i])) is None:
+                overflows += 1
+        return overflows
+
+    def _insert_many(self, index, fingerprint):
+        """Insert fingerprints in buckets with free slots, returning which
+        fingerprints were inserted"""
+        order = np.argsort(index, kind='mergesort')
+        index = index[order]
+        # Rank of each fingerprint among those inserted in the same bucket
+        rank = np.arange(len(index)) - np.searchsorted(index, index)
+        slot = self.count[index] + rank
+        ok = slot < self.bucket_size
+        self.table[index[ok], slot[ok]] = fingerprint[order][ok]
+        self.count += np.bincount(index[ok], minlength=self.filter_capacity)
+        placed = np.zeros(len(index), dtype=bool)
+        placed[order[ok]] = True
+        return placed
 
     def remove(self, item_to_remove):
-        # first hash the item and obtain its possible indices
-        item_fingerprint = self.obtain_fingerprint(item_to_remove)
-        index_1, index_2 = self.obtain_indices_from_item(item_to_remove)
-
-        # check the first index to see if item's fingerprint
-        # is in that bucket.
-        if self.table[index_1].remove(item_fingerprint):
-            self.cuckoo_size = self.cuckoo_size - 1
+        """Remove an item from the filter.
+
+        Parameters
+        ----------
+        item_to_remove : any hashable type
+            The item
+
+        Returns
+        -------
+        removed : bool
+            *True* if a fingerprint of the item was found and removed
+        """
+        fingerprint, index_1, index_2 = self._hash(item_to_remove)
+        if self._delete(index_1, fingerprint) or \
+                self._delete(index_2, fingerprint):
+            self.cuckoo_size -= 1
+            if self.stash:
+                self._unstash()
             return True
-
-        # item not in first index, so now check the second index
-        if self.table[index_2].remove(item_fingerprint):
-            self.cuckoo_size = self.cuckoo_size - 1
+        i = self._stash_contains(index_1, index_2, fingerprint)
+        if i is not None:
+            del self.stash[i]
+            self.cuckoo_size -= 1
             return True
-
-        # since item not in both indices, it is not in the
-        # cuckoo table. return false.
         return False
 
     def contains(self, item_to_test):
-        item_fingerprint = self.obtain_fingerprint(item_to_test)
-
-        index_1, index_2 = self.obtain_indices_from_item(item_to_test)
-
-        bool_contains = (item_fingerprint in self.table[index_1]) or (
-            item_fingerprint in self.table[index_2])
-
-        return bool_contains
-
-    """
-
-    The methods below are getters for various properties of the 
-    CuckooFilter. 
-    - load factor 
-    - size
-    - capacity 
-
-    """
+        """Check if the filter contains an item.
+
+        Parameters
+        ----------
+        item_to_test : any hashable type
+            The item
+
+        Returns
+        -------
+        contains : bool
+            *True* if the filter contains a fingerprint of the item
+        """
+        fingerprint, index_1, index_2 = self._hash(item_to_test)
+        return bool((self.table[index_1] == fingerprint).any() or
+                    (self.table[index_2] == fingerprint).any() or
+                    (self.stash and self._stash_contains(
+                        index_1, index_2, fingerprint) is not None))
+
+    def contains_many(self, items):
+        """Check if the filter contains each of a batch of items.
+
+        Parameters
+        ----------
+        items : iterable
+            The items
+
+        Returns
+        -------
+        contains : numpy.ndarray
+            Array of booleans, whose i-th element is *True* if the filter
+            contains a fingerprint of the i-th item
+        """
+        fingerprint, index_1, index_2 = self._hash_many(items)
+        column = fingerprint[:, np.newaxis]
+        contains = (self.table[index_1] == column).any(axis=1) | \
+                   (self.table[index_2] == column).any(axis=1)
+        for index, f in self.stash:
+            contains |= (fingerprint == f) & ((index_1 == index) |
+                                              (index_2 == index))
+        return contains
 
     def get_load_factor(self):
-        load_factor = self.cuckoo_size / \
-            (self.filter_capacity * self.bucket_size)
-        return load_factor
+        """Return the fraction of slots storing a fingerprint"""
+        return self.cuckoo_size / (self.filter_capacity * self.bucket_size)
 
     def get_size(self):
+        """Return the number of fingerprints stored"""
         return self.cuckoo_size
 
     def get_capacity(self):
+        """Return the number of buckets"""
         return self.filter_capacity
+
+    def get_memory(self):
+        """Return the memory (in bytes) occupied by the fingerprints"""
+        return self.table.nbytes
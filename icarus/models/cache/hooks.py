@@ -0,0 +1,138 @@
+"""Cache hooks
+
+This module contains caches notifying subscribers whenever an item is
+inserted in or evicted from them, so that other components, e.g. an index of
+the locations of contents, can track their content without looking them up.
+
+Hooks are added to a cache class by the `hooked_cache` function, which returns
+a new cache class deriving from both `CacheHooks` and the cache class.
+Subscribers are functions taking the item as only argument::
+
+    cache = hooked_cache('LRU')(10)
+    cache.subscribe(on_insert=inserted.add, on_evict=inserted.discard)
+
+An item is reported as inserted when the cache stores it after not storing
+it, and as evicted when the cache no longer stores it, either because it was
+replaced, removed or the cache was cleared.
+"""
+from icarus.registry import CACHE_POLICY
+
+
+__all__ = [
+        'CacheHooks',
+        'hooked_cache',
+           ]
+
+
+class CacheHooks(object):
+    """Base implementation of a cache notifying subscribers of the items
+    inserted in and evicted from it.
+
+    This class is not a cache itself and is meant to be combined with a cache
+    class using the `hooked_cache` function. Caches combining several caches,
+    e.g. tiered caches, report items evicted from one of their caches only if
+    no other cache of the system stores them.
+    """
+
+    # Functions called with each inserted and evicted item
+    _insert_hooks = ()
+    _evict_hooks = ()
+
+    def subscribe(self, on_insert=None, on_evict=None):
+        """Subscribe to the items inserted in and evicted from the cache.
+
+        Parameters
+        ----------
+        on_insert : callable, optional
+            Function called with each item inserted in the cache
+        on_evict : callable, optional
+            Function called with each item evicted from the cache
+        """
+        if on_insert is not None:
+            self._insert_hooks = list(self._insert_hooks) + [on_insert]
+        if on_evict is not None:
+            self._evict_hooks = list(self._evict_hooks) + [on_evict]
+
+    def _notify_evicted(self, evicted):
+        """Notify subscribers of the evicted item or list of items, if any"""
+        if evicted is None:
+            return
+        for e in (evicted if isinstance(evicted, list) else [evicted]):
+            for f in self._evict_hooks:
+                f(e)
+
+    def put(self, k, *args, **kwargs):
+        """Insert an item in the cache and notify subscribers of the inserted
+        and evicted items.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        inserted = not self.has(k)
+        evicted = super(CacheHooks, self).put(k, *args, **kwargs)
+        self._notify_evicted(evicted)
+        if inserted and self.has(k):
+            for f in self._insert_hooks:
+                f(k)
+        return evicted
+
+    def remove(self, k, *args, **kwargs):
+        """Remove an item from the cache, if present, and notify subscribers.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to remove
+
+        Returns
+        -------
+        removed : bool
+            *True* if the content was in the cache, *False* if it was not.
+        """
+        removed = super(CacheHooks, self).remove(k, *args, **kwargs)
+        if removed and not self.has(k):
+            self._notify_evicted(k)
+        return removed
+
+    def clear(self):
+        """Empty the cache and notify subscribers of the eviction of all the
+        items it stored"""
+        evicted = list(set(self.dump()))
+        super(CacheHooks, self).clear()
+        self._notify_evicted(evicted)
+
+    def _promote(self, cache, k):
+        """Insert an item retrieved from a cache of a system of caches in
+        another cache of the system and notify subscribers of the evicted
+        items"""
+        evicted = super(CacheHooks, self)._promote(cache, k)
+        self._notify_evicted(evicted)
+        return evicted
+
+
+def hooked_cache(policy):
+    """Return a cache class notifying subscribers of the items inserted in
+    and evicted from a cache.
+
+    Parameters
+    ----------
+    policy : str or type
+        The cache class or the name of its cache policy
+
+    Returns
+    -------
+    cache_class : type
+        The cache class
+    """
+    if not isinstance(policy, type):
+        if policy not in CACHE_POLICY:
+            raise ValueError('No cache policy named %s' % str(policy))
+        policy = CACHE_POLICY[policy]
+    return type('Hooked' + policy.__name__, (CacheHooks, policy), {})
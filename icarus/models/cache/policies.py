@@ -6,14 +6,13 @@ provided by Icarus.
 from __future__ import division
 from collections import deque, defaultdict
 import random
+import heapq
 import abc
 import copy
 
 import numpy as np
 
-# from cuckoofilter import CuckooFilter
-
-from icarus.util import inheritdoc, apportionment
+from icarus.util import inheritdoc, apportionment, key_to_int
 from icarus.registry import register_cache_policy
 
 
@@ -29,6 +28,15 @@ __all__ = [
         'FifoCache',
         'ClimbCache',
         'RandEvictionCache',
+        'ClockCache',
+        'ClockProCache',
+        'SampledCache',
+        'LruKCache',
+        'TwoQueueCache',
+        'ByteCache',
+        'ByteLruCache',
+        'ByteFifoCache',
+        'GdsfCache',
         'insert_after_k_hits_cache',
         'rand_insert_cache',
         'keyval_cache',
@@ -454,6 +462,10 @@ class LinkedSet(object):
 class Cache(object):
     """Base implementation of a cache object"""
 
+    # Whether the capacity of the cache (maxlen) is expressed in bytes rather
+    # than in number of items
+    byte_capacity = False
+
     @abc.abstractmethod
     def __init__(self, maxlen, *args, **kwargs):
         """Constructor
@@ -837,7 +849,6 @@ class LruCache(Cache):
     def __init__(self, maxlen, **kwargs):
         self._cache = LinkedSet()
         self._maxlen = int(maxlen)
-        # self._cuckoofilter = CuckooFilter(10*self._maxlen, 5)
         if self._maxlen <= 0:
             raise ValueError('maxlen must be positive')
 
@@ -911,7 +922,6 @@ class LruCache(Cache):
             return None
         # if content not in cache append it on top
         self._cache.append_top(k)
-        # self.put_cuckoo(k)
         return self._cache.pop_bottom() if len(self._cache) > self._maxlen else None
 
     @inheritdoc(Cache)
@@ -919,25 +929,12 @@ class LruCache(Cache):
         if k not in self._cache:
             return False
         self._cache.remove(k)
-        # self.remove_cuckoo(k)
         return True
 
     @inheritdoc(Cache)
     def clear(self):
         self._cache.clear()
 
-    # # Newly added some functions for cuckoo filters by Xiaolan Jiang
-    # def get_cuckoo(self, k):
-    #     return  self._cuckoofilter.contains(str(k))
-
-    # def put_cuckoo(self, k):
-    #     self._cuckoofilter.insert(str(k))
-    #     return True
-
-    # def remove_cuckoo(self, k):
-    #     self._cuckoofilter.remove(str(k))
-    #     return True
-
 
 @register_cache_policy('SLRU')
 class SegmentedLruCache(Cache):
@@ -1547,6 +1544,1121 @@ class RandEvictionCache(Cache):
         self._cache.clear()
 
 
+@register_cache_policy('CLOCK')
+class ClockCache(Cache):
+    """CLOCK (second chance) cache implementation.
+
+    Items are stored in a circular array of *maxlen* slots swept by a hand.
+    Each slot has a reference bit which is set when the item is hit. When an
+    item needs to be evicted, the hand advances clearing the reference bits it
+    finds set, and evicts the first item whose reference bit is not set. The
+    new item takes the slot of the evicted one and the hand moves past it.
+
+    Unlike LRU, a cache hit does not move any item and only sets one bit,
+    which makes this policy cheaper than LRU while approximating its hit ratio.
+
+    The reference bits are stored in a fixed numpy array, so that sweeping the
+    hand over a run of referenced items is a single vectorized operation.
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._ref = np.zeros(self._maxlen, dtype=bool)
+        self._key = [None] * self._maxlen
+        self._slot = {}
+        self._free = list(range(self._maxlen - 1, -1, -1))
+        self._hand = 0
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._slot)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache, ordered
+        from the most recently inserted item to the item currently pointed by
+        the hand (i.e. the next candidate for eviction).
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        n = self._maxlen
+        return [self._key[(self._hand - i) % n] for i in range(1, n + 1)
+                if self._key[(self._hand - i) % n] is not None]
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._slot
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        slot = self._slot.get(k)
+        if slot is None:
+            return False
+        self._ref[slot] = True
+        return True
+
+    def _sweep(self):
+        """Advance the hand up to the first slot whose reference bit is not
+        set, clearing the reference bits of all the slots it goes through.
+
+        Returns
+        -------
+        slot : int
+            The slot pointed by the hand after the sweep
+        """
+        ref = self._ref
+        hand = self._hand
+        i = hand + int(ref[hand:].argmin())
+        if not ref[i]:
+            ref[hand:i] = False
+            return i
+        ref[hand:] = False
+        if hand > 0:
+            i = int(ref[:hand].argmin())
+            if not ref[i]:
+                ref[:i] = False
+                return i
+            ref[:hand] = False
+        # All bits were set: after a full revolution the hand is back where
+        # it started and all bits are cleared
+        return hand
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        slot = self._slot.get(k)
+        if slot is not None:
+            return None
+        evicted = None
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self._sweep()
+            evicted = self._key[slot]
+            del self._slot[evicted]
+            self._hand = (slot + 1) % self._maxlen
+        self._key[slot] = k
+        self._ref[slot] = False
+        self._slot[k] = slot
+        return evicted
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        slot = self._slot.pop(k, None)
+        if slot is None:
+            return False
+        self._key[slot] = None
+        self._ref[slot] = False
+        self._free.append(slot)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._ref[:] = False
+        self._key = [None] * self._maxlen
+        self._slot.clear()
+        self._free = list(range(self._maxlen - 1, -1, -1))
+        self._hand = 0
+
+
+@register_cache_policy('CLOCK_PRO')
+class ClockProCache(Cache):
+    """CLOCK-Pro cache implementation.
+
+    This policy extends CLOCK by distinguishing *hot* items, which have been
+    requested at least twice within a short reuse distance, from *cold* items.
+    Only cold items are evicted, while hot items not referenced since the last
+    sweep are demoted to cold when the number of hot items exceeds its target.
+    Newly inserted cold items are given a *test period*: if they are evicted
+    during their test period, their key is retained in a bounded history of
+    non-resident items and, if requested again before leaving the history,
+    they are reinserted as hot. The target number of cold items is adapted
+    at run time: it grows when a non-resident item is requested again and
+    shrinks when an item leaves the non-resident history without being
+    requested.
+
+    Resident items are stored in a circular array of *maxlen* slots, as in
+    CLOCK, whose reference, hot and test bits are kept in fixed numpy arrays.
+    The single hand of this implementation merges the roles of the cold, hot
+    and test hands of the original design. The history of non-resident items
+    is bounded to *maxlen* entries.
+
+    References
+    ----------
+    S. Jiang, F. Chen, X. Zhang, CLOCK-Pro: an effective improvement of the
+    CLOCK replacement, in Proc. of USENIX ATC'05
+    """
+
+    @inheritdoc(Cache)
+    def __init__(self, maxlen, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._ref = np.zeros(self._maxlen, dtype=bool)
+        self._hot = np.zeros(self._maxlen, dtype=bool)
+        self._test = np.zeros(self._maxlen, dtype=bool)
+        self._key = [None] * self._maxlen
+        self._slot = {}
+        self._free = list(range(self._maxlen - 1, -1, -1))
+        self._hand = 0
+        self._n_hot = 0
+        self._cold_target = max(1, self._maxlen // 2)
+        self._nonresident = LinkedSet()
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._slot)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache, ordered
+        from the most recently inserted item to the item currently pointed by
+        the hand.
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        n = self._maxlen
+        return [self._key[(self._hand - i) % n] for i in range(1, n + 1)
+                if self._key[(self._hand - i) % n] is not None]
+
+    def is_hot(self, k):
+        """Return whether an item is currently hot.
+
+        This method does not change the internal state of the cache.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        hot : bool
+            *True* if the item is in the cache and is hot, *False* otherwise
+        """
+        slot = self._slot.get(k)
+        return slot is not None and bool(self._hot[slot])
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._slot
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        slot = self._slot.get(k)
+        if slot is None:
+            return False
+        self._ref[slot] = True
+        return True
+
+    def _forget_oldest(self):
+        """Drop the oldest non-resident item from the history, ending its test
+        period without reuse, and shrink the target number of cold items.
+        """
+        self._nonresident.pop_bottom()
+        self._cold_target = max(1, self._cold_target - 1)
+
+    def _evict(self):
+        """Advance the hand until a cold item not referenced since the last
+        sweep is found and evict it.
+
+        Returns
+        -------
+        slot : int
+            The slot freed by the eviction
+        evicted : any hashable type
+            The evicted item
+        """
+        n = self._maxlen
+        ref, hot, test = self._ref, self._hot, self._test
+        hand = self._hand
+        while True:
+            if hot[hand]:
+                if ref[hand]:
+                    ref[hand] = False
+                elif self._n_hot > n - self._cold_target:
+                    hot[hand] = False
+                    self._n_hot -= 1
+            elif ref[hand]:
+                ref[hand] = False
+                if test[hand]:
+                    # Reused during its test period: promote to hot
+                    test[hand] = False
+                    hot[hand] = True
+                    self._n_hot += 1
+                else:
+                    test[hand] = True
+            else:
+                evicted = self._key[hand]
+                if test[hand]:
+                    self._nonresident.append_top(evicted)
+                    if len(self._nonresident) > n:
+                        self._forget_oldest()
+                del self._slot[evicted]
+                self._key[hand] = None
+                test[hand] = False
+                self._hand = (hand + 1) % n
+                return hand, evicted
+            hand = (hand + 1) % n
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._slot:
+            return None
+        evicted = None
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot, evicted = self._evict()
+        self._key[slot] = k
+        self._ref[slot] = False
+        self._slot[k] = slot
+        if k in self._nonresident:
+            # Requested again within its test period
+            self._nonresident.remove(k)
+            self._cold_target = min(self._maxlen, self._cold_target + 1)
+            self._hot[slot] = True
+            self._test[slot] = False
+            self._n_hot += 1
+        else:
+            self._hot[slot] = False
+            self._test[slot] = True
+        return evicted
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        slot = self._slot.pop(k, None)
+        if slot is None:
+            return False
+        if self._hot[slot]:
+            self._n_hot -= 1
+        self._key[slot] = None
+        self._ref[slot] = False
+        self._hot[slot] = False
+        self._test[slot] = False
+        self._free.append(slot)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._ref[:] = False
+        self._hot[:] = False
+        self._test[:] = False
+        self._key = [None] * self._maxlen
+        self._slot.clear()
+        self._free = list(range(self._maxlen - 1, -1, -1))
+        self._hand = 0
+        self._n_hot = 0
+        self._cold_target = max(1, self._maxlen // 2)
+        self._nonresident.clear()
+
+
+@register_cache_policy('SAMPLED')
+class SampledCache(Cache):
+    """Sampled eviction cache implementation.
+
+    Items are stored in a flat array, together with a few statistics on their
+    requests. When an item needs to be evicted, *k* slots of the array are
+    sampled uniformly at random and the sampled item with the lowest priority
+    is evicted. The priority function is pluggable and can be any of:
+     * HYPERBOLIC: number of requests since insertion divided by the time
+       elapsed since insertion (hyperbolic caching)
+     * LRU: time of the last request
+     * LFU: number of requests since insertion
+
+    Time is measured as the number of requests (*get* and *put* operations)
+    processed by the cache.
+
+    Eviction takes O(k) time regardless of the priority function and cache
+    hits only update the statistics of the item hit. With a small number of
+    samples (e.g. 5-10) this policy closely approximates the exact policy
+    using the same priority. If *k* is not lower than the number of items
+    stored, all items are evaluated and the eviction is exact.
+
+    References
+    ----------
+    A. Blankstein, S. Sen, M. J. Freedman, Hyperbolic caching: flexible
+    caching for web applications, in Proc. of USENIX ATC'17
+    """
+
+    priorities = {
+        'HYPERBOLIC': lambda hits, t_in, t_last, t: hits / (t - t_in),
+        'LRU':        lambda hits, t_in, t_last, t: t_last,
+        'LFU':        lambda hits, t_in, t_last, t: hits,
+                  }
+
+    def __init__(self, maxlen, k=5, priority='HYPERBOLIC', seed=None, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of items the cache can store
+        k : int, optional
+            The number of items sampled on eviction
+        priority : str or callable, optional
+            The name of the priority function (HYPERBOLIC, LRU or LFU) or a
+            function taking as arguments the numpy arrays of number of
+            requests since insertion, time of insertion and time of last
+            request of the sampled items and the current time and returning
+            an array with their priorities. Items with lowest priority are
+            evicted first
+        seed : any hashable type, optional
+            The seed of the random number generator. Seeds which are not
+            integers are mapped to integers with a stable hash
+        """
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._k = int(k)
+        if self._k <= 0:
+            raise ValueError('k must be positive')
+        if callable(priority):
+            self._priority = priority
+        elif priority in self.priorities:
+            self._priority = self.priorities[priority]
+        else:
+            raise ValueError('priority must be a callable or any of %s'
+                             % ', '.join(sorted(self.priorities)))
+        # Numpy generators only accept 32-bit integer seeds
+        self._rng = np.random.RandomState(None if seed is None
+                                          else key_to_int(seed) & 0xFFFFFFFF)
+        self._key = [None] * self._maxlen
+        self._slot = {}
+        self._hits = np.zeros(self._maxlen)
+        self._t_in = np.zeros(self._maxlen)
+        self._t_last = np.zeros(self._maxlen)
+        self._t = 0
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._slot)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache, sorted by
+        decreasing priority.
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        n = len(self._slot)
+        priority = self._priority(self._hits[:n], self._t_in[:n],
+                                  self._t_last[:n], self._t + 1)
+        return [self._key[i] for i in np.argsort(-priority, kind='mergesort')]
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._slot
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        self._t += 1
+        slot = self._slot.get(k)
+        if slot is None:
+            return False
+        self._hits[slot] += 1
+        self._t_last[slot] = self._t
+        return True
+
+    def _evict(self):
+        """Evict the item with the lowest priority among the sampled ones
+
+        Returns
+        -------
+        slot : int
+            The slot freed by the eviction
+        """
+        n = len(self._slot)
+        sample = np.arange(n) if self._k >= n \
+                 else self._rng.randint(0, n, self._k)
+        priority = self._priority(self._hits[sample], self._t_in[sample],
+                                  self._t_last[sample], self._t)
+        slot = int(sample[np.argmin(priority)])
+        del self._slot[self._key[slot]]
+        return slot
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        self._t += 1
+        if k in self._slot:
+            return None
+        evicted = None
+        if len(self._slot) < self._maxlen:
+            slot = len(self._slot)
+        else:
+            slot = self._evict()
+            evicted = self._key[slot]
+        self._key[slot] = k
+        self._slot[k] = slot
+        self._hits[slot] = 1
+        self._t_in[slot] = self._t
+        self._t_last[slot] = self._t
+        return evicted
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        slot = self._slot.pop(k, None)
+        if slot is None:
+            return False
+        # Move the last item of the array into the freed slot
+        last = len(self._slot)
+        if slot != last:
+            self._key[slot] = self._key[last]
+            self._slot[self._key[slot]] = slot
+            self._hits[slot] = self._hits[last]
+            self._t_in[slot] = self._t_in[last]
+            self._t_last[slot] = self._t_last[last]
+        self._key[last] = None
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._key = [None] * self._maxlen
+        self._slot.clear()
+        self._t = 0
+
+
+@register_cache_policy('LRU_K')
+class LruKCache(Cache):
+    """LRU-K cache implementation.
+
+    This policy evicts the item with the largest backward K-distance, i.e. the
+    item whose K-th most recent request is the oldest. Items requested fewer
+    than K times have infinite backward K-distance and are evicted first, in
+    LRU order. With K=1 this policy is equivalent to LRU.
+
+    The history of the last K requests of an item is retained also after the
+    item is evicted, so that items requested again shortly after eviction
+    are correctly ranked. The number of non-resident items whose history is
+    retained is bounded, which makes the memory footprint of this policy
+    independent of the number of distinct items requested.
+
+    Eviction candidates are kept in a binary heap keyed by the time of their
+    K-th most recent request, so that eviction takes O(log n) time. Entries of
+    the heap made obsolete by cache hits are discarded lazily.
+
+    Time is measured as the number of requests processed by the cache. A
+    request for a non-resident item is recorded by the *get* method if the
+    item has a retained history, and otherwise by the *put* method.
+
+    References
+    ----------
+    E. J. O'Neil, P. E. O'Neil, G. Weikum, The LRU-K page replacement
+    algorithm for database disk buffering, in Proc. of ACM SIGMOD'93
+    """
+
+    def __init__(self, maxlen, k=2, history=None, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of items the cache can store
+        k : int, optional
+            The number of most recent requests considered for each item
+        history : int, optional
+            The maximum number of non-resident items whose request history is
+            retained. If not specified, it is equal to *maxlen*
+        """
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._k = int(k)
+        if self._k <= 0:
+            raise ValueError('k must be positive')
+        self._history_len = self._maxlen if history is None else int(history)
+        if self._history_len < 0:
+            raise ValueError('history must be non-negative')
+        # Times of the last K requests of resident and non-resident items
+        self._history = {}
+        # Non-resident items with retained history, most recent on top
+        self._ghost = LinkedSet()
+        self._cache = set()
+        # Sequence number of the valid heap entry of each resident item
+        self._entry = {}
+        self._heap = []
+        self._seq = 0
+        self._t = 0
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    def _priority(self, k):
+        """Return the eviction priority of an item, lowest evicted first"""
+        history = self._history[k]
+        kth = history[0] if len(history) == self._k else -1
+        return (kth, history[-1])
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache, sorted by
+        increasing backward K-distance, i.e. the last item is the next to be
+        evicted.
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        return sorted(self._cache, key=self._priority, reverse=True)
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._cache
+
+    def _push(self, k):
+        """Push an item in the heap of eviction candidates"""
+        self._seq += 1
+        self._entry[k] = self._seq
+        heapq.heappush(self._heap, (self._priority(k), self._seq, k))
+        if len(self._heap) > 2 * len(self._cache) + 64:
+            # Too many obsolete entries: rebuild the heap
+            self._heap = [(self._priority(v), self._entry[v], v)
+                          for v in self._cache]
+            heapq.heapify(self._heap)
+
+    def _evict(self):
+        """Evict the item with the largest backward K-distance"""
+        while True:
+            _, seq, k = heapq.heappop(self._heap)
+            if self._entry.get(k) == seq:
+                break
+        del self._entry[k]
+        self._cache.remove(k)
+        self._retain(k)
+        return k
+
+    def _retain(self, k):
+        """Retain the history of an item which is no longer resident"""
+        if self._history_len == 0:
+            del self._history[k]
+            return
+        self._ghost.append_top(k)
+        if len(self._ghost) > self._history_len:
+            del self._history[self._ghost.pop_bottom()]
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        self._t += 1
+        if k in self._cache:
+            self._history[k].append(self._t)
+            self._push(k)
+            return True
+        if k in self._ghost:
+            self._ghost.move_to_top(k)
+            self._history[k].append(self._t)
+        return False
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._cache:
+            return None
+        if k in self._ghost:
+            self._ghost.remove(k)
+            if self._history[k][-1] != self._t:
+                # The request was not recorded by a get
+                self._t += 1
+                self._history[k].append(self._t)
+        else:
+            self._t += 1
+            self._history[k] = deque([self._t], maxlen=self._k)
+        evicted = self._evict() if len(self._cache) >= self._maxlen else None
+        self._cache.add(k)
+        self._push(k)
+        return evicted
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.remove(k)
+        del self._entry[k]
+        self._retain(k)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._history.clear()
+        self._ghost.clear()
+        self._cache.clear()
+        self._entry.clear()
+        self._heap = []
+        self._t = 0
+
+
+@register_cache_policy('2Q')
+class TwoQueueCache(Cache):
+    """2Q cache implementation.
+
+    Cached items are split between two queues: a FIFO queue (A1in) storing
+    items requested once and an LRU queue (Am) storing items requested more
+    than once. When an item is evicted from A1in, its key is recorded in a
+    bounded FIFO queue of non-resident items (A1out). Items requested again
+    while in A1out are inserted in Am, while all other new items are inserted
+    in A1in. Items are evicted from A1in if it exceeds its target size and
+    from Am otherwise.
+
+    This policy protects frequently requested items from items requested only
+    once and all its operations take O(1) time.
+
+    References
+    ----------
+    T. Johnson, D. Shasha, 2Q: a low overhead high performance buffer
+    management replacement algorithm, in Proc. of VLDB'94
+    """
+
+    def __init__(self, maxlen, kin=0.25, kout=0.5, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of items the cache can store
+        kin : float, optional
+            The target size of A1in, as a fraction of *maxlen*
+        kout : float, optional
+            The maximum number of non-resident items in A1out, as a fraction of
+            *maxlen*
+        """
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        if kin <= 0 or kin > 1:
+            raise ValueError('kin must be in (0, 1]')
+        if kout < 0:
+            raise ValueError('kout must be non-negative')
+        self._kin = max(1, int(round(kin * self._maxlen)))
+        self._kout = int(round(kout * self._maxlen))
+        self._a1in = LinkedSet()
+        self._a1out = LinkedSet()
+        self._am = LinkedSet()
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._a1in) + len(self._am)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._maxlen
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache.
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items in Am, from the most to the least recently
+            used, followed by all items in A1in, from the most to the least
+            recently inserted
+        """
+        return list(self._am) + list(self._a1in)
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._am or k in self._a1in
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k in self._am:
+            self._am.move_to_top(k)
+            return True
+        return k in self._a1in
+
+    def _reclaim(self):
+        """Evict an item to make room for a new one"""
+        if len(self._a1in) > self._kin or len(self._am) == 0:
+            evicted = self._a1in.pop_bottom()
+            if self._kout > 0:
+                self._a1out.append_top(evicted)
+                if len(self._a1out) > self._kout:
+                    self._a1out.pop_bottom()
+        else:
+            evicted = self._am.pop_bottom()
+        return evicted
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        if k in self._am:
+            self._am.move_to_top(k)
+            return None
+        if k in self._a1in:
+            return None
+        # Check A1out before reclaiming, which may push k out of it
+        reused = k in self._a1out
+        if reused:
+            self._a1out.remove(k)
+        evicted = self._reclaim() if len(self) >= self._maxlen else None
+        if reused:
+            self._am.append_top(k)
+        else:
+            self._a1in.append_top(k)
+        return evicted
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k in self._am:
+            self._am.remove(k)
+        elif k in self._a1in:
+            self._a1in.remove(k)
+        else:
+            return False
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._a1in.clear()
+        self._a1out.clear()
+        self._am.clear()
+
+
+def _item_size(sizes, k, size):
+    """Return the size of an item inserted in a byte-capacity cache.
+
+    Parameters
+    ----------
+    sizes : dict
+        Table mapping items to their size
+    k : any hashable type
+        The item
+    size : int
+        The size of the item, if explicitly given, or *None*
+
+    Returns
+    -------
+    size : int
+        The size of the item. Items whose size is neither explicitly given nor
+        listed in the size table have unit size
+    """
+    if size is None:
+        size = sizes.get(k, 1)
+    if size < 0:
+        raise ValueError('The size of an item cannot be negative')
+    return size
+
+
+class ByteCache(Cache):
+    """Base implementation of a cache with capacity expressed in bytes.
+
+    Items have different sizes and the capacity of the cache is the maximum
+    cumulative size of the items it can store. Items are kept in a linked set
+    and evicted from its bottom, so inserting an item may cause the eviction
+    of more than one item. Items larger than the capacity of the cache are
+    not inserted. Subclasses define how a hit changes the position of the
+    item by implementing the *_hit* method.
+
+    The size of an item can be passed explicitly to the *put* method, or it
+    can be looked up in a table mapping each item to its size provided to the
+    constructor.
+    """
+
+    byte_capacity = True
+
+    def __init__(self, maxlen, sizes=None, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum cumulative size (in bytes) of the items the cache can
+            store
+        sizes : dict, optional
+            Table mapping items to their size. Items not in the table have
+            unit size unless their size is given on insertion
+        """
+        self._cache = LinkedSet()
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._sizes = sizes if sizes is not None else {}
+        self._size = {}
+        self._used = 0
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def maxlen(self):
+        """The capacity of the cache in bytes"""
+        return self._maxlen
+
+    @property
+    def used(self):
+        """The cumulative size in bytes of the items stored in the cache"""
+        return self._used
+
+    def _hit(self, k):
+        """Update the position of an item stored in the cache on a hit"""
+        raise NotImplementedError('This method is not implemented')
+
+    @inheritdoc(Cache)
+    def dump(self):
+        return list(iter(self._cache))
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._cache
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._hit(k)
+        return True
+
+    def put(self, k, size=None, *args, **kwargs):
+        """Insert an item in the cache if not already inserted.
+
+        If the element is already present in the cache, it is handled as a
+        hit, as if it was retrieved with *get*.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+        size : int, optional
+            The size of the item. If not given, it is looked up in the size
+            table of the cache
+
+        Returns
+        -------
+        evicted : list
+            The list of evicted items, in order of eviction, or *None* if no
+            items were evicted
+        """
+        if k in self._cache:
+            self._hit(k)
+            return None
+        size = _item_size(self._sizes, k, size)
+        if size > self._maxlen:
+            return None
+        evicted = []
+        while self._used + size > self._maxlen:
+            v = self._cache.pop_bottom()
+            self._used -= self._size.pop(v)
+            evicted.append(v)
+        self._cache.append_top(k)
+        self._size[k] = size
+        self._used += size
+        return evicted if evicted else None
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._cache:
+            return False
+        self._cache.remove(k)
+        self._used -= self._size.pop(k)
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._cache.clear()
+        self._size.clear()
+        self._used = 0
+
+
+@register_cache_policy('BYTE_LRU')
+class ByteLruCache(ByteCache):
+    """Least Recently Used (LRU) cache with capacity expressed in bytes.
+
+    This cache behaves like an LRU cache but items have different sizes and
+    the capacity of the cache is the maximum cumulative size of the items it
+    can store (see `ByteCache`). A hit moves the item to the top of the
+    cache.
+    """
+
+    def _hit(self, k):
+        self._cache.move_to_top(k)
+
+
+@register_cache_policy('BYTE_FIFO')
+class ByteFifoCache(ByteCache):
+    """First In First Out (FIFO) cache with capacity expressed in bytes.
+
+    This cache behaves like a FIFO cache but items have different sizes and
+    the capacity of the cache is the maximum cumulative size of the items it
+    can store (see `ByteCache`). A hit does not change the state of the
+    cache.
+    """
+
+    def _hit(self, k):
+        pass
+
+
+@register_cache_policy('GDSF')
+class GdsfCache(Cache):
+    """Greedy Dual-Size Frequency (GDSF) cache implementation.
+
+    This is a size-aware policy with capacity expressed in bytes. Each cached
+    item *k* is assigned a priority *L + f(k) / s(k)*, where *f(k)* is the
+    number of requests for *k* since it was inserted, *s(k)* is its size and
+    *L* is an inflation value, equal to the priority of the last evicted item,
+    which ages items that are no longer requested. The item with the lowest
+    priority is evicted first. This policy favors small and popular items and
+    therefore yields high cache hit ratios when item sizes vary widely.
+
+    Priorities are kept in a binary heap, so that eviction takes O(log n)
+    time. Entries of the heap made obsolete by cache hits are discarded
+    lazily.
+
+    The size of an item can be passed explicitly to the *put* method, or it
+    can be looked up in a table mapping each item to its size provided to the
+    constructor.
+
+    References
+    ----------
+    L. Cherkasova, Improving WWW proxies performance with Greedy-Dual-Size-
+    Frequency caching policy, HP Labs technical report HPL-98-69, 1998
+    """
+
+    byte_capacity = True
+
+    @inheritdoc(ByteCache)
+    def __init__(self, maxlen, sizes=None, *args, **kwargs):
+        self._maxlen = int(maxlen)
+        if self._maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        self._sizes = sizes if sizes is not None else {}
+        self._size = {}
+        self._freq = {}
+        self._priority = {}
+        # Sequence number of the valid heap entry of each item
+        self._entry = {}
+        self._heap = []
+        self._seq = 0
+        self._inflation = 0.0
+        self._used = 0
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return len(self._size)
+
+    @property
+    def maxlen(self):
+        """The capacity of the cache in bytes"""
+        return self._maxlen
+
+    @property
+    def used(self):
+        """The cumulative size in bytes of the items stored in the cache"""
+        return self._used
+
+    def dump(self):
+        """Return a dump of all the elements currently in the cache, sorted by
+        decreasing priority, i.e. the last item is the next to be evicted.
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        return sorted(self._size, key=lambda k: (self._priority[k], self._entry[k]),
+                      reverse=True)
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return k in self._size
+
+    def _push(self, k):
+        """Compute the priority of an item and push it in the heap"""
+        self._priority[k] = self._inflation + self._freq[k] / self._size[k] \
+                            if self._size[k] > 0 else float('inf')
+        self._seq += 1
+        self._entry[k] = self._seq
+        heapq.heappush(self._heap, (self._priority[k], self._seq, k))
+        if len(self._heap) > 2 * len(self._size) + 64:
+            # Too many obsolete entries: rebuild the heap
+            self._heap = [(self._priority[v], self._entry[v], v)
+                          for v in self._size]
+            heapq.heapify(self._heap)
+
+    def _pop(self):
+        """Remove the item with the lowest priority from the cache"""
+        while True:
+            priority, seq, k = heapq.heappop(self._heap)
+            if self._entry.get(k) == seq:
+                break
+        self._inflation = priority
+        self._used -= self._size.pop(k)
+        del self._freq[k]
+        del self._priority[k]
+        del self._entry[k]
+        return k
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        if k not in self._size:
+            return False
+        self._freq[k] += 1
+        self._push(k)
+        return True
+
+    @inheritdoc(ByteCache)
+    def put(self, k, size=None, *args, **kwargs):
+        if k in self._size:
+            return None
+        size = _item_size(self._sizes, k, size)
+        if size > self._maxlen:
+            return None
+        evicted = []
+        while self._used + size > self._maxlen:
+            evicted.append(self._pop())
+        self._size[k] = size
+        self._freq[k] = 1
+        self._used += size
+        self._push(k)
+        return evicted if evicted else None
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        if k not in self._size:
+            return False
+        self._used -= self._size.pop(k)
+        del self._freq[k]
+        del self._priority[k]
+        del self._entry[k]
+        return True
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._size.clear()
+        self._freq.clear()
+        self._priority.clear()
+        self._entry.clear()
+        self._heap = []
+        self._inflation = 0.0
+        self._used = 0
+
+
 def insert_after_k_hits_cache(cache, k=2, memory=None):
     """Return a cache inserting items only after k requests.
 
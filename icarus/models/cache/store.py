@@ -0,0 +1,410 @@
+"""Network-wide cache stores
+
+This module contains data structures storing the state of all caches of a
+network in a single object, so that the caches of many nodes can be looked up
+with a single operation.
+"""
+from __future__ import division
+
+import numpy as np
+
+from icarus.util import inheritdoc
+
+from .policies import Cache, LinkedSet
+
+
+__all__ = [
+    'LruCacheStore',
+    'LruCacheStoreNode',
+           ]
+
+
+class LruCacheStore(object):
+    """Store of the LRU caches of a set of nodes.
+
+    The recency order of the items of each node is kept in a doubly-linked set
+    as in `LruCache`, so that all operations on the cache of a single node take
+    constant time. In addition, the store keeps a sparse map from each content
+    stored in at least a cache to the sorted array of the indices of the nodes
+    storing it. Checking which caches of a sequence of nodes (e.g. a path)
+    store a content is then a single vectorized operation between the indices
+    of the nodes and the array of the content, and the memory of the store is
+    proportional to the number of items stored.
+
+    Caches of single nodes can be accessed as regular cache objects through
+    the *cache* method.
+    """
+
+    def __init__(self, cache_size):
+        """Constructor
+
+        Parameters
+        ----------
+        cache_size : dict
+            Dictionary mapping each node to the maximum number of items its
+            cache can store
+        """
+        if any(maxlen <= 0 for maxlen in cache_size.values()):
+            raise ValueError('maxlen must be positive')
+        self._nodes = list(cache_size)
+        self._node_index = {v: i for i, v in enumerate(self._nodes)}
+        self._maxlen = [int(cache_size[v]) for v in self._nodes]
+        # Items of each node, from the most to the least recently used
+        self._cache = [LinkedSet() for _ in self._nodes]
+        # Dictionary mapping each content stored in at least a cache to the
+        # sorted array of the indices of the nodes storing it
+        self._where = {}
+        self._path_index = {}
+
+    def __contains__(self, node):
+        return node in self._node_index
+
+    @property
+    def nodes(self):
+        """The nodes whose caches are in the store"""
+        return list(self._nodes)
+
+    def cache(self, node):
+        """Return the cache of a node as a cache object.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+
+        Returns
+        -------
+        cache : LruCacheStoreNode
+            The cache of the node
+        """
+        if node not in self._node_index:
+            raise ValueError('Node %s has no cache in the store' % str(node))
+        return LruCacheStoreNode(self, node)
+
+    def node_index(self, nodes):
+        """Return the array of the indices of a sequence of nodes.
+
+        Nodes without cache are mapped to a placeholder index which never
+        stores any content. Arrays are memoized, so that looking up the same
+        sequence of nodes repeatedly does not require a conversion.
+
+        Parameters
+        ----------
+        nodes : sequence
+            The nodes
+
+        Returns
+        -------
+        index : numpy.ndarray
+            The array of indices
+        """
+        key = tuple(nodes)
+        index = self._path_index.get(key)
+        if index is None:
+            placeholder = len(self._nodes)
+            index = np.array([self._node_index.get(v, placeholder) for v in key],
+                             dtype=np.int64)
+            self._path_index[key] = index
+        return index
+
+    def _set(self, i, k):
+        """Record that the node of index *i* stores a content"""
+        where = self._where.get(k)
+        if where is None:
+            self._where[k] = np.array([i], dtype=np.int64)
+        else:
+            j = where.searchsorted(i)
+            self._where[k] = np.concatenate((where[:j], [i], where[j:]))
+
+    def _unset(self, i, k):
+        """Record that the node of index *i* no longer stores a content"""
+        where = self._where[k]
+        if len(where) == 1:
+            del self._where[k]
+        else:
+            self._where[k] = where[where != i]
+
+    def maxlen(self, node):
+        """Return the maximum number of items the cache of a node can store"""
+        return self._maxlen[self._node_index[node]]
+
+    def len(self, node):
+        """Return the number of items currently stored in the cache of a node"""
+        return len(self._cache[self._node_index[node]])
+
+    def has(self, node, k):
+        """Check if the cache of a node stores an item without changing its
+        internal state.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        v : bool
+            *True* if the requested item is in the cache, *False* otherwise
+        """
+        return k in self._cache[self._node_index[node]]
+
+    def get(self, node, k):
+        """Retrieve an item from the cache of a node, updating its recency.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        v : bool
+            *True* if the requested item is in the cache, *False* otherwise
+        """
+        cache = self._cache[self._node_index[node]]
+        if k not in cache:
+            return False
+        cache.move_to_top(k)
+        return True
+
+    def put(self, node, k):
+        """Insert an item in the cache of a node if not already inserted.
+
+        If the element is already present in the cache, it will pushed to the
+        top of the cache.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        k : any hashable type
+            The item to be inserted
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        i = self._node_index[node]
+        cache = self._cache[i]
+        if k in cache:
+            cache.move_to_top(k)
+            return None
+        cache.append_top(k)
+        self._set(i, k)
+        if len(cache) <= self._maxlen[i]:
+            return None
+        evicted = cache.pop_bottom()
+        self._unset(i, evicted)
+        return evicted
+
+    def remove(self, node, k):
+        """Remove an item from the cache of a node, if present.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        k : any hashable type
+            The item to remove
+
+        Returns
+        -------
+        removed : bool
+            *True* if the content was in the cache, *False* if it was not.
+        """
+        i = self._node_index[node]
+        cache = self._cache[i]
+        if k not in cache:
+            return False
+        cache.remove(k)
+        self._unset(i, k)
+        return True
+
+    def clear(self, node=None):
+        """Empty the cache of a node or of all nodes.
+
+        Parameters
+        ----------
+        node : any hashable type, optional
+            The node. If not specified, the caches of all nodes are emptied
+        """
+        if node is None:
+            self._where = {}
+            for cache in self._cache:
+                cache.clear()
+            return
+        i = self._node_index[node]
+        for k in self._cache[i]:
+            self._unset(i, k)
+        self._cache[i].clear()
+
+    def dump(self, node):
+        """Return a dump of all the elements currently in the cache of a node,
+        from the most to the least recently used.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+
+        Returns
+        -------
+        cache_dump : list
+            The list of all items currently stored in the cache
+        """
+        return list(self._cache[self._node_index[node]])
+
+    def position(self, node, k):
+        """Return the current position of an item in the cache of a node.
+        Position *0* refers to the most recently used item.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The node
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        position : int
+            The current position of the item in the cache
+        """
+        if not self.has(node, k):
+            raise ValueError('The item %s is not in the cache' % str(k))
+        return self._cache[self._node_index[node]].index(k)
+
+    def hits(self, nodes, k):
+        """Return which caches of a sequence of nodes store an item, without
+        changing their internal state.
+
+        Parameters
+        ----------
+        nodes : sequence
+            The nodes. Nodes without cache are allowed and never store items
+        k : any hashable type
+            The item looked up
+
+        Returns
+        -------
+        hits : numpy.ndarray
+            Array of booleans, whose i-th element is *True* if the i-th node
+            stores the item
+        """
+        index = self.node_index(nodes)
+        where = self._where.get(k)
+        if where is None:
+            return np.zeros(len(index), dtype=bool)
+        # The array of the content is sorted, so each node stores the content
+        # if it is found at its insertion point
+        return where.take(where.searchsorted(index), mode='clip') == index
+
+    def first_hit(self, nodes, k, update=False):
+        """Return the position of the first node of a sequence whose cache
+        stores an item.
+
+        Parameters
+        ----------
+        nodes : sequence
+            The nodes, e.g. a path. Nodes without cache are allowed and never
+            store items
+        k : any hashable type
+            The item looked up
+        update : bool, optional
+            If *True*, the recency of the item in the cache of the first node
+            storing it is updated, as if it was retrieved with *get*
+
+        Returns
+        -------
+        index : int
+            The position in *nodes* of the first node storing the item or
+            *None* if no node stores it
+        """
+        if k not in self._where:
+            return None
+        hits = self.hits(nodes, k)
+        if not hits.any():
+            return None
+        index = int(hits.argmax())
+        if update:
+            self._cache[self.node_index(nodes)[index]].move_to_top(k)
+        return index
+
+
+class LruCacheStoreNode(Cache):
+    """The cache of a single node of a `LruCacheStore`.
+
+    This class exposes the interface of a regular LRU cache and delegates all
+    operations to the store.
+    """
+
+    def __init__(self, store, node, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        store : LruCacheStore
+            The store
+        node : any hashable type
+            The node
+        """
+        self._store = store
+        self._node = node
+
+    @inheritdoc(Cache)
+    def __len__(self):
+        return self._store.len(self._node)
+
+    @property
+    @inheritdoc(Cache)
+    def maxlen(self):
+        return self._store.maxlen(self._node)
+
+    @inheritdoc(Cache)
+    def dump(self):
+        return self._store.dump(self._node)
+
+    def position(self, k, *args, **kwargs):
+        """Return the current position of an item in the cache. Position *0*
+        refers to the head of cache (i.e. most recently used item), while
+        position *maxlen - 1* refers to the tail of the cache (i.e. the least
+        recently used item).
+
+        This method does not change the internal state of the cache.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        position : int
+            The current position of the item in the cache
+        """
+        return self._store.position(self._node, k)
+
+    @inheritdoc(Cache)
+    def has(self, k, *args, **kwargs):
+        return self._store.has(self._node, k)
+
+    @inheritdoc(Cache)
+    def get(self, k, *args, **kwargs):
+        return self._store.get(self._node, k)
+
+    @inheritdoc(Cache)
+    def put(self, k, *args, **kwargs):
+        return self._store.put(self._node, k)
+
+    @inheritdoc(Cache)
+    def remove(self, k, *args, **kwargs):
+        return self._store.remove(self._node, k)
+
+    @inheritdoc(Cache)
+    def clear(self):
+        self._store.clear(self._node)
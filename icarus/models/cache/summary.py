@@ -0,0 +1,264 @@
+"""Cache summaries
+
+This module contains caches maintaining a compact summary of their content,
+i.e. a cuckoo filter tracking insertions and evictions. Summaries can be
+exchanged among caches and looked up by neighboring nodes before querying the
+actual cache, at the cost of occasional false positives.
+
+A summary is added to a cache replacement policy by the `summary_cache`
+function, which returns a new cache class deriving from both `SummaryCache`
+and the replacement policy class.
+
+Summaries can be enabled in the cache policy configuration, for example::
+
+    cache_policy = {'name': 'LRU', 'summary': {'fingerprint_size': 2}}
+
+By default neighbors see the summary as it is. If the summary is broadcast,
+neighbors see instead a digest, i.e. a copy of the summary as it was when it
+was last published, which is refreshed either by a full copy or by applying
+only the entries changed since the last publication.
+"""
+from __future__ import division
+import copy
+import math
+
+from icarus.registry import CACHE_POLICY
+from .cuckoofilter import CuckooFilter
+
+
+__all__ = [
+        'SummaryCache',
+        'summary_cache',
+           ]
+
+
+class SummaryCache(object):
+    """Base implementation of a cache maintaining a cuckoo filter summary of
+    its content.
+
+    This class is not a cache itself and is meant to be combined with a cache
+    replacement policy using the `summary_cache` function. The summary is
+    updated whenever an item is inserted, evicted or removed, so that it
+    never reports false negatives, unless it overflows. Items which cannot
+    be inserted in a full summary are counted in its *overflows* attribute
+    rather than interrupting the insertion in the cache, and are not removed
+    from the summary when they leave the cache, since the fingerprint found
+    may belong to another item.
+    """
+
+    # Arguments of the summary, bound by summary_cache
+    summary_args = {}
+
+    # Size in bytes of the index of the bucket of each entry of a delta update
+    delta_index_size = 4
+
+    def __init__(self, maxlen, *args, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        maxlen : int
+            The maximum number of items the cache can store
+        *args, **kwargs
+            Arguments of the cache replacement policy
+        """
+        super(SummaryCache, self).__init__(maxlen, *args, **kwargs)
+        self.init_summary(**self.summary_args)
+
+    def init_summary(self, fingerprint_size=2, bucket_size=4, load=0.5,
+                     capacity=None, broadcast=False):
+        """Initialize the summary
+
+        Parameters
+        ----------
+        fingerprint_size : int, optional
+            The size of the fingerprint of each item, in bytes
+        bucket_size : int, optional
+            The number of fingerprints stored in each bucket of the filter
+        load : float, optional
+            The maximum load factor of the filter, used to size it
+        capacity : int, optional
+            The maximum number of items tracked by the filter. If not
+            specified, it is equal to the cache size
+        broadcast : bool, optional
+            If *True*, neighbors see a digest of the summary refreshed only
+            when *publish_summary* is called, otherwise they see the summary
+        """
+        if fingerprint_size < 1 or bucket_size < 1:
+            raise ValueError('fingerprint_size and bucket_size must be positive')
+        if not 0 < load <= 1:
+            raise ValueError('load must be a value between 0 and 1')
+        capacity = self.maxlen if capacity is None else int(capacity)
+        buckets = max(1, int(math.ceil(capacity / (bucket_size * load))))
+        self.summary = CuckooFilter(buckets, fingerprint_size,
+                                    bucket_size=bucket_size)
+        # The digest seen by neighbors and the items inserted (True) or
+        # removed (False) since it was last published
+        self.digest = CuckooFilter(buckets, fingerprint_size,
+                                   bucket_size=bucket_size) \
+                      if broadcast else self.summary
+        self._summary_changes = {}
+        # Items stored in the cache but not in the summary, which overflowed
+        self._summary_overflows = set()
+
+    def summary_contains(self, k):
+        """Check if the summary reports an item as stored in the cache.
+
+        The summary may report items which are not in the cache (false
+        positives), but never misses items which are in the cache.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up
+
+        Returns
+        -------
+        contains : bool
+            *True* if the summary reports the item, *False* otherwise
+        """
+        return self.summary.contains(k)
+
+    def digest_contains(self, k):
+        """Check if the digest of the summary seen by neighbors reports an
+        item as stored in the cache.
+
+        If the summary is broadcast, the digest may be stale, hence it may
+        report items evicted and miss items inserted since it was last
+        published. Otherwise, this is the same as *summary_contains*.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up
+
+        Returns
+        -------
+        contains : bool
+            *True* if the digest reports the item, *False* otherwise
+        """
+        return self.digest.contains(k)
+
+    def publish_summary(self, full=False):
+        """Refresh the digest of the summary seen by neighbors.
+
+        A delta update only applies the entries changed since the last
+        publication, hence its cost is proportional to the number of changes.
+
+        Parameters
+        ----------
+        full : bool, optional
+            If *True*, the digest is replaced by a copy of the whole summary,
+            otherwise only the changed entries are updated
+
+        Returns
+        -------
+        size : int
+            The size in bytes of the update sent to neighbors. A full update
+            has the size of the filter, while each entry of a delta update
+            has the size of a fingerprint and of the index of its bucket
+        """
+        if self.digest is self.summary:
+            return 0
+        changes = self._summary_changes
+        self._summary_changes = {}
+        if full:
+            self.digest = copy.deepcopy(self.summary)
+            return self.summary.get_memory()
+        for k, inserted in changes.items():
+            if not inserted:
+                self.digest.remove(k)
+        self.digest.add_many([k for k, inserted in changes.items() if inserted])
+        return len(changes) * (self.summary.item_fingerprint_size +
+                               self.delta_index_size)
+
+    def _summary_changed(self, k, inserted):
+        """Update the summary and record the change for the next delta
+        update of the digest"""
+        # Overflowed items are tracked neither by the summary nor by the digest
+        if inserted:
+            if self.summary.add(k) is None:
+                self._summary_overflows.add(k)
+                return
+        elif k in self._summary_overflows:
+            self._summary_overflows.remove(k)
+            return
+        else:
+            self.summary.remove(k)
+        if self.digest is not self.summary:
+            # An insertion and a removal of the same item cancel each other
+            if self._summary_changes.get(k, inserted) != inserted:
+                del self._summary_changes[k]
+            else:
+                self._summary_changes[k] = inserted
+
+    def put(self, k, *args, **kwargs):
+        """Insert an item in the cache and update the summary.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to be inserted
+
+        Returns
+        -------
+        evicted : any hashable type
+            The evicted object or *None* if no contents were evicted.
+        """
+        inserted = not self.has(k)
+        evicted = super(SummaryCache, self).put(k, *args, **kwargs)
+        if evicted is not None:
+            for e in (evicted if isinstance(evicted, list) else [evicted]):
+                self._summary_changed(e, False)
+        if inserted and self.has(k):
+            self._summary_changed(k, True)
+        return evicted
+
+    def remove(self, k, *args, **kwargs):
+        """Remove an item from the cache and the summary, if present.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item to remove
+
+        Returns
+        -------
+        removed : bool
+            *True* if the content was in the cache, *False* if it was not.
+        """
+        removed = super(SummaryCache, self).remove(k, *args, **kwargs)
+        if removed:
+            self._summary_changed(k, False)
+        return removed
+
+    def clear(self):
+        """Empty the cache and the summary. The digest seen by neighbors is
+        emptied at the next publication"""
+        for k in self.dump():
+            self._summary_changed(k, False)
+        super(SummaryCache, self).clear()
+
+
+def summary_cache(policy, **kwargs):
+    """Return a cache class maintaining a cuckoo filter summary of the content
+    of a cache replacement policy.
+
+    Parameters
+    ----------
+    policy : str or type
+        The cache replacement policy class or its name
+    **kwargs
+        Arguments of the summary (see `SummaryCache.init_summary`)
+
+    Returns
+    -------
+    cache_class : type
+        The cache class
+    """
+    if not isinstance(policy, type):
+        if policy not in CACHE_POLICY:
+            raise ValueError('No cache policy named %s' % str(policy))
+        policy = CACHE_POLICY[policy]
+    return type('Summary' + policy.__name__, (SummaryCache, policy),
+                {'summary_args': kwargs})
@@ -1,8 +1,13 @@
 """Simple networks of caches modeled as single caches."""
+from __future__ import division
+import bisect
+import math
+import numbers
 import random
 import numpy as np
 
-from icarus.util import inheritdoc
+from icarus.util import inheritdoc, apportionment, key_to_int, \
+                        keys_to_array, mix64, mix64_many
 from icarus.tools import DiscreteDist
 from icarus.registry import register_cache_policy, CACHE_POLICY
 
@@ -13,10 +18,21 @@ __all__ = [
     'PathCache',
     'TreeCache',
     'ArrayCache',
+    'ConsistentHashRing',
     'ShardedCache',
+    'tiered_cache',
            ]
 
 
+def _system_evicted(system, evicted):
+    """Return the list of the items evicted by a cache of a system of caches
+    which are not stored by any other cache of the system"""
+    if evicted is None:
+        return []
+    return [e for e in (evicted if isinstance(evicted, list) else [evicted])
+            if not system.has(e)]
+
+
 @register_cache_policy('PATH')
 class PathCache(object):
     """Path of caches
@@ -26,25 +42,40 @@ class PathCache(object):
     path and, in case of a miss, are propagated down to the remaining nodes
     of the path. A miss occurs if none of the nodes on the path has the
     requested content.
+
+    It can also model the tiers of the cache of a single node, e.g. a RAM
+    tier followed by an SSD tier, each with its own access latency.
     """
 
-    def __init__(self, caches, **kwargs):
+    def __init__(self, caches, tier_latency=None, **kwargs):
         """Constructor
 
         Parameters
         ----------
         caches : array-like
             An array of caching nodes instances on the path
+        tier_latency : array-like, optional
+            The access latency of each cache. If not specified, it is 0
         """
         self._caches = caches
-        self._len = len(caches)
+        self._n_tiers = len(caches)
+        self.tier_latency = list(tier_latency) if tier_latency is not None \
+                            else [0] * len(caches)
 
     def __len__(self):
-        return self._len
+        """Return the number of items stored by the caches of the path, where
+        an item stored by several caches is counted once per cache, like
+        *maxlen* sums the capacities of all caches"""
+        return sum(len(c) for c in self._caches)
 
     @property
     def maxlen(self):
-        return self._len
+        return sum(c.maxlen for c in self._caches)
+
+    @property
+    def n_tiers(self):
+        """The number of caches of the path"""
+        return self._n_tiers
 
     def has(self, k):
         for c in self._caches:
@@ -54,15 +85,58 @@ class PathCache(object):
             return False
 
     def get(self, k):
-        for i in range(self._len):
+        return self.get_tier(k) is not None
+
+    def get_tier(self, k):
+        """Retrieve an item from the cache and return the index of the
+        cache (tier) which served it.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the cache which served the item in the list of
+            caches or *None* if the item is not in the cache
+        """
+        for i in range(self._n_tiers):
             if self._caches[i].get(k):
                 break
         else:
-            return False
+            return None
         # Put contents on all caches traversed by the retrieved content
         for j in range(i):
-            self._caches[j].put(k)
-        return True
+            self._promote(self._caches[j], k)
+        return i
+
+    def peek_tier(self, k):
+        """Return the index of the cache (tier) which would serve an item,
+        without changing the internal state of the caches.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the first cache storing the item or *None* if the
+            item is not in the cache
+        """
+        for i, c in enumerate(self._caches):
+            if c.has(k):
+                return i
+        return None
+
+    def _promote(self, cache, k):
+        """Insert an item retrieved from a cache in another cache of the
+        system and return the items which are no longer stored by any cache
+        of the system as a result"""
+        return _system_evicted(self, cache.put(k))
 
     def put(self, k):
         """Insert an item in the cache if not already inserted.
@@ -77,11 +151,14 @@ class PathCache(object):
 
         Returns
         -------
-        evicted : any hashable type
-            The evicted object or *None* if no contents were evicted.
+        evicted : list
+            The items which are no longer stored by any cache of the path or
+            *None* if no contents were evicted.
         """
+        evicted = []
         for c in self._caches:
-            c.put(k)
+            evicted.extend(_system_evicted(self, c.put(k)))
+        return evicted or None
 
     def remove(self, k):
         raise NotImplementedError('This method is not implemented')
@@ -117,42 +194,91 @@ class TreeCache(object):
     selected node.
     """
 
-    def __init__(self, leaf_caches, root_cache, **kwargs):
+    def __init__(self, leaf_caches, root_cache, tier_latency=None, **kwargs):
         """Constructor
 
         Parameters
         ----------
-        caches : array-like
-            An array of caching nodes instances on the path
-        segments : int
-            The number of segments
+        leaf_caches : array-like
+            An array of caching nodes instances of the leaves
+        root_cache : Cache
+            The caching node instance of the root
+        tier_latency : array-like, optional
+            The access latency of each leaf cache followed by the access
+            latency of the root cache. If not specified, it is 0
         """
         self._leaf_caches = leaf_caches
         self._root_cache = root_cache
-        self._len = sum(len(c) for c in leaf_caches) + len(root_cache)
         self._n_leaves = len(leaf_caches)
         self._leaf = None
+        self.tier_latency = list(tier_latency) if tier_latency is not None \
+                            else [0] * (self._n_leaves + 1)
 
     def __len__(self):
-        return self._len
+        return sum(len(c) for c in self._leaf_caches) + len(self._root_cache)
 
     @property
     def maxlen(self):
-        return self._len
+        return sum(c.maxlen for c in self._leaf_caches) + self._root_cache.maxlen
 
     def has(self, k):
-        raise NotImplementedError('This method is not implemented')
+        return self._root_cache.has(k) or \
+               any(c.has(k) for c in self._leaf_caches)
 
     def get(self, k):
-        self._leaf = random.choice(self._leaf_caches)
+        return self.get_tier(k) is not None
+
+    def get_tier(self, k):
+        """Retrieve an item from the cache and return the index of the
+        cache (tier) which served it.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the leaf cache which served the item, the number of
+            leaves if the root cache served it or *None* if the item is not
+            in the cache
+        """
+        i = random.randrange(self._n_leaves)
+        self._leaf = self._leaf_caches[i]
         if self._leaf.get(k):
-            return True
+            return i
         else:
             if self._root_cache.get(k):
-                self._leaf.put(k)
-                return True
+                self._promote(self._leaf, k)
+                return self._n_leaves
             else:
-                return False
+                return None
+
+    def peek_tier(self, k):
+        """Return the index of a cache (tier) storing an item, without
+        changing the internal state of the caches.
+
+        Since leaves are selected at random on retrieval, the tier returned
+        is that of the first leaf storing the item or, if no leaf stores it,
+        of the root.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the first leaf storing the item, the number of
+            leaves if only the root stores it or *None* if the item is not in
+            the cache
+        """
+        for i, c in enumerate(self._leaf_caches):
+            if c.has(k):
+                return i
+        return self._n_leaves if self._root_cache.has(k) else None
 
     def put(self, k):
         """Insert an item in the cache if not already inserted.
@@ -167,14 +293,22 @@ class TreeCache(object):
 
         Returns
         -------
-        evicted : any hashable type
-            The evicted object or *None* if no contents were evicted.
+        evicted : list
+            The items which are no longer stored by any cache of the tree or
+            *None* if no contents were evicted.
         """
         if self._leaf is None:
             raise ValueError("You are trying to insert an item not requested before. "
                              "Tree cache can be used in read-through mode only")
-        self._leaf.put(k)
-        self._root_cache.put(k)
+        evicted = _system_evicted(self, self._leaf.put(k))
+        evicted.extend(_system_evicted(self, self._root_cache.put(k)))
+        return evicted or None
+
+    def _promote(self, cache, k):
+        """Insert an item retrieved from the root in a leaf and return the
+        items which are no longer stored by any cache of the tree as a
+        result"""
+        return _system_evicted(self, cache.put(k))
 
     def remove(self, k):
         raise NotImplementedError('This method is not implemented')
@@ -188,8 +322,9 @@ class TreeCache(object):
         return sum(dump, []) if serialized else dump
 
     def clear(self):
-        for c in self._caches:
+        for c in self._leaf_caches:
             c.clear()
+        self._root_cache.clear()
 
 
 @register_cache_policy('ARRAY')
@@ -209,7 +344,7 @@ class ArrayCache(object):
     selected node.
     """
 
-    def __init__(self, caches, weights=None, **kwargs):
+    def __init__(self, caches, weights=None, tier_latency=None, **kwargs):
         """Constructor
 
         Parameters
@@ -219,34 +354,79 @@ class ArrayCache(object):
         weights : array-like
             Random weights according to which a cache of the array should be
             selected to process a given request
+        tier_latency : array-like, optional
+            The access latency of each cache. If not specified, it is 0
         """
         self._caches = caches
-        self._len = sum(len(c) for c in caches)
         self._n_caches = len(caches)
         self._selected_cache = None
+        self.tier_latency = list(tier_latency) if tier_latency is not None \
+                            else [0] * self._n_caches
         if weights is not None:
             if np.abs(np.sum(weights) - 1) > 0.0001:
                 raise ValueError("weights must sum up to 1")
             if len(weights) != self._n_caches:
                 raise ValueError("weights must have as many elements as nr of caches")
             randvar = DiscreteDist(weights)
-            self.select_cache = lambda : self._caches[randvar.rv() - 1]
+            self.select_index = lambda : randvar.rv() - 1
         else:
-            self.select_cache = lambda : random.choice(self._caches)
+            self.select_index = lambda : random.randrange(self._n_caches)
+        self.select_cache = lambda : self._caches[self.select_index()]
 
     def __len__(self):
-        return self._len
+        return sum(len(c) for c in self._caches)
 
     @property
     def maxlen(self):
-        return self._len
+        return sum(c.maxlen for c in self._caches)
 
     def has(self, k):
-        raise NotImplementedError('This method is not implemented')
+        return any(c.has(k) for c in self._caches)
 
     def get(self, k):
-        self._selected_cache = self.select_cache()
-        return self._selected_cache.get(k)
+        return self.get_tier(k) is not None
+
+    def get_tier(self, k):
+        """Retrieve an item from a randomly selected cache of the array and
+        return the index of the cache if it served the item.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the selected cache if it stores the item or *None*
+            otherwise
+        """
+        i = self.select_index()
+        self._selected_cache = self._caches[i]
+        return i if self._selected_cache.get(k) else None
+
+    def peek_tier(self, k):
+        """Return the index of a cache of the array storing an item, without
+        changing the internal state of the caches.
+
+        Since caches are selected at random on retrieval, the tier returned
+        is that of the first cache storing the item.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item looked up in the cache
+
+        Returns
+        -------
+        tier : int
+            The index of the first cache storing the item or *None* if the
+            item is not in the cache
+        """
+        for i, c in enumerate(self._caches):
+            if c.has(k):
+                return i
+        return None
 
     def put(self, k):
         """Insert an item in the cache if not already inserted.
@@ -261,13 +441,14 @@ class ArrayCache(object):
 
         Returns
         -------
-        evicted : any hashable type
-            The evicted object or *None* if no contents were evicted.
+        evicted : list
+            The items which are no longer stored by any cache of the array or
+            *None* if no contents were evicted.
         """
         if self._selected_cache is None:
             raise ValueError("You are trying to insert an item not requested before. "
                              "Array cache can be used in read-through mode only")
-        self._selected_cache.put(k)
+        return _system_evicted(self, self._selected_cache.put(k)) or None
 
     def remove(self, k):
         raise NotImplementedError('This method is not implemented')
@@ -284,6 +465,195 @@ class ArrayCache(object):
             c.clear()
 
 
+class ConsistentHashRing(object):
+    """Consistent hashing ring with virtual nodes.
+
+    Each node is mapped to *vnodes* points of a ring of 64-bit integers and
+    each key is mapped to the node owning the first point following the hash
+    of the key on the ring. Adding or removing a node only remaps the keys
+    mapped to the points of that node. Hashes are stable across processes,
+    integer keys are hashed directly and other keys are hashed from their
+    string representation.
+
+    Keys are looked up in O(log(n * vnodes)) time by binary search. If keys are
+    dense integer identifiers, e.g. content identifiers in *range(dense)*,
+    the owners of all of them can be precomputed in a table so that they are
+    looked up in O(1) time.
+    """
+
+    def __init__(self, nodes, vnodes=100, dense=None):
+        """Constructor
+
+        Parameters
+        ----------
+        nodes : iterable
+            The nodes of the ring
+        vnodes : int, optional
+            The number of virtual nodes, i.e. of points on the ring, of each
+            node
+        dense : int, optional
+            If specified, the owners of all integer keys in *range(dense)* are
+            precomputed
+        """
+        if vnodes < 1:
+            raise ValueError('vnodes must be positive')
+        if dense is not None and dense < 0:
+            raise ValueError('dense must not be negative')
+        self._vnodes = vnodes
+        self._dense = dense
+        self._nodes = []
+        self._points = []
+        self._owners = []
+        for v in nodes:
+            self._insert_node(v)
+        if len(self._nodes) == 0:
+            raise ValueError('The ring must have at least one node')
+        self._update()
+
+    @staticmethod
+    def key_hash(k):
+        """Return the position of a key on the ring
+
+        Parameters
+        ----------
+        k : any hashable type
+            The key
+
+        Returns
+        -------
+        hash : int
+            The 64-bit hash of the key
+        """
+        return mix64(key_to_int(k))
+
+    def _node_points(self, v):
+        """Return the points of a node on the ring"""
+        h = mix64(key_to_int(v))
+        return [mix64((h + i) & 0xFFFFFFFFFFFFFFFF) for i in range(self._vnodes)]
+
+    def _insert_node(self, v):
+        """Insert the points of a node on the ring"""
+        if v in self._nodes:
+            raise ValueError('Node %s is already in the ring' % str(v))
+        self._nodes.append(v)
+        for p in self._node_points(v):
+            i = bisect.bisect_left(self._points, p)
+            self._points.insert(i, p)
+            self._owners.insert(i, v)
+
+    def _update(self):
+        """Update the arrays used for vectorized and table lookups"""
+        self._point_array = np.array(self._points, dtype=np.uint64)
+        self._node_index = {v: i for i, v in enumerate(self._nodes)}
+        self._owner_array = np.array([self._node_index[v] for v in self._owners],
+                                     dtype=np.int64)
+        self._table = self.lookup_index_many(np.arange(self._dense)) \
+                      if self._dense is not None else None
+
+    @property
+    def nodes(self):
+        """The nodes of the ring"""
+        return list(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __contains__(self, v):
+        return v in self._node_index
+
+    def add_node(self, v):
+        """Add a node to the ring
+
+        Parameters
+        ----------
+        v : any hashable type
+            The node
+        """
+        self._insert_node(v)
+        self._update()
+
+    def remove_node(self, v):
+        """Remove a node from the ring
+
+        Parameters
+        ----------
+        v : any hashable type
+            The node
+        """
+        if v not in self._node_index:
+            raise ValueError('Node %s is not in the ring' % str(v))
+        if len(self._nodes) == 1:
+            raise ValueError('The ring must have at least one node')
+        self._nodes.remove(v)
+        points = [(p, o) for p, o in zip(self._points, self._owners) if o != v]
+        self._points = [p for p, _ in points]
+        self._owners = [o for _, o in points]
+        self._update()
+
+    def lookup(self, k):
+        """Return the node a key is mapped to
+
+        Parameters
+        ----------
+        k : any hashable type
+            The key
+
+        Returns
+        -------
+        node : any hashable type
+            The node
+        """
+        if self._table is not None and isinstance(k, numbers.Integral) \
+                and 0 <= k < self._dense:
+            return self._nodes[self._table[k]]
+        i = bisect.bisect_left(self._points, self.key_hash(k))
+        return self._owners[i if i < len(self._points) else 0]
+
+    def lookup_index_many(self, keys):
+        """Return the indices in *nodes* of the nodes a batch of keys are
+        mapped to
+
+        Parameters
+        ----------
+        keys : iterable
+            The keys
+
+        Returns
+        -------
+        index : numpy.ndarray
+            The array of node indices
+        """
+        h = mix64_many(keys_to_array(keys))
+        i = np.searchsorted(self._point_array, h, side='left')
+        i[i == len(self._point_array)] = 0
+        return self._owner_array[i]
+
+    def successors(self, k):
+        """Return an iterator over all nodes, in the order they follow a key
+        on the ring. The first node is the node the key is mapped to.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The key
+
+        Returns
+        -------
+        successors : iterator
+            Iterator over the nodes
+        """
+        n = len(self._points)
+        start = bisect.bisect_left(self._points, self.key_hash(k))
+        seen = set()
+        for j in range(n):
+            v = self._owners[(start + j) % n]
+            if v not in seen:
+                seen.add(v)
+                yield v
+                if len(seen) == len(self._nodes):
+                    return
+
+
 @register_cache_policy('SHARD')
 class ShardedCache(Cache):
     """Set of sharded caches.
@@ -292,10 +662,23 @@ class ShardedCache(Cache):
     caches, the request is forwarded to the specific cache (shard) based on the
     outcome of a hash function. So, an item can be stored only by a single
     node of the system.
+
+    Unless a custom mapping is provided, items are mapped to nodes by a
+    consistent hashing ring with virtual nodes (see `ConsistentHashRing`), so
+    that nodes can be added and removed remapping only a small fraction of
+    items. Optionally, the number of items stored by each node can be bounded
+    to a multiple of the average, in which case an item is stored by the
+    first node following it on the ring which is not overloaded.
+
+    References
+    ----------
+    V. Mirrokni, M. Thorup, M. Zadimoghaddam, Consistent Hashing with Bounded
+    Loads, in Proc. of ACM-SIAM SODA'18
     """
 
     def __init__(self, maxlen, policy='LRU', nodes=4, f_map=None,
-                 policy_attr={}, **kwargs):
+                 policy_attr={}, vnodes=100, load_bound=None, dense=None,
+                 **kwargs):
         """Constructor
 
         Parameters
@@ -312,10 +695,19 @@ class ShardedCache(Cache):
             It receives as argument a value of an item :math:`k` and returns an
             integer between :math:`0` and :math:`nodes - 1` identifying the
             target node.
-            If not specified, the mapping is done by computing the hash of the
-            given item modulo the number of nodes.
+            If not specified, the mapping is done by a consistent hashing ring.
         policy_attr : dict, optional
             A set of parameters for initializing the underlying caching policy.
+        vnodes : int, optional
+            The number of virtual nodes of each node on the consistent hashing
+            ring
+        load_bound : float, optional
+            If specified, each node stores at most *load_bound* times the
+            average number of items stored by a node, rounded up. It must be
+            at least 1
+        dense : int, optional
+            If specified, the nodes of integer items in *range(dense)* are
+            precomputed, so that they are looked up in constant time
 
         Notes
         -----
@@ -328,46 +720,282 @@ class ShardedCache(Cache):
             raise ValueError('maxlen must be positive')
         if not isinstance(nodes, int) or nodes <= 0 or nodes > maxlen:
             raise ValueError('nodes must be an integer and 0 < nodes <= maxlen')
+        if load_bound is not None and (f_map is not None or load_bound < 1):
+            raise ValueError('load_bound must be at least 1 and requires '
+                             'consistent hashing')
         # If maxlen is not a multiple of nodes, then some nodes have one slot
         # more than others
         self._node_maxlen = [maxlen // nodes for _ in range(nodes)]
         for i in range(maxlen % nodes):
             self._node_maxlen[i] += 1
         self._maxlen = maxlen
-        self._node = [CACHE_POLICY[policy](self._node_maxlen[i], **policy_attr)
-                      for i in range(nodes)]
-        self.f_map = f_map if f_map is not None else lambda k: hash(k) % nodes
+        self._policy = policy
+        self._policy_attr = policy_attr
+        self._node = {i: CACHE_POLICY[policy](self._node_maxlen[i], **policy_attr)
+                      for i in range(nodes)}
+        self._node_ids = list(range(nodes))
+        # Next identifier assigned to a node added without identifier
+        self._next_node_id = nodes
+        if f_map is not None:
+            self._ring = None
+            self.f_map = f_map
+        else:
+            self._ring = ConsistentHashRing(range(nodes), vnodes, dense)
+            self.f_map = self._ring.lookup
+        self._load_bound = load_bound
+        if load_bound is not None:
+            # Node of each stored item and number of items of each node
+            self._assigned = {}
+            self._load = {i: 0 for i in range(nodes)}
 
     @inheritdoc(Cache)
     def __len__(self):
-        return sum(len(s) for s in self._node)
+        return sum(len(s) for s in self._node.values())
 
     @property
     def maxlen(self):
         return self._maxlen
 
+    @property
+    def nodes(self):
+        """The identifiers of the nodes"""
+        return list(self._node_ids)
+
+    def node_of(self, k):
+        """Return the node storing an item or that would store it if inserted.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The item
+
+        Returns
+        -------
+        node : any hashable type
+            The node
+        """
+        if self._load_bound is not None:
+            node = self._assigned.get(k)
+            return node if node is not None else self._place(k)
+        return self.f_map(k)
+
+    def _place(self, k):
+        """Return the first node following an item on the ring which is not
+        overloaded"""
+        bound = int(math.ceil(self._load_bound * (len(self._assigned) + 1) /
+                              len(self._node_ids)))
+        for v in self._ring.successors(k):
+            if self._load[v] < bound:
+                return v
+
+    def _unassign(self, evicted):
+        """Release the nodes of evicted items"""
+        if evicted is None or self._load_bound is None:
+            return
+        for e in (evicted if isinstance(evicted, list) else [evicted]):
+            node = self._assigned.pop(e, None)
+            if node is not None:
+                self._load[node] -= 1
+
     @inheritdoc(Cache)
     def has(self, k):
-        return self._node[self.f_map(k)].has(k)
+        if self._load_bound is not None and k not in self._assigned:
+            return False
+        return self._node[self.node_of(k)].has(k)
 
     @inheritdoc(Cache)
     def get(self, k):
-        return self._node[self.f_map(k)].get(k)
+        if self._load_bound is not None and k not in self._assigned:
+            return False
+        return self._node[self.node_of(k)].get(k)
 
     @inheritdoc(Cache)
     def put(self, k):
-        return self._node[self.f_map(k)].put(k)
+        node = self.node_of(k)
+        evicted = self._node[node].put(k)
+        if self._load_bound is not None:
+            self._unassign(evicted)
+            if k not in self._assigned and self._node[node].has(k):
+                self._assigned[k] = node
+                self._load[node] += 1
+        return evicted
 
     @inheritdoc(Cache)
     def dump(self, serialized=True):
-        dump = list(s.dump() for s in self._node)
+        dump = list(self._node[v].dump() for v in self._node_ids)
         return sum(dump, []) if serialized else dump
 
     @inheritdoc(Cache)
     def remove(self, k):
-        return self._node[self.f_map(k)].remove(k)
+        if self._load_bound is not None and k not in self._assigned:
+            return False
+        removed = self._node[self.node_of(k)].remove(k)
+        if removed:
+            self._unassign(k)
+        return removed
 
     @inheritdoc(Cache)
     def clear(self):
-        for s in self._node:
+        for s in self._node.values():
             s.clear()
+        if self._load_bound is not None:
+            self._assigned.clear()
+            self._load = {v: 0 for v in self._node_ids}
+
+    def add_node(self, node=None, maxlen=None):
+        """Add a node to the system, migrating to it the items it is now
+        responsible for.
+
+        Only items mapped by the consistent hashing ring to the new node are
+        migrated. Items are migrated from the least to the most recently
+        inserted or used, so that their relative order is preserved for each
+        originating node.
+
+        Parameters
+        ----------
+        node : any hashable type, optional
+            The identifier of the node. If not specified, it is the lowest
+            integer identifier never assigned by default and not used by
+            another node, counting from the number of initial nodes
+        maxlen : int, optional
+            The maximum number of items the node can store. If not specified,
+            it is the average size of the other nodes, rounded down. The size
+            of the system increases accordingly
+
+        Returns
+        -------
+        moved : int
+            The number of items migrated
+        """
+        if self._ring is None:
+            raise ValueError('Nodes can only be added with consistent hashing')
+        if node is None:
+            while self._next_node_id in self._node:
+                self._next_node_id += 1
+            node = self._next_node_id
+            self._next_node_id += 1
+        if node in self._node:
+            raise ValueError('Node %s already exists' % str(node))
+        if maxlen is None:
+            maxlen = self._maxlen // len(self._node_ids)
+        maxlen = int(maxlen)
+        if maxlen <= 0:
+            raise ValueError('maxlen must be positive')
+        cache = CACHE_POLICY[self._policy](maxlen, **self._policy_attr)
+        self._ring.add_node(node)
+        self._node[node] = cache
+        self._node_ids.append(node)
+        self._node_maxlen.append(maxlen)
+        self._maxlen += maxlen
+        if self._load_bound is not None:
+            self._load[node] = 0
+        moved = 0
+        for v in self._node_ids[:-1]:
+            for k in reversed(self._node[v].dump()):
+                if self._ring.lookup(k) != node:
+                    continue
+                if self._load_bound is not None:
+                    bound = int(math.ceil(self._load_bound * len(self._assigned) /
+                                          len(self._node_ids)))
+                    if self._load[node] >= bound:
+                        continue
+                    self._unassign(k)
+                self._node[v].remove(k)
+                moved += 1
+                self._insert(node, k)
+        return moved
+
+    def remove_node(self, node):
+        """Remove a node from the system, migrating its items to the nodes
+        now responsible for them.
+
+        Items are migrated from the least to the most recently inserted or
+        used and they may cause evictions at the nodes they are migrated to.
+
+        Parameters
+        ----------
+        node : any hashable type
+            The identifier of the node
+
+        Returns
+        -------
+        moved : int
+            The number of items migrated
+        """
+        if self._ring is None:
+            raise ValueError('Nodes can only be removed with consistent hashing')
+        if node not in self._node:
+            raise ValueError('Node %s does not exist' % str(node))
+        if len(self._node_ids) == 1:
+            raise ValueError('The system must have at least one node')
+        self._ring.remove_node(node)
+        cache = self._node.pop(node)
+        i = self._node_ids.index(node)
+        self._node_ids.pop(i)
+        self._maxlen -= self._node_maxlen.pop(i)
+        items = list(reversed(cache.dump()))
+        if self._load_bound is not None:
+            for k in items:
+                self._unassign(k)
+            del self._load[node]
+        for k in items:
+            self._insert(self.node_of(k), k)
+        return len(items)
+
+    def _insert(self, node, k):
+        """Insert a migrated item in a node"""
+        evicted = self._node[node].put(k)
+        if self._load_bound is not None:
+            self._unassign(evicted)
+            if self._node[node].has(k):
+                self._assigned[k] = node
+                self._load[node] += 1
+
+
+def tiered_cache(name, maxlen, tiers, **kwargs):
+    """Build the tiered cache of a node.
+
+    The capacity of the node is split among its tiers, each of which has its
+    own replacement policy and access latency. Tiers are organized as a path
+    (*PATH*), in which requests are served by the first tier storing the
+    content, as a tree (*TREE*), in which the last tier is the root shared by
+    the other tiers, or as an array (*ARRAY*).
+
+    Parameters
+    ----------
+    name : str or type
+        The organization of the tiers, i.e. *PATH*, *TREE* or *ARRAY*, or
+        the class of the tiered cache
+    maxlen : int
+        The overall capacity of the node
+    tiers : list of dict
+        The tiers of the node. Each tier is a dictionary with the name of its
+        cache replacement policy, the fraction of the capacity of the node
+        assigned to it (*size*), its access latency (*latency*, 0 if not
+        specified) and any other argument of its replacement policy
+    **kwargs
+        Arguments of the tiered cache, e.g. the weights of an *ARRAY*
+
+    Returns
+    -------
+    cache : PathCache, TreeCache or ArrayCache
+        The tiered cache
+    """
+    system = name if isinstance(name, type) else CACHE_POLICY.get(name, None)
+    if system is None or not issubclass(system, (PathCache, TreeCache, ArrayCache)):
+        raise ValueError('Tiers can only be organized as PATH, TREE or ARRAY')
+    if len(tiers) < (2 if issubclass(system, TreeCache) else 1):
+        raise ValueError('A %s cache needs more tiers' % system.__name__)
+    if any(t.get('size', 0) <= 0 for t in tiers) or \
+            abs(sum(t['size'] for t in tiers) - 1) > 0.0001:
+        raise ValueError('The sizes of tiers must be positive and sum up to 1')
+    sizes = apportionment(maxlen, [t['size'] for t in tiers])
+    caches = []
+    for t, size in zip(tiers, sizes):
+        tier_args = {k: v for k, v in t.items()
+                     if k not in ('name', 'size', 'latency')}
+        caches.append(CACHE_POLICY[t['name']](max(1, int(size)), **tier_args))
+    latency = [t.get('latency', 0) for t in tiers]
+    if issubclass(system, TreeCache):
+        return system(caches[:-1], caches[-1], tier_latency=latency, **kwargs)
+    return system(caches, tier_latency=latency, **kwargs)
@@ -0,0 +1,131 @@
+from __future__ import division
+import unittest
+
+import icarus.models as cache
+from icarus.util import key_to_int, mix64
+
+
+class TestAdmissionCache(unittest.TestCase):
+
+    def test_class(self):
+        cls = cache.admission_cache('LRU', 'K_HITS', k=3)
+        self.assertTrue(issubclass(cls, cache.LruCache))
+        self.assertTrue(issubclass(cls, cache.KHitsAdmission))
+        c = cls(4)
+        self.assertIsInstance(c, cache.Cache)
+        self.assertEqual(4, c.maxlen)
+
+    def test_dict(self):
+        cls = cache.admission_cache('FIFO', {'name': 'PROB', 'p': 1.0})
+        c = cls(2)
+        self.assertIsNone(c.put(1))
+        self.assertTrue(c.has(1))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, cache.admission_cache, 'LRU', 'FOO')
+        self.assertRaises(ValueError, cache.admission_cache, 'FOO', 'K_HITS')
+
+
+class TestKHitsAdmission(unittest.TestCase):
+
+    def test_put_get(self):
+        c = cache.admission_cache('LRU', 'K_HITS', k=3)(2)
+        self.assertFalse(c.get(1))
+        c.put(1)
+        self.assertFalse(c.get(1))
+        c.put(1)
+        self.assertFalse(c.get(1))
+        c.put(1)
+        self.assertTrue(c.get(1))
+        c.put(2)
+        c.put(2)
+        c.put(3)
+        c.put(3)
+        c.put(2)
+        self.assertEqual(c.dump(), [2, 1])
+        c.put(3)
+        self.assertEqual(c.dump(), [3, 2])
+        c.put(2)
+        self.assertEqual(c.dump(), [2, 3])
+
+    def test_memory(self):
+        c = cache.admission_cache('LRU', 'K_HITS', k=2, memory=2)(2)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        c.put(1)
+        self.assertFalse(c.has(1))
+        c.put(3)
+        self.assertTrue(c.has(3))
+        self.assertEqual({1: 1}, c._admission_hits)
+
+    def test_force_insert(self):
+        c = cache.admission_cache('LRU', 'K_HITS', k=3)(2)
+        c.put(1, force_insert=True)
+        self.assertTrue(c.has(1))
+        c.put(2)
+        c.put(2, force_insert=True)
+        self.assertTrue(c.has(2))
+        self.assertEqual({}, c._admission_hits)
+
+    def test_clear(self):
+        c = cache.admission_cache('LRU', 'K_HITS', k=2)(2)
+        c.put(1)
+        c.clear()
+        c.put(1)
+        self.assertFalse(c.has(1))
+
+
+class TestProbabilisticAdmission(unittest.TestCase):
+
+    def test_insert(self):
+        n = 10000
+        c = cache.admission_cache('LRU', 'PROB', p=0.3, seed=0)(n)
+        for i in range(n):
+            c.put(i)
+        self.assertLess(abs(len(c) / n - 0.3), 0.02)
+
+    def test_seed(self):
+        cls1 = cache.admission_cache('LRU', 'PROB', p=0.5, seed=1)
+        cls2 = cache.admission_cache('LRU', 'PROB', p=0.5, seed=1)
+        c1 = cls1(100)
+        c2 = cls2(100)
+        c3 = cls1(100)
+        for i in range(100):
+            c1.put(i)
+            c2.put(i)
+            c3.put(i)
+        self.assertEqual(c1.dump(), c2.dump())
+        # Caches of the same class do not admit items in lockstep
+        self.assertNotEqual(c1.dump(), c3.dump())
+
+
+class TestSketchAdmission(unittest.TestCase):
+
+    def test_put_get(self):
+        c = cache.admission_cache('LRU', 'SKETCH', k=2, width=1024)(2)
+        c.put(1)
+        self.assertFalse(c.has(1))
+        self.assertEqual(1, c.estimate(1))
+        c.put(1)
+        self.assertTrue(c.has(1))
+        c.put(1)
+        self.assertEqual(2, c.estimate(1))
+
+    def test_aging(self):
+        c = cache.admission_cache('LRU', 'SKETCH', k=2, width=1024, window=4)(2)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        c.put(4)
+        self.assertEqual(0, c.estimate(1))
+        c.put(1)
+        self.assertFalse(c.has(1))
+
+    def test_stable_hash(self):
+        c = cache.admission_cache('LRU', 'SKETCH', k=2, width=1024, depth=2)(2)
+        c.put('a')
+        self.assertEqual(1, c.estimate('a'))
+        # Counters do not depend on the hash seed of the interpreter
+        cols = [mix64(key_to_int('a') ^ mix64(i)) % 1024 for i in range(2)]
+        self.assertEqual([1, 1], list(c._admission_counters[[0, 1], cols]))
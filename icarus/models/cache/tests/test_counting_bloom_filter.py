@@ -0,0 +1,105 @@
+from __future__ import division
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from icarus.models.cache.cuckoofilter import CountingBloomFilter
+from icarus.models.cache.cuckoofilter.counting_bloom_filter import \
+    PersistenceDisabledException
+
+
+class TestCountingBloomFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_packed_counters(self):
+        f = CountingBloomFilter(1000, error=0.01)
+        self.assertEqual((f.num_counters + 1) // 2, f.data.nbytes)
+        self.assertEqual(f.num_bytes, f.number_of_bytes())
+
+    def test_add_remove(self):
+        f = CountingBloomFilter(100)
+        f.add(1)
+        f.add('content')
+        self.assertIn(1, f)
+        self.assertIn('content', f)
+        self.assertNotIn(2, f)
+        f.remove(1)
+        self.assertNotIn(1, f)
+        self.assertIn('content', f)
+        f.remove('content')
+        self.assertEqual(0, f.num_non_zero)
+        self.assertEqual(0, np.count_nonzero(f.data))
+
+    def test_many(self):
+        f = CountingBloomFilter(1000, error=0.01)
+        f.add_many(np.arange(500))
+        self.assertTrue(f.contains_many(np.arange(500)).all())
+        fp = np.count_nonzero(f.contains_many(np.arange(500, 10500)))
+        self.assertLess(fp / 10000, 0.02)
+        self.assertEqual(int(np.count_nonzero(f.get_counters(np.arange(f.num_counters)))),
+                         f.num_non_zero)
+        f.remove_many(np.arange(500))
+        self.assertEqual(0, f.num_non_zero)
+
+    def test_many_equals_single(self):
+        f = CountingBloomFilter(200)
+        g = CountingBloomFilter(200)
+        keys = [3, 3, 7, 11, 3]
+        f.add_many(keys)
+        for k in keys:
+            g.add(k)
+        np.testing.assert_array_equal(f.data, g.data)
+
+    def test_saturation(self):
+        f = CountingBloomFilter(10)
+        for _ in range(20):
+            f.add(1)
+        counters = f.get_counters(f.get_indexes(1))
+        self.assertTrue((counters == 15).all())
+        # Saturated counters are not decremented by removals
+        for _ in range(20):
+            f.remove(1)
+        self.assertIn(1, f)
+
+    def test_remove_all(self):
+        f = CountingBloomFilter(100)
+        f.add(1, N=3)
+        f.add(2)
+        f.remove_all()
+        self.assertIn(1, f)
+        self.assertNotIn(2, f)
+        f.remove_all(N=2)
+        self.assertNotIn(1, f)
+        self.assertEqual(0, f.num_non_zero)
+
+    def test_save_load(self):
+        path = os.path.join(self.tmp_dir, 'bloom')
+        f = CountingBloomFilter(100, data_path=path, id='test')
+        f.add_many([1, 2, 3])
+        f.save()
+        g = CountingBloomFilter.load(path, mmap=True)
+        self.assertIsInstance(g.data, np.memmap)
+        self.assertEqual('test', g.id)
+        self.assertEqual(f.num_non_zero, g.num_non_zero)
+        self.assertTrue(g.contains_many([1, 2, 3]).all())
+        g.add(4)
+        g.flush_data()
+        h = CountingBloomFilter.load(path)
+        self.assertNotIsInstance(h.data, np.memmap)
+        self.assertIn(4, h)
+        h.add(5)
+        self.assertNotIn(5, CountingBloomFilter.load(path))
+        h.flush_data()
+        self.assertIn(5, CountingBloomFilter.load(path))
+
+    def test_save_no_path(self):
+        f = CountingBloomFilter(100)
+        self.assertRaises(PersistenceDisabledException, f.save)
@@ -0,0 +1,88 @@
+from __future__ import division
+import unittest
+
+import numpy as np
+
+from icarus.models.cache.cuckoofilter import CuckooFilter
+
+
+class TestCuckooFilter(unittest.TestCase):
+
+    def test_add_contains_remove(self):
+        f = CuckooFilter(16, 2)
+        self.assertFalse(f.contains(1))
+        f.add(1)
+        f.add('content')
+        self.assertTrue(f.contains(1))
+        self.assertTrue(f.contains('content'))
+        self.assertEqual(2, f.get_size())
+        self.assertTrue(f.remove(1))
+        self.assertFalse(f.remove(1))
+        self.assertFalse(f.contains(1))
+        self.assertEqual(1, f.get_size())
+
+    def test_memory(self):
+        f = CuckooFilter(100, 2, bucket_size=4)
+        self.assertEqual(100 * 4 * 2, f.get_memory())
+        self.assertEqual(100, f.get_capacity())
+        self.assertEqual(np.uint16, f.table.dtype)
+        self.assertRaises(ValueError, CuckooFilter, 100, 3)
+
+    def test_no_false_negatives(self):
+        f = CuckooFilter(250, 1, seed=1)
+        keys = list(range(0, 1900, 2))
+        for k in keys:
+            f.add(k)
+        self.assertAlmostEqual(len(keys) / 1000, f.get_load_factor())
+        self.assertTrue(all(f.contains(k) for k in keys))
+        for k in keys[::2]:
+            self.assertTrue(f.remove(k))
+        self.assertTrue(all(f.contains(k) for k in keys[1::2]))
+        self.assertEqual(len(keys[1::2]), f.get_size())
+
+    def test_false_positives(self):
+        f = CuckooFilter(1024, 2)
+        f.add_many(np.arange(2000))
+        fp = np.count_nonzero(f.contains_many(np.arange(2000, 102000)))
+        # Expected rate is about 2 * bucket_size / 2^16
+        self.assertLess(fp / 100000, 0.001)
+
+    def test_add_many(self):
+        f = CuckooFilter(64, 2, seed=0)
+        g = CuckooFilter(64, 2, seed=0)
+        keys = np.arange(200)
+        f.add_many(keys)
+        for k in keys:
+            g.add(int(k))
+        self.assertEqual(200, f.get_size())
+        self.assertTrue(f.contains_many(keys).all())
+        self.assertTrue(g.contains_many(keys).all())
+        self.assertTrue(all(f.contains(int(k)) for k in keys))
+        np.testing.assert_array_equal(f.count, (f.table > 0).sum(axis=1))
+
+    def test_contains_many(self):
+        f = CuckooFilter(32, 4)
+        f.add_many([1, 3, 5])
+        self.assertEqual([False, True, False, True, False, True],
+                         f.contains_many(range(6)).tolist())
+
+    def test_full(self):
+        f = CuckooFilter(1, 1, num_swaps=10, bucket_size=2)
+        f.add(1)
+        f.add(2)
+        # The fingerprint left over by relocations is stashed
+        self.assertIsNotNone(f.add(3))
+        self.assertEqual(1, len(f.stash))
+        self.assertEqual(3, f.get_size())
+        self.assertIsNone(f.add(4))
+        self.assertEqual(1, f.overflows)
+        self.assertEqual([True, True, True], f.contains_many([1, 2, 3]).tolist())
+        self.assertTrue(all(f.contains(k) for k in (1, 2, 3)))
+        self.assertEqual(1, f.add_many([5]))
+        self.assertEqual(2, f.overflows)
+        # Removing an item makes room for the stashed fingerprint
+        self.assertTrue(f.remove(1))
+        self.assertEqual([], f.stash)
+        self.assertTrue(f.contains(2))
+        self.assertTrue(f.contains(3))
+        self.assertEqual(2, f.get_size())
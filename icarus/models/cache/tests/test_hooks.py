@@ -0,0 +1,72 @@
+from __future__ import division
+import unittest
+
+import icarus.models as cache
+
+
+class TestHookedCache(unittest.TestCase):
+
+    def hooked(self, c):
+        inserted, evicted = [], []
+        c.subscribe(on_insert=inserted.append, on_evict=evicted.append)
+        return inserted, evicted
+
+    def test_class(self):
+        cls = cache.hooked_cache('LRU')
+        self.assertTrue(issubclass(cls, cache.LruCache))
+        self.assertTrue(issubclass(cls, cache.CacheHooks))
+        self.assertEqual(4, cls(4).maxlen)
+        self.assertRaises(ValueError, cache.hooked_cache, 'FOO')
+
+    def test_put_evict(self):
+        c = cache.hooked_cache('LRU')(2)
+        inserted, evicted = self.hooked(c)
+        c.put(1)
+        c.put(2)
+        c.put(1)
+        self.assertEqual(2, c.put(3))
+        self.assertEqual([1, 2, 3], inserted)
+        self.assertEqual([2], evicted)
+
+    def test_remove_clear(self):
+        c = cache.hooked_cache('FIFO')(3)
+        inserted, evicted = self.hooked(c)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        c.put(3)
+        c.clear()
+        self.assertEqual([1, 2, 3], inserted)
+        self.assertEqual([1, 2, 3], sorted(evicted))
+
+    def test_admission(self):
+        c = cache.hooked_cache(cache.admission_cache('LRU', 'K_HITS', k=2))(2)
+        inserted, _ = self.hooked(c)
+        c.put(1)
+        self.assertEqual([], inserted)
+        c.put(1)
+        self.assertEqual([1], inserted)
+
+    def test_byte_cache(self):
+        c = cache.hooked_cache('BYTE_LRU')(10, sizes={1: 4, 2: 4, 3: 8})
+        _, evicted = self.hooked(c)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertEqual([1, 2], sorted(evicted))
+
+    def test_path_promotion(self):
+        c = cache.hooked_cache('PATH')([cache.LruCache(1), cache.LruCache(2)])
+        inserted, evicted = self.hooked(c)
+        c.put(1)
+        c.put(2)
+        self.assertEqual([1, 2], inserted)
+        self.assertEqual([], evicted)
+        c.put(3)
+        self.assertEqual([1], evicted)
+        # 2 is promoted to the first tier, evicting 3 which is no longer
+        # stored by the second tier
+        c._caches[1].remove(3)
+        self.assertEqual(1, c.get_tier(2))
+        self.assertEqual([1, 3], evicted)
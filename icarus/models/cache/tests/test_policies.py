@@ -610,6 +610,376 @@ class TestRandCache(unittest.TestCase):
             self.assertTrue(c.has(v))
 
 
+class TestClockCache(unittest.TestCase):
+
+    def test_clock(self):
+        c = cache.ClockCache(4)
+        self.assertEquals(len(c), 0)
+        for v in (1, 2, 3, 4):
+            self.assertIsNone(c.put(v))
+        self.assertEquals(len(c), 4)
+        self.assertEquals(c.dump(), [4, 3, 2, 1])
+        self.assertTrue(c.get(1))
+        self.assertTrue(c.get(2))
+        self.assertFalse(c.get(5))
+        self.assertEquals(c.put(5), 3)
+        self.assertEquals(c.dump(), [5, 2, 1, 4])
+        self.assertIsNone(c.put(5))
+        self.assertEquals(c.put(6), 4)
+        self.assertEquals(c.dump(), [6, 5, 2, 1])
+        self.assertEquals(c.put(7), 1)
+        self.assertEquals(len(c), 4)
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.dump(), [])
+
+    def test_all_referenced(self):
+        c = cache.ClockCache(3)
+        for v in (1, 2, 3):
+            c.put(v)
+        for v in (1, 2, 3):
+            c.get(v)
+        self.assertEquals(c.put(4), 1)
+        self.assertEquals(c.put(5), 2)
+        c.get(4)
+        self.assertEquals(c.put(6), 3)
+        self.assertEquals(c.put(7), 5)
+        self.assertEquals(set(c.dump()), {4, 6, 7})
+
+    def test_remove(self):
+        c = cache.ClockCache(4)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertTrue(c.remove(2))
+        self.assertFalse(c.remove(2))
+        self.assertEqual(len(c), 2)
+        self.assertEqual(c.dump(), [3, 1])
+        c.put(4)
+        c.put(5)
+        self.assertEqual(set(c.dump()), {1, 3, 4, 5})
+        self.assertEqual(c.put(6), 1)
+        self.assertFalse(c.has(1))
+
+
+class TestClockProCache(unittest.TestCase):
+
+    def test_clock_pro(self):
+        c = cache.ClockProCache(4)
+        for v in (1, 2, 3, 4):
+            self.assertIsNone(c.put(v))
+        self.assertEquals(len(c), 4)
+        self.assertEquals(c.dump(), [4, 3, 2, 1])
+        self.assertTrue(c.get(1))
+        self.assertFalse(c.is_hot(1))
+        self.assertEquals(c.put(5), 2)
+        self.assertTrue(c.is_hot(1))
+        self.assertFalse(c.is_hot(5))
+        # 2 is requested again during its test period and becomes hot
+        self.assertEquals(c.put(2), 3)
+        self.assertTrue(c.is_hot(2))
+        self.assertEquals(set(c.dump()), {1, 2, 4, 5})
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.dump(), [])
+
+    def test_scan_resistance(self):
+        c = cache.ClockProCache(4)
+        c.put(1)
+        c.put(2)
+        c.get(1)
+        c.get(2)
+        for v in range(10, 30):
+            c.put(v)
+        self.assertEquals(len(c), 4)
+        self.assertTrue(c.has(1))
+        self.assertTrue(c.has(2))
+
+    def test_remove(self):
+        c = cache.ClockProCache(3)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertEqual(c.dump(), [2])
+        c.put(3)
+        c.put(4)
+        self.assertEqual(set(c.dump()), {2, 3, 4})
+
+
+class TestSampledCache(unittest.TestCase):
+
+    def test_lru(self):
+        c = cache.SampledCache(4, k=4, priority='LRU')
+        for v in (1, 2, 3, 4):
+            self.assertIsNone(c.put(v))
+        self.assertEquals(c.dump(), [4, 3, 2, 1])
+        c.get(1)
+        c.get(3)
+        self.assertEquals(c.dump(), [3, 1, 4, 2])
+        self.assertEquals(c.put(5), 2)
+        self.assertEquals(c.put(6), 4)
+        self.assertEquals(c.dump(), [6, 5, 3, 1])
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.dump(), [])
+
+    def test_lfu(self):
+        c = cache.SampledCache(3, k=3, priority='LFU')
+        for v in (1, 2, 3):
+            c.put(v)
+        for _ in range(3):
+            c.get(1)
+        c.get(3)
+        self.assertEquals(c.put(4), 2)
+        self.assertEquals(c.put(5), 4)
+        self.assertEquals(set(c.dump()), {1, 3, 5})
+
+    def test_hyperbolic(self):
+        c = cache.SampledCache(2, k=2, priority='HYPERBOLIC')
+        c.put(1)
+        c.get(1)
+        c.get(1)
+        c.put(2)
+        # 1 -> 3 / 4, 2 -> 1 / 1
+        self.assertEquals(c.dump(), [2, 1])
+        for _ in range(10):
+            c.get(3)
+        # 1 -> 3 / 15, 2 -> 1 / 12
+        self.assertEquals(c.put(3), 2)
+
+    def test_custom_priority(self):
+        c = cache.SampledCache(2, k=2, priority=lambda hits, t_in, t_last, t: -t_in)
+        c.put(1)
+        c.put(2)
+        self.assertEquals(c.put(3), 2)
+
+    def test_sampling(self):
+        c = cache.SampledCache(100, k=5, seed=1)
+        for v in range(1000):
+            c.put(v)
+            self.assertTrue(c.has(v))
+        self.assertEquals(len(c), 100)
+        self.assertEquals(len(set(c.dump())), 100)
+
+    def test_seed(self):
+        dumps = []
+        for _ in range(2):
+            c = cache.SampledCache(10, k=3, seed='abc')
+            for v in range(100):
+                c.put(v)
+            dumps.append(c.dump())
+        self.assertEqual(dumps[0], dumps[1])
+
+    def test_remove(self):
+        c = cache.SampledCache(4, k=4, priority='LRU')
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertEqual(len(c), 2)
+        self.assertEqual(c.dump(), [3, 2])
+        c.put(4)
+        c.put(5)
+        self.assertEqual(c.put(6), 2)
+        self.assertEqual(c.dump(), [6, 5, 4, 3])
+
+    def test_invalid_priority(self):
+        self.assertRaises(ValueError, cache.SampledCache, 4, priority='FOO')
+
+
+class TestLruKCache(unittest.TestCase):
+
+    def test_lru_k(self):
+        c = cache.LruKCache(2, k=2)
+        self.assertIsNone(c.put(1))
+        self.assertIsNone(c.put(2))
+        self.assertTrue(c.get(1))
+        self.assertEquals(c.put(3), 2)
+        self.assertEquals(c.dump(), [1, 3])
+        # 2 is still in history
+        self.assertFalse(c.get(2))
+        self.assertEquals(c.put(2), 3)
+        self.assertEquals(c.dump(), [2, 1])
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.dump(), [])
+
+    def test_k_1(self):
+        c = cache.LruKCache(3, k=1)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        c.get(1)
+        self.assertEquals(c.dump(), [1, 3, 2])
+        self.assertEquals(c.put(4), 2)
+        self.assertEquals(c.put(5), 3)
+
+    def test_bounded_history(self):
+        c = cache.LruKCache(2, k=2, history=3)
+        for v in range(1000):
+            c.put(v)
+            c.get(v)
+        self.assertEquals(len(c), 2)
+        self.assertEquals(len(c._history), 5)
+
+    def test_remove(self):
+        c = cache.LruKCache(3)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertEquals(c.dump(), [2])
+        c.put(3)
+        c.put(4)
+        self.assertEquals(c.put(5), 2)
+
+
+class TestTwoQueueCache(unittest.TestCase):
+
+    def test_2q(self):
+        c = cache.TwoQueueCache(4, kin=0.25, kout=0.5)
+        for v in (1, 2, 3, 4):
+            self.assertIsNone(c.put(v))
+        self.assertEquals(c.dump(), [4, 3, 2, 1])
+        self.assertEquals(c.put(5), 1)
+        self.assertFalse(c.has(1))
+        # 1 is in A1out, so it is inserted in Am
+        self.assertEquals(c.put(1), 2)
+        self.assertEquals(c.dump(), [1, 5, 4, 3])
+        self.assertTrue(c.get(5))
+        self.assertEquals(c.dump(), [1, 5, 4, 3])
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.dump(), [])
+
+    def test_full_a1out(self):
+        c = cache.TwoQueueCache(4, kin=0.5, kout=0.25)
+        for v in (1, 2, 3, 4, 5):
+            c.put(v)
+        # 1 is the only and oldest item in A1out, which is full, and is
+        # inserted in Am although evicting 2 pushes 2 in A1out
+        self.assertEquals(c.put(1), 2)
+        self.assertEquals(c.dump(), [1, 5, 4, 3])
+        self.assertEquals(c.put(6), 3)
+        self.assertEquals(c.put(3), 4)
+        self.assertEquals(c.dump(), [3, 1, 6, 5])
+
+    def test_scan_resistance(self):
+        c = cache.TwoQueueCache(4)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        c.put(4)
+        c.put(5)
+        c.put(1)
+        for v in range(100, 200):
+            c.put(v)
+        self.assertTrue(c.has(1))
+        self.assertEquals(len(c), 4)
+
+    def test_remove(self):
+        c = cache.TwoQueueCache(4)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertEquals(c.dump(), [2])
+
+
+class TestByteLruCache(unittest.TestCase):
+
+    def test_lru(self):
+        c = cache.ByteLruCache(10, sizes={1: 3, 2: 3, 3: 4, 4: 6})
+        self.assertIsNone(c.put(1))
+        self.assertIsNone(c.put(2))
+        self.assertIsNone(c.put(3))
+        self.assertEquals(len(c), 3)
+        self.assertEquals(c.used, 10)
+        self.assertEquals(c.dump(), [3, 2, 1])
+        self.assertTrue(c.get(1))
+        self.assertEquals(c.dump(), [1, 3, 2])
+        self.assertEquals(c.put(4), [2, 3])
+        self.assertEquals(c.dump(), [4, 1])
+        self.assertEquals(c.used, 9)
+        self.assertIsNone(c.put(5, size=1))
+        self.assertEquals(c.used, 10)
+        self.assertIsNone(c.put(6, size=11))
+        self.assertFalse(c.has(6))
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.used, 0)
+
+    def test_remove(self):
+        c = cache.ByteLruCache(10)
+        c.put(1, size=5)
+        c.put(2, size=5)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertEquals(c.used, 5)
+        self.assertIsNone(c.put(3, size=5))
+        self.assertEquals(c.dump(), [3, 2])
+
+
+class TestByteFifoCache(unittest.TestCase):
+
+    def test_fifo(self):
+        c = cache.ByteFifoCache(10, sizes={1: 3, 2: 3, 3: 4, 4: 6})
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertEquals(c.dump(), [3, 2, 1])
+        self.assertTrue(c.get(1))
+        self.assertEquals(c.dump(), [3, 2, 1])
+        self.assertEquals(c.put(4), [1, 2])
+        self.assertEquals(c.dump(), [4, 3])
+        self.assertEquals(c.used, 10)
+        self.assertTrue(c.remove(3))
+        self.assertEquals(c.used, 6)
+        c.clear()
+        self.assertEquals(c.dump(), [])
+
+
+class TestGdsfCache(unittest.TestCase):
+
+    def test_gdsf(self):
+        c = cache.GdsfCache(10, sizes={1: 1, 2: 5, 3: 4, 4: 2})
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertEquals(c.used, 10)
+        # Priorities: 1 -> 1, 2 -> 0.2, 3 -> 0.25
+        self.assertEquals(c.dump(), [1, 3, 2])
+        self.assertEquals(c.put(4), [2])
+        self.assertEquals(c.used, 7)
+        # Inflation value is now 0.2: 4 -> 0.7
+        self.assertEquals(c.dump(), [1, 4, 3])
+        self.assertTrue(c.get(3))
+        self.assertTrue(c.get(3))
+        # 3 -> 0.75
+        self.assertEquals(c.dump(), [1, 3, 4])
+        self.assertEquals(c.put(5, size=6), [4, 3])
+        self.assertEquals(set(c.dump()), {1, 5})
+        self.assertIsNone(c.put(6, size=11))
+        self.assertTrue(c.remove(5))
+        self.assertEquals(c.used, 1)
+        c.clear()
+        self.assertEquals(len(c), 0)
+        self.assertEquals(c.used, 0)
+
+    def test_many_hits(self):
+        c = cache.GdsfCache(3)
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        for _ in range(200):
+            c.get(1)
+            c.get(2)
+        self.assertEquals(c.put(4), [3])
+        self.assertEquals(set(c.dump()), {1, 2, 4})
+
+
 class TestInCacheLfuCache(unittest.TestCase):
 
     def test_lfu(self):
@@ -0,0 +1,118 @@
+from __future__ import division
+import random
+import unittest
+
+import icarus.models as cache
+
+
+class TestLruCacheStore(unittest.TestCase):
+
+    def test_lru(self):
+        store = cache.LruCacheStore({'A': 4, 'B': 2})
+        c = store.cache('A')
+        c.put(0)
+        self.assertEqual(len(c), 1)
+        c.put(2)
+        c.put(3)
+        c.put(4)
+        self.assertEqual(len(c), 4)
+        self.assertEqual(c.dump(), [4, 3, 2, 0])
+        self.assertEqual(c.put(5), 0)
+        self.assertEqual(c.put(5), None)
+        self.assertEqual(len(c), 4)
+        self.assertEqual(c.dump(), [5, 4, 3, 2])
+        c.get(2)
+        self.assertEqual(c.dump(), [2, 5, 4, 3])
+        c.get(4)
+        self.assertEqual(c.dump(), [4, 2, 5, 3])
+        self.assertEqual(c.position(5), 2)
+        self.assertEqual(len(store.cache('B')), 0)
+        c.clear()
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.dump(), [])
+
+    def test_remove(self):
+        store = cache.LruCacheStore({'A': 4})
+        c = store.cache('A')
+        c.put(1)
+        c.put(2)
+        c.put(3)
+        self.assertTrue(c.remove(2))
+        self.assertFalse(c.remove(2))
+        self.assertEqual(len(c), 2)
+        self.assertEqual(c.dump(), [3, 1])
+        c.put(4)
+        c.put(5)
+        self.assertEqual(c.dump(), [5, 4, 3, 1])
+        self.assertEqual(c.put(6), 1)
+
+    def test_same_as_lru(self):
+        rand = random.Random(0)
+        maxlen = {v: rand.randint(1, 10) for v in range(5)}
+        store = cache.LruCacheStore(maxlen)
+        lru = {v: cache.LruCache(maxlen[v]) for v in maxlen}
+        for _ in range(5000):
+            v = rand.randint(0, 4)
+            k = rand.randint(0, 30)
+            op = rand.choice(('GET', 'PUT', 'PUT', 'DELETE'))
+            if op == 'GET':
+                self.assertEqual(lru[v].get(k), store.get(v, k))
+            elif op == 'PUT':
+                self.assertEqual(lru[v].put(k), store.put(v, k))
+            else:
+                self.assertEqual(lru[v].remove(k), store.remove(v, k))
+        for v in maxlen:
+            self.assertEqual(lru[v].dump(), store.dump(v))
+
+    def test_first_hit(self):
+        store = cache.LruCacheStore({1: 2, 2: 2, 3: 2})
+        path = [0, 1, 2, 3, 4]
+        self.assertIsNone(store.first_hit(path, 'a'))
+        store.put(3, 'a')
+        store.put(2, 'a')
+        self.assertEqual(store.first_hit(path, 'a'), 2)
+        self.assertEqual(store.first_hit([3, 2], 'a'), 0)
+        self.assertEqual(list(store.hits(path, 'a')), [False, False, True, True, False])
+        store.put(2, 'b')
+        self.assertEqual(store.dump(2), ['b', 'a'])
+        self.assertEqual(store.first_hit(path, 'a', update=True), 2)
+        self.assertEqual(store.dump(2), ['a', 'b'])
+        self.assertIsNone(store.first_hit([], 'a'))
+
+    def test_first_hit_different_slots(self):
+        store = cache.LruCacheStore({'a': 4, 'b': 4, 'c': 4})
+        store.put('b', 'k')
+        for k in ('x', 'y', 'z', 'k'):
+            store.put('c', k)
+        self.assertEqual(store.first_hit(['a', 'b', 'c'], 'k'), 1)
+        store.put('b', 'w')
+        self.assertEqual(store.first_hit(['a', 'b', 'c'], 'k', update=True), 1)
+        self.assertEqual(store.dump('b'), ['k', 'w'])
+        self.assertEqual(store.dump('c'), ['k', 'z', 'y', 'x'])
+
+    def test_hits_same_as_has(self):
+        rand = random.Random(0)
+        store = cache.LruCacheStore({v: rand.randint(1, 5) for v in range(8)})
+        path = [9, 7, 3, 0, 5, 1]
+        for _ in range(2000):
+            v = rand.randint(0, 7)
+            k = rand.randint(0, 10)
+            if rand.random() < 0.8:
+                store.put(v, k)
+            else:
+                store.remove(v, k)
+            k = rand.randint(0, 10)
+            hits = [v in store and store.has(v, k) for v in path]
+            self.assertEqual(list(store.hits(path, k)), hits)
+            first_hit = hits.index(True) if any(hits) else None
+            self.assertEqual(store.first_hit(path, k), first_hit)
+
+    def test_clear(self):
+        store = cache.LruCacheStore({1: 2, 2: 2})
+        store.put(1, 'a')
+        store.put(2, 'a')
+        store.clear(1)
+        self.assertFalse(store.has(1, 'a'))
+        self.assertTrue(store.has(2, 'a'))
+        store.clear()
+        self.assertFalse(store.has(2, 'a'))
@@ -0,0 +1,149 @@
+from __future__ import division
+import unittest
+
+import icarus.models as cache
+
+
+class TestSummaryCache(unittest.TestCase):
+
+    def test_class(self):
+        cls = cache.summary_cache('LRU', fingerprint_size=1)
+        self.assertTrue(issubclass(cls, cache.LruCache))
+        self.assertTrue(issubclass(cls, cache.SummaryCache))
+        c = cls(4)
+        self.assertIsInstance(c, cache.Cache)
+        self.assertEqual(4, c.maxlen)
+        self.assertRaises(ValueError, cache.summary_cache, 'FOO')
+
+    def test_put_evict(self):
+        c = cache.summary_cache('LRU')(2)
+        self.assertFalse(c.summary_contains(1))
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.summary_contains(1))
+        self.assertTrue(c.summary_contains(2))
+        self.assertEqual(1, c.put(3))
+        self.assertFalse(c.summary_contains(1))
+        self.assertTrue(c.summary_contains(3))
+        self.assertEqual(2, c.summary.get_size())
+
+    def test_put_existing(self):
+        c = cache.summary_cache('FIFO')(2)
+        c.put(1)
+        c.put(1)
+        self.assertEqual(1, c.summary.get_size())
+
+    def test_remove_clear(self):
+        c = cache.summary_cache('LRU')(3)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.remove(1))
+        self.assertFalse(c.remove(1))
+        self.assertFalse(c.summary_contains(1))
+        self.assertEqual(1, c.summary.get_size())
+        c.clear()
+        self.assertFalse(c.summary_contains(2))
+        self.assertEqual(0, c.summary.get_size())
+
+    def test_admission(self):
+        cls = cache.admission_cache('LRU', 'K_HITS', k=2)
+        c = cache.summary_cache(cls)(2)
+        c.put(1)
+        self.assertFalse(c.summary_contains(1))
+        c.put(1)
+        self.assertTrue(c.summary_contains(1))
+
+    def test_byte_capacity(self):
+        c = cache.summary_cache('BYTE_LRU')(300, sizes={1: 100, 2: 200, 3: 300})
+        c.put(1)
+        c.put(2)
+        self.assertEqual([1, 2], sorted(c.put(3)))
+        self.assertFalse(c.summary_contains(1))
+        self.assertFalse(c.summary_contains(2))
+        self.assertTrue(c.summary_contains(3))
+
+    def test_no_false_negatives(self):
+        c = cache.summary_cache('LRU', fingerprint_size=1)(50)
+        for i in range(1000):
+            c.put(i % 137)
+            self.assertTrue(all(c.summary_contains(k) for k in c.dump()))
+        self.assertEqual(len(c), c.summary.get_size())
+
+    def test_overflow(self):
+        c = cache.summary_cache('LRU', bucket_size=1, load=1, capacity=1)(4)
+        for k in range(4):
+            self.assertIsNone(c.put(k))
+        self.assertEqual([3, 2, 1, 0], c.dump())
+        self.assertEqual(2, c.summary.get_size())
+        self.assertEqual(2, c.summary.overflows)
+        self.assertTrue(c.summary_contains(0))
+        self.assertTrue(c.summary_contains(1))
+
+    def test_evict_overflow(self):
+        c = cache.summary_cache('LRU', fingerprint_size=1, bucket_size=1,
+                                load=1, capacity=1)(3)
+        # Find an item with the same fingerprint as item 0
+        fingerprint = c.summary._hash(0)[0]
+        k = next(k for k in range(1, 10000)
+                 if c.summary._hash(k)[0] == fingerprint)
+        x = next(x for x in range(1, 10000)
+                 if c.summary._hash(x)[0] != fingerprint)
+        c.put(0)
+        c.put(x)
+        c.put(k)
+        self.assertEqual(1, c.summary.overflows)
+        c.get(0)
+        c.get(x)
+        self.assertEqual(k, c.put(-1))
+        self.assertTrue(c.summary_contains(0))
+        self.assertTrue(c.summary_contains(x))
+        self.assertEqual(2, c.summary.get_size())
+
+    def test_memory(self):
+        c = cache.summary_cache('LRU', fingerprint_size=2, bucket_size=4,
+                                load=0.5)(10)
+        # 10 items at load 0.5 require 5 buckets
+        self.assertEqual(5, c.summary.get_capacity())
+        self.assertEqual(5 * 4 * 2, c.summary.get_memory())
+
+    def test_digest(self):
+        c = cache.summary_cache('LRU')(2)
+        self.assertIs(c.summary, c.digest)
+        c.put(1)
+        self.assertTrue(c.digest_contains(1))
+        self.assertEqual(0, c.publish_summary())
+
+    def test_broadcast_delta(self):
+        c = cache.summary_cache('LRU', fingerprint_size=2, broadcast=True)(2)
+        c.put(1)
+        c.put(2)
+        self.assertTrue(c.summary_contains(1))
+        self.assertFalse(c.digest_contains(1))
+        self.assertEqual(2 * (2 + c.delta_index_size), c.publish_summary())
+        self.assertTrue(c.digest_contains(1))
+        self.assertTrue(c.digest_contains(2))
+        c.put(3)
+        # Stale digest: evicted item reported, inserted item missed
+        self.assertTrue(c.digest_contains(1))
+        self.assertFalse(c.digest_contains(3))
+        self.assertEqual(2 * (2 + c.delta_index_size), c.publish_summary())
+        self.assertFalse(c.digest_contains(1))
+        self.assertTrue(c.digest_contains(3))
+        self.assertEqual(0, c.publish_summary())
+
+    def test_broadcast_cancel(self):
+        c = cache.summary_cache('LRU', broadcast=True)(2)
+        c.put(1)
+        c.remove(1)
+        self.assertEqual(0, c.publish_summary())
+        self.assertEqual(0, c.digest.get_size())
+
+    def test_broadcast_full(self):
+        c = cache.summary_cache('LRU', broadcast=True)(2)
+        c.put(1)
+        self.assertEqual(c.summary.get_memory(), c.publish_summary(full=True))
+        self.assertTrue(c.digest_contains(1))
+        c.clear()
+        self.assertTrue(c.digest_contains(1))
+        c.publish_summary()
+        self.assertFalse(c.digest_contains(1))
@@ -8,29 +8,42 @@ class TestPathCache(unittest.TestCase):
 
     def test_put_get(self):
         c = cache.PathCache([cache.LruCache(2) for _ in range(3)])
-        self.assertEqual(len(c), 3)
+        self.assertEqual(c.n_tiers, 3)
+        self.assertEqual(len(c), 0)
+        self.assertEqual(c.maxlen, 6)
         self.assertEqual(c.dump(serialized=False), [[], [], []])
         c.put(1)
+        self.assertEqual(len(c), 3)
         self.assertEqual(c.dump(serialized=False), [[1], [1], [1]])
         c.put(2)
         self.assertEqual(c.dump(serialized=False), [[2, 1], [2, 1], [2, 1]])
         c.put(3)
-        self.assertEqual(len(c), 3)
+        self.assertEqual(len(c), 6)
         self.assertEqual(c.dump(serialized=False), [[3, 2], [3, 2], [3, 2]])
         self.assertTrue(c.get(2))
-        self.assertEqual(len(c), 3)
+        self.assertEqual(len(c), 6)
         self.assertEqual(c.dump(serialized=False), [[2, 3], [3, 2], [3, 2]])
         self.assertTrue(c.get(2))
-        self.assertEqual(len(c), 3)
+        self.assertEqual(len(c), 6)
         self.assertEqual(c.dump(serialized=False), [[2, 3], [3, 2], [3, 2]])
         c.put(4)
-        self.assertEqual(len(c), 3)
+        self.assertEqual(len(c), 6)
         self.assertEqual(c.dump(serialized=False), [[4, 2], [4, 3], [4, 3]])
         self.assertTrue(c.get(3))
         self.assertFalse(c.get(1))
         self.assertEqual(c.dump(serialized=False), [[3, 4], [3, 4], [4, 3]])
 
 
+    def test_peek_tier(self):
+        c = cache.PathCache([cache.LruCache(2) for _ in range(2)])
+        self.assertIsNone(c.peek_tier(1))
+        c.put(1)
+        c.put(2)
+        c._caches[0].remove(1)
+        self.assertEqual(1, c.peek_tier(1))
+        self.assertEqual(0, c.peek_tier(2))
+        self.assertEqual([[2], [2, 1]], c.dump(serialized=False))
+
     def test_has(self):
         c = cache.PathCache([cache.LruCache(2) for _ in range(3)])
         c.put(2)
@@ -65,6 +78,63 @@ class TestPathCache(unittest.TestCase):
         self.assertFalse(c.has(2))
         self.assertTrue(c.has(3))
 
+    def test_get_tier(self):
+        c = cache.PathCache([cache.LruCache(2) for _ in range(3)],
+                            tier_latency=[1, 2, 3])
+        self.assertEqual(6, c.maxlen)
+        self.assertIsNone(c.get_tier(1))
+        c.put(1)
+        c.put(2)
+        self.assertEqual(0, c.get_tier(1))
+        c._caches[0].remove(1)
+        c._caches[1].remove(1)
+        self.assertEqual(2, c.get_tier(1))
+        self.assertEqual(c.dump(serialized=False), [[1, 2], [1, 2], [1, 2]])
+        self.assertEqual([1, 2, 3], c.tier_latency)
+
+
+    def test_put_evicted(self):
+        c = cache.PathCache([cache.LruCache(1), cache.LruCache(2)])
+        self.assertIsNone(c.put(1))
+        self.assertIsNone(c.put(2))
+        self.assertEqual([1], c.put(3))
+
+
+class TestTieredCache(unittest.TestCase):
+
+    def test_path(self):
+        c = cache.tiered_cache('PATH', 10,
+                               [{'name': 'LRU', 'size': 0.2, 'latency': 1},
+                                {'name': 'FIFO', 'size': 0.8}])
+        self.assertIsInstance(c, cache.PathCache)
+        self.assertEqual([2, 8], [t.maxlen for t in c._caches])
+        self.assertIsInstance(c._caches[1], cache.FifoCache)
+        self.assertEqual([1, 0], c.tier_latency)
+
+    def test_tree(self):
+        c = cache.tiered_cache('TREE', 10,
+                               [{'name': 'LRU', 'size': 0.25, 'latency': 1},
+                                {'name': 'LRU', 'size': 0.25, 'latency': 1},
+                                {'name': 'LRU', 'size': 0.5, 'latency': 5}])
+        self.assertIsInstance(c, cache.TreeCache)
+        self.assertEqual(10, c.maxlen)
+        self.assertIsNone(c.get_tier(1))
+        c.put(1)
+        self.assertTrue(c.has(1))
+        self.assertIn(c.get_tier(1), (0, 1, 2))
+        c.clear()
+        self.assertEqual(0, len(c))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, cache.tiered_cache, 'LRU', 10,
+                          [{'name': 'LRU', 'size': 1}])
+        self.assertRaises(ValueError, cache.tiered_cache, 'PATH', 10,
+                          [{'name': 'LRU', 'size': 0.5},
+                           {'name': 'LRU', 'size': 0.2}])
+        self.assertRaises(ValueError, cache.tiered_cache, 'TREE', 10,
+                          [{'name': 'LRU', 'size': 1}])
+
+
 class TestTreeCache(unittest.TestCase):
 
     def test_put_get(self):
@@ -172,3 +242,119 @@ class TestShardedCache(unittest.TestCase):
         self.assertEqual(c.dump(serialized=False), [[0], [], []])
         c.remove(0)
         self.assertEqual(c.dump(serialized=False), [[], [], []])
+
+    def test_consistent_hashing(self):
+        c = cache.ShardedCache(40, 'LRU', 4)
+        for k in range(40):
+            c.put(k)
+        for k in c.dump():
+            self.assertTrue(c.has(k))
+            self.assertIn(k, c.dump(serialized=False)[c.node_of(k)])
+
+    def test_string_keys_deterministic(self):
+        c1 = cache.ShardedCache(40, 'LRU', 4)
+        c2 = cache.ShardedCache(40, 'LRU', 4)
+        keys = ['content-%d' % i for i in range(20)]
+        self.assertEqual([c1.node_of(k) for k in keys], [c2.node_of(k) for k in keys])
+
+    def test_add_node(self):
+        c = cache.ShardedCache(400, 'LRU', 4)
+        for k in range(300):
+            c.put(k)
+        before = {k: c.node_of(k) for k in c.dump()}
+        moved = c.add_node()
+        self.assertEqual(5, len(c.nodes))
+        self.assertEqual(500, c.maxlen)
+        self.assertEqual(moved, len(c.dump(serialized=False)[4]))
+        self.assertGreater(moved, 0)
+        self.assertLess(moved, 150)
+        for k, v in before.items():
+            self.assertTrue(c.has(k))
+            self.assertIn(c.node_of(k), (v, 4))
+        self.assertRaises(ValueError, c.add_node, 4)
+
+    def test_remove_node(self):
+        c = cache.ShardedCache(400, 'LRU', 4)
+        for k in range(200):
+            c.put(k)
+        dump = c.dump(serialized=False)
+        moved = c.remove_node(2)
+        self.assertEqual(len(dump[2]), moved)
+        self.assertEqual([0, 1, 3], c.nodes)
+        self.assertEqual(300, c.maxlen)
+        for k in dump[0] + dump[1] + dump[3]:
+            self.assertTrue(c.has(k))
+        self.assertRaises(ValueError, c.remove_node, 2)
+
+    def test_add_node_after_remove(self):
+        c = cache.ShardedCache(400, 'LRU', 4)
+        c.remove_node(1)
+        c.add_node()
+        self.assertEqual([0, 2, 3, 4], c.nodes)
+        c.add_node(5)
+        c.add_node()
+        self.assertEqual([0, 2, 3, 4, 5, 6], c.nodes)
+        c.remove_node(6)
+        c.add_node()
+        self.assertEqual([0, 2, 3, 4, 5, 7], c.nodes)
+
+    def test_resharding_requires_ring(self):
+        c = cache.ShardedCache(6, 'LRU', 3, f_map=lambda x : x % 3)
+        self.assertRaises(ValueError, c.add_node)
+        self.assertRaises(ValueError, c.remove_node, 0)
+
+    def test_load_bound(self):
+        c = cache.ShardedCache(400, 'LRU', 4, load_bound=1.25)
+        for k in range(200):
+            c.put(k)
+        self.assertEqual(200, len(c))
+        for d in c.dump(serialized=False):
+            self.assertLessEqual(len(d), 63)
+        for k in range(200):
+            self.assertTrue(c.has(k))
+        self.assertTrue(c.remove(0))
+        self.assertFalse(c.has(0))
+        self.assertEqual(199, len(c))
+        moved = c.add_node()
+        self.assertEqual(199, len(c))
+        self.assertGreater(moved, 0)
+        for d in c.dump(serialized=False):
+            self.assertLessEqual(len(d), 63)
+        c.remove_node(0)
+        self.assertTrue(all(c.has(k) for k in range(1, 200)))
+
+
+class TestConsistentHashRing(unittest.TestCase):
+
+    def test_lookup(self):
+        ring = cache.ConsistentHashRing(['a', 'b', 'c'], vnodes=50)
+        keys = list(range(1000))
+        nodes = [ring.lookup(k) for k in keys]
+        self.assertEqual(set(nodes), {'a', 'b', 'c'})
+        index = ring.lookup_index_many(keys)
+        self.assertEqual(nodes, [ring.nodes[i] for i in index])
+        self.assertEqual(nodes[7], next(ring.successors(7)))
+        self.assertEqual(['a', 'b', 'c'], sorted(ring.successors(7)))
+
+    def test_dense_table(self):
+        ring = cache.ConsistentHashRing(range(5), dense=100)
+        ref = cache.ConsistentHashRing(range(5))
+        for k in range(150):
+            self.assertEqual(ref.lookup(k), ring.lookup(k))
+        ring.add_node(5)
+        ref.add_node(5)
+        for k in range(150):
+            self.assertEqual(ref.lookup(k), ring.lookup(k))
+
+    def test_add_remove_node(self):
+        ring = cache.ConsistentHashRing(range(4))
+        keys = list(range(2000))
+        before = [ring.lookup(k) for k in keys]
+        ring.add_node(4)
+        after = [ring.lookup(k) for k in keys]
+        for b, a in zip(before, after):
+            self.assertIn(a, (b, 4))
+        ring.remove_node(4)
+        self.assertEqual(before, [ring.lookup(k) for k in keys])
+        self.assertRaises(ValueError, ring.add_node, 0)
+        self.assertRaises(ValueError, ring.remove_node, 4)
@@ -1,16 +1,23 @@
 """Implementations of all hash-routing strategies"""
 from __future__ import division
+import bisect
+import numbers
 
+import numpy as np
 import networkx as nx
+import fnss
 
 from icarus.registry import register_strategy
-from icarus.util import inheritdoc, multicast_tree, path_links
+from icarus.util import inheritdoc, multicast_tree, path_links, key_to_int, \
+                        keys_to_array, mix64, mix64_many
 from icarus.scenarios.algorithms import extract_cluster_level_topology
+from icarus.models.cache import ConsistentHashRing
 
 from .base import Strategy
 
 
 __all__ = [
+       'HashMapping',
        'Hashrouting',
        'HashroutingEdge',
        'HashroutingOnPath',
@@ -23,17 +30,188 @@ __all__ = [
            ]
 
 
+class HashMapping(object):
+    """Mapping of content identifiers to the caching nodes responsible for
+    them, computed with hash functions that are stable across processes.
+
+    Three mappings are supported:
+
+    * *modulo* maps content *k* to node *h(k) mod n*, where *h* is the
+      identity for integer contents and a CRC32 checksum of the string
+      representation of other contents
+    * *weighted* splits the 64-bit hash space among nodes proportionally to
+      their weights, e.g. their cache sizes, so that each node is responsible
+      for a share of contents proportional to its weight
+    * *consistent* maps contents to nodes with a consistent hashing ring
+      (see `ConsistentHashRing`), so that adding or removing a node only
+      remaps the contents of that node
+
+    If contents are dense integer identifiers, i.e. in *range(dense)*, the
+    node of each of them is precomputed in a table with vectorized
+    operations, so that they are looked up in constant time.
+    """
+
+    def __init__(self, nodes, method='modulo', weights=None, vnodes=100,
+                 dense=None):
+        """Constructor
+
+        Parameters
+        ----------
+        nodes : list
+            The nodes
+        method : str (modulo | weighted | consistent), optional
+            The mapping
+        weights : list, optional
+            The weight of each node, only used by the weighted mapping. If
+            not specified, nodes have equal weights
+        vnodes : int, optional
+            The number of virtual nodes of each node on the ring, only used by
+            the consistent mapping
+        dense : int, optional
+            If specified, the nodes of all integer contents in *range(dense)*
+            are precomputed
+        """
+        self.nodes = list(nodes)
+        if len(self.nodes) == 0:
+            raise ValueError('There must be at least one node')
+        if method not in ('modulo', 'weighted', 'consistent'):
+            raise ValueError('Mapping %s not supported' % str(method))
+        self.method = method
+        if method == 'weighted':
+            if weights is None:
+                weights = [1] * len(self.nodes)
+            if len(weights) != len(self.nodes) or any(w < 0 for w in weights) \
+                    or sum(weights) <= 0:
+                raise ValueError('weights must be one non-negative value per '
+                                 'node, not all zero')
+            cumulative = np.cumsum(weights, dtype=float) / float(sum(weights))
+            # Upper bounds of the hash values mapped to each node
+            self._bounds = [min(int(x * 2 ** 64), 2 ** 64 - 1)
+                            for x in cumulative[:-1]]
+            self._bound_array = np.asarray(self._bounds, dtype=np.uint64)
+        elif method == 'consistent':
+            self._ring = ConsistentHashRing(self.nodes, vnodes=vnodes)
+        self._table = None
+        if dense is not None and dense > 0:
+            self._table = self.lookup_index_many(np.arange(dense)) \
+                              .astype(np.int32)
+
+    def lookup(self, k):
+        """Return the node a content is mapped to
+
+        Parameters
+        ----------
+        k : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        node : any hashable type
+            The node
+        """
+        table = self._table
+        if table is not None and isinstance(k, numbers.Integral) \
+                and 0 <= k < len(table):
+            return self.nodes[table[k]]
+        x = key_to_int(k)
+        if self.method == 'modulo':
+            return self.nodes[x % len(self.nodes)]
+        # Contents are hashed twice so that their mapping is independent of
+        # that of content catalogs, which hash contents once
+        h = mix64(x)
+        if self.method == 'weighted':
+            return self.nodes[bisect.bisect_right(self._bounds, mix64(h))]
+        return self._ring.lookup(h)
+
+    def lookup_index_many(self, keys):
+        """Return the indices in *nodes* of the nodes a batch of contents
+        are mapped to
+
+        Parameters
+        ----------
+        keys : iterable
+            The content identifiers
+
+        Returns
+        -------
+        index : numpy.ndarray
+            The array of node indices
+        """
+        x = keys_to_array(keys)
+        if self.method == 'modulo':
+            return (x % np.uint64(len(self.nodes))).astype(np.int64)
+        h = mix64_many(x)
+        if self.method == 'weighted':
+            return np.searchsorted(self._bound_array, mix64_many(h),
+                                   side='right').astype(np.int64)
+        return self._ring.lookup_index_many(h)
+
+
+def _dense_contents(topology):
+    """Return *n* if all contents of a topology are integers in *range(n)*
+    and at least half of them are contents, *None* otherwise"""
+    catalog = topology.graph.get('content_catalog', None)
+    if catalog is not None:
+        try:
+            batches = list(catalog.iter_keys())
+        except ValueError:
+            return None
+    else:
+        batches = [list(fnss.get_stack(topology, v)[1].get('contents', ()))
+                   for v in topology.sources()]
+    count = 0
+    top = -1
+    for keys in batches:
+        keys = np.asarray(keys)
+        if len(keys) == 0:
+            continue
+        if keys.dtype.kind not in 'iu' or keys.min() < 0:
+            return None
+        count += len(keys)
+        top = max(top, int(keys.max()))
+    return top + 1 if 0 < top + 1 <= 2 * count else None
+
+
 class BaseHashrouting(Strategy):
-    """Base class for all hash-routing implementations."""
+    """Base class for all hash-routing implementations.
 
-    @inheritdoc(Strategy)
-    def __init__(self, view, controller, **kwargs):
+    Contents are mapped to their authoritative caches by a `HashMapping`,
+    whose method is selected by the *mapping* parameter of the strategy. The
+    weighted mapping uses cache sizes as weights, so that caches of different
+    sizes, e.g. deployed by the OPTIMAL_HASHROUTING placement, are
+    responsible for shares of contents proportional to their sizes.
+    """
+
+    def __init__(self, view, controller, mapping='modulo', vnodes=100,
+                 **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        view : NetworkView
+            An instance of the network view
+        controller : NetworkController
+            An instance of the network controller
+        mapping : str (modulo | weighted | consistent), optional
+            The mapping of contents to caches (see `HashMapping`)
+        vnodes : int, optional
+            The number of virtual nodes of each cache, if mapping is
+            consistent
+        """
         super(BaseHashrouting, self).__init__(view, controller)
         self.cache_nodes = view.cache_nodes()
         self.n_cache_nodes = len(self.cache_nodes)
+        cache_size = view.cache_nodes(size=True)
+        dense = _dense_contents(view.topology())
+
+        def weights(nodes):
+            if mapping != 'weighted':
+                return None
+            return [cache_size.get(v, 0) for v in nodes]
+
         # Allocate results of hash function to caching nodes
-        self.cache_assignment = {i: self.cache_nodes[i]
-                                 for i in range(len(self.cache_nodes))}
+        self.mapping = HashMapping(self.cache_nodes, mapping,
+                                   weights(self.cache_nodes), vnodes, dense)
         # Check if there are clusters
         if 'clusters' in self.view.topology().graph:
             self.clusters = self.view.topology().graph['clusters']
@@ -42,6 +220,10 @@ class BaseHashrouting(Strategy):
                 self.clusters[i] = list(cluster)
             self.cluster_size = {i: len(self.clusters[i])
                                  for i in range(len(self.clusters))}
+            self.cluster_mapping = [
+                    HashMapping(cluster, mapping, weights(cluster), vnodes,
+                                dense)
+                    for cluster in self.clusters]
 
     def authoritative_cache(self, content, cluster=None):
         """Return the authoritative cache node for the given content
@@ -59,12 +241,9 @@ class BaseHashrouting(Strategy):
         authoritative_cache : any hashable type
             The node on which the authoritative cache is deployed
         """
-        # TODO: I should probably consider using a better non-cryptographic hash
-        # function, like xxhash
-        h = hash(content)
         if cluster is not None:
-            return self.clusters[cluster][h % self.cluster_size[cluster]]
-        return self.cache_assignment[h % self.n_cache_nodes]
+            return self.cluster_mapping[cluster].lookup(content)
+        return self.mapping.lookup(content)
 
     def process_event(self, time, receiver, content, log):
         raise NotImplementedError('Cannot use BaseHashrouting class as is. '
@@ -109,7 +288,7 @@ class Hashrouting(BaseHashrouting):
         routing : str (SYMM | ASYMM | MULTICAST)
             Content routing option
         """
-        super(Hashrouting, self).__init__(view, controller)
+        super(Hashrouting, self).__init__(view, controller, **kwargs)
         self.routing = routing
 
     @inheritdoc(Strategy)
@@ -136,7 +315,7 @@ class Hashrouting(BaseHashrouting):
                 # Forward to receiver
                 self.controller.forward_content_path(cache, receiver)
             elif self.routing == 'ASYMM':
-                if cache in self.view.shortest_path(source, receiver):
+                if cache in self.view.path_record(source, receiver).position:
                     # Forward to cache
                     self.controller.forward_content_path(source, cache)
                     # Insert in cache
@@ -147,7 +326,7 @@ class Hashrouting(BaseHashrouting):
                     # Forward to receiver straight away
                     self.controller.forward_content_path(source, receiver)
             elif self.routing == 'MULTICAST':
-                if cache in self.view.shortest_path(source, receiver):
+                if cache in self.view.path_record(source, receiver).position:
                     self.controller.forward_content_path(source, cache)
                     # Insert in cache
                     self.controller.put_content(cache)
@@ -211,7 +390,7 @@ class HashroutingEdge(BaseHashrouting):
         """
         if edge_cache_ratio < 0 or edge_cache_ratio > 1:
             raise ValueError('edge_cache_ratio must be between 0 and 1')
-        super(HashroutingEdge, self).__init__(view, controller)
+        super(HashroutingEdge, self).__init__(view, controller, **kwargs)
         self.routing = routing
         self.controller.reserve_local_cache(edge_cache_ratio)
         self.proxy = {v: list(self.view.topology().edge[v].keys())[0]
@@ -251,7 +430,7 @@ class HashroutingEdge(BaseHashrouting):
                 # Forward to receiver
                 self.controller.forward_content_path(cache, proxy)
             elif self.routing == 'ASYMM':
-                if cache in self.view.shortest_path(source, proxy):
+                if cache in self.view.path_record(source, proxy).position:
                     # Forward to cache
                     self.controller.forward_content_path(source, cache)
                     # Insert in cache
@@ -262,7 +441,7 @@ class HashroutingEdge(BaseHashrouting):
                     # Forward to receiver straight away
                     self.controller.forward_content_path(source, proxy)
             elif self.routing == 'MULTICAST':
-                if cache in self.view.shortest_path(source, proxy):
+                if cache in self.view.path_record(source, proxy).position:
                     self.controller.forward_content_path(source, cache)
                     # Insert in cache
                     self.controller.put_content(cache)
@@ -324,7 +503,7 @@ class HashroutingOnPath(BaseHashrouting):
         """
         if on_path_cache_ratio < 0 or on_path_cache_ratio > 1:
             raise ValueError('on_path_cache_ratio must be between 0 and 1')
-        super(HashroutingOnPath, self).__init__(view, controller)
+        super(HashroutingOnPath, self).__init__(view, controller, **kwargs)
         self.routing = routing
         self.controller.reserve_local_cache(on_path_cache_ratio)
 
@@ -444,7 +623,7 @@ class HashroutingClustered(BaseHashrouting):
         inter_routing : str
             Inter-cluster content routing scheme. Only supported LCE
         """
-        super(HashroutingClustered, self).__init__(view, controller)
+        super(HashroutingClustered, self).__init__(view, controller, **kwargs)
         if intra_routing not in ('SYMM', 'ASYMM', 'MULTICAST'):
             raise ValueError('Intra-cluster routing policy %s not supported'
                              % intra_routing)
@@ -674,7 +853,7 @@ class HashroutingHybridAM(BaseHashrouting):
             path stretch required to deliver a content is above max_stretch
             asymmetric delivery is used, otherwise multicast delivery is used.
         """
-        super(HashroutingHybridAM, self).__init__(view, controller)
+        super(HashroutingHybridAM, self).__init__(view, controller, **kwargs)
         self.max_stretch = nx.diameter(view.topology()) * max_stretch
 
     @inheritdoc(Strategy)
@@ -695,7 +874,7 @@ class HashroutingHybridAM(BaseHashrouting):
             if not self.controller.get_content(source):
                 raise RuntimeError('The content was not found at the expected source')
 
-            if cache in self.view.shortest_path(source, receiver):
+            if cache in self.view.path_record(source, receiver).position:
                 # Forward to cache
                 self.controller.forward_content_path(source, cache)
                 # Insert in cache
@@ -741,7 +920,7 @@ class HashroutingHybridSM(BaseHashrouting):
 
     @inheritdoc(Strategy)
     def __init__(self, view, controller, **kwargs):
-        super(HashroutingHybridSM, self).__init__(view, controller)
+        super(HashroutingHybridSM, self).__init__(view, controller, **kwargs)
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log):
@@ -761,7 +940,7 @@ class HashroutingHybridSM(BaseHashrouting):
             if not self.controller.get_content(source):
                 raise RuntimeError('The content is not found the expected source')
 
-            if cache in self.view.shortest_path(source, receiver):
+            if cache in self.view.path_record(source, receiver).position:
                 self.controller.forward_content_path(source, cache)
                 # Insert in cache
                 self.controller.put_content(cache)
@@ -1,7 +1,9 @@
 """Implementations of all off-path strategies"""
 from __future__ import division
 
-import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
 
 from icarus.registry import register_strategy
 from icarus.util import inheritdoc, path_links
@@ -24,10 +26,26 @@ class NearestReplicaRouting(Strategy):
 
     On the return path, content can be caching according to a variety of
     metacaching policies. LCE and LCD are currently supported.
+
+    Delays between all pairs of nodes are stored in a dense matrix, so that
+    the nearest cache storing a content is found by a vectorized argmin over
+    the delays from the receiver, masked by the bitmap of the caches storing
+    the content (see `NetworkView.content_location_bitmap`). If a cache and
+    the content source are equally close, the cache is selected.
+
+    Approximate implementations discover replicas by flooding messages to the
+    nodes within *radius* hops of the receiver. In *approx_1* the request
+    itself is flooded and served by the nearest replica reached, if any. In
+    *approx_2* a meta-request is flooded and the request is then forwarded to
+    the nearest replica replying to it. In both cases, if no replica is within
+    the radius, the request is forwarded to the content source. The links
+    traversed by a flood and the caches it reaches are computed once per
+    receiver, so that each flood is reported as a single event (see
+    `NetworkController.flood`). Replies to meta-requests are not accounted.
     """
 
     def __init__(self, view, controller, metacaching, implementation='ideal',
-                 radius=4, **kwargs):
+                 radius=4, meta_size=150, **kwargs):
         """Constructor
 
         Parameters
@@ -38,13 +56,16 @@ class NearestReplicaRouting(Strategy):
             An instance of the network controller
         metacaching : str (LCE | LCD)
             Metacaching policy used
-        implementation : str, optional
-            The implementation of the nearest replica discovery. Currently on
-            ideal routing is implemented, in which each node has omniscient
-            knowledge of the location of each content.
+        implementation : str (ideal | approx_1 | approx_2), optional
+            The implementation of the nearest replica discovery. In ideal
+            routing each node has omniscient knowledge of the location of each
+            content, while approximate implementations flood requests
+            (approx_1) or meta-requests (approx_2) to nearby nodes.
         radius : int, optional
-            Radius used by nodes to discover the location of a content. Not
-            used by ideal routing.
+            Radius, in hops, used by nodes to discover the location of a
+            content. Not used by ideal routing.
+        meta_size : int, optional
+            The size in bytes of meta-requests. Only used by approx_2.
         """
         super(NearestReplicaRouting, self).__init__(view, controller)
         if metacaching not in ('LCE', 'LCD'):
@@ -52,30 +73,129 @@ class NearestReplicaRouting(Strategy):
         if implementation not in ('ideal', 'approx_1', 'approx_2'):
             raise ValueError("Implementation %s not supported" % implementation)
         self.metacaching = metacaching
+        if implementation != 'ideal' and radius < 0:
+            raise ValueError('radius must not be negative')
         self.implementation = implementation
         self.radius = radius
-        self.distance = nx.all_pairs_dijkstra_path_length(self.view.topology(),
-                                                          weight='delay')
+        self.meta_size = meta_size
+        topology = self.view.topology()
+        self.nodes = list(topology.nodes())
+        self.node_index = {v: i for i, v in enumerate(self.nodes)}
+        # distance[i, j] is the delay of the shortest path from node i to
+        # node j or infinity if there is no path
+        links = list(topology.edges(data=True))
+        delay = csr_matrix(([attr.get('delay', 1) for _, _, attr in links],
+                            ([self.node_index[u] for u, _, _ in links],
+                             [self.node_index[v] for _, v, _ in links])),
+                           shape=(len(self.nodes), len(self.nodes)))
+        self.distance = dijkstra(delay, directed=topology.is_directed())
+        # Delays from each node to the caches, in the order of location
+        # bitmaps
+        self.location_nodes = self.view.location_nodes()
+        self.cache_distance = self.distance[:, [self.node_index[v] for v in
+                                                self.location_nodes]]
+        # Ball of each receiver, keyed by receiver, with the mask of the
+        # caches it includes and the largest delay to its nodes
+        self._balls = {}
+
+    def ball(self, receiver):
+        """Return the ball of the nodes within *radius* hops of a receiver,
+        the mask of the caches it includes, in the order of location bitmaps,
+        and the largest delay from the receiver to its nodes.
+
+        The mask and the delay are rebuilt only when the ball changes, i.e.
+        after the topology changes.
+
+        Parameters
+        ----------
+        receiver : any hashable type
+            The receiver
+
+        Returns
+        -------
+        ball : tuple
+            The ball (see `NetworkView.flood_ball`), the mask and the delay
+        """
+        ball = self.view.flood_ball(receiver, self.radius)
+        entry = self._balls.get(receiver)
+        if entry is None or entry[0] is not ball:
+            in_ball = np.array([v in ball.hops for v in self.location_nodes],
+                               dtype=bool)
+            max_delay = float(self.distance[self.node_index[receiver],
+                                            [self.node_index[v]
+                                             for v in ball.hops]].max())
+            entry = (ball, in_ball, max_delay)
+            self._balls[receiver] = entry
+        return entry
+
+    def nearest_replica(self, receiver, content, in_ball=False):
+        """Return the node closest to a receiver among the content source
+        and the caches storing a content.
+
+        Parameters
+        ----------
+        receiver : any hashable type
+            The receiver
+        content : any hashable type
+            The content identifier
+        in_ball : bool, optional
+            If *True*, only nodes within *radius* hops of the receiver are
+            considered
+
+        Returns
+        -------
+        nearest_replica : any hashable type
+            The closest node or *None* if the content is not available
+        """
+        r = self.node_index[receiver]
+        nearest = self.view.content_source(content)
+        bitmap = self.view.content_location_bitmap(content)
+        if in_ball:
+            ball, mask, _ = self.ball(receiver)
+            if nearest not in ball.hops:
+                nearest = None
+            if bitmap is not None:
+                bitmap = bitmap & mask
+        delay = self.distance[r, self.node_index[nearest]] \
+                if nearest is not None else np.inf
+        if bitmap is not None:
+            cache_delay = np.where(bitmap, self.cache_distance[r], np.inf)
+            i = int(np.argmin(cache_delay))
+            if bitmap[i] and cache_delay[i] <= delay:
+                nearest = self.location_nodes[i]
+        return nearest
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log):
-        # get all required data
-        locations = self.view.content_locations(content)
-        nearest_replica = min(locations, key=lambda x: self.distance[receiver][x])
         # Route request to nearest replica
         self.controller.start_session(time, receiver, content, log)
         if self.implementation == 'ideal':
+            nearest_replica = self.nearest_replica(receiver, content)
             self.controller.forward_request_path(receiver, nearest_replica)
         elif self.implementation == 'approx_1':
-            # Floods actual request packets
-            paths = {loc: len(self.view.shortest_path(receiver, loc)[:self.radius])
-                     for loc in locations}
-            # TODO: Continue
-            raise NotImplementedError("Not implemented")
+            # Floods actual request packets, which are served by the nearest
+            # replica reached or else forwarded to the source
+            nearest_replica = self.nearest_replica(receiver, content, True)
+            if nearest_replica is not None:
+                delay = float(self.distance[self.node_index[receiver],
+                                            self.node_index[nearest_replica]])
+                self.controller.flood(receiver, self.radius, delay=delay)
+            else:
+                self.controller.flood(receiver, self.radius)
+                nearest_replica = self.view.content_source(content)
+                self.controller.forward_request_path(receiver, nearest_replica)
         elif self.implementation == 'approx_2':
-            # Floods meta-request packets
-            # TODO: Continue
-            raise NotImplementedError("Not implemented")
+            # Floods meta-request packets and waits for the reply of the
+            # nearest replica or else until all nodes reached could reply
+            nearest_replica = self.nearest_replica(receiver, content, True)
+            if nearest_replica is not None:
+                delay = 2 * float(self.distance[self.node_index[receiver],
+                                                self.node_index[nearest_replica]])
+            else:
+                delay = 2 * self.ball(receiver)[2]
+                nearest_replica = self.view.content_source(content)
+            self.controller.flood(receiver, self.radius, self.meta_size, delay)
+            self.controller.forward_request_path(receiver, nearest_replica)
         else:
             # Should never reach this block anyway
             raise ValueError("Implementation %s not supported"
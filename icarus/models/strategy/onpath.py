@@ -2,18 +2,18 @@
 from __future__ import division
 import random
 
-import networkx as nx
-
 from icarus.registry import register_strategy
-from icarus.util import inheritdoc, path_links
+from icarus.util import inheritdoc, path_links, cached_betweenness_centrality
 
 from .base import Strategy
 
 __all__ = [
        'Partition',
        'Edge',
+       'CooperativeEdge',
        'MeshEdge',
        'CoorMeshEdge',
+       'CoorMeshEdgeCF',
        'NewCoorMeshEdge',
        'CoorTelstraEdge',
        'NewCoorTelstraEdge',
@@ -122,59 +122,162 @@ class Edge(Strategy):
             self.controller.put_content(edge_cache)
         self.controller.end_session()
 
-# new strategy added by Jiang Xiaolan
-@register_strategy('MEDGE')
-class MeshEdge(Strategy):
-    """Edge caching strategy for mesh topology.
-
-    In this strategy the content requested will only be cached in the cache near the 
-    consumer. And this strategy will be used in the mesh topology.
+class CooperativeEdge(Strategy):
+    """Base implementation of edge caching strategies in which caches
+    cooperate with their neighbors.
+
+    Requests are routed along the shortest path from the receiver to the
+    source and, at each cache of the path, the cache and possibly its
+    neighbor caches are probed until a hit. The content is then returned to
+    the receiver and inserted in the edge cache, i.e. the first cache of the
+    path, or in other caches, according to the insertion rule.
+
+    Which caches are probed at each hop only depends on the receiver and the
+    source, hence it is compiled once per pair into a probe plan and reused by
+    all requests of the pair until the topology changes. Subclasses are
+    configurations of this class, setting the following attributes:
+
+    group_lookup : bool
+        If *True*, the cache of a node and its neighbor caches are probed
+        with a single lookup, otherwise the cache of a node is probed first
+        and then its neighbor caches one by one
+    neighbor_positions : tuple
+        The positions in the path (the receiver being at position 0) of the
+        nodes whose neighbor caches are probed. If *None*, the neighbors of
+        all caches of the path are probed
+    neighbor_get : str
+        The name of the controller method probing a neighbor cache
+    copy_positions : tuple
+        The positions in the path at which a hit of a neighbor cache is
+        copied right away in the cache of the path node
+    local_hits : frozenset
+        The (kind, position) pairs of the hits that do not trigger any
+        insertion, where kind is either *cache*, *neighbor* or *source* and
+        position is that of the path node probed or of the source
+    insertion : str
+        Where the content is inserted: *edge* inserts it in the edge cache,
+        *path* in all the caches of the delivery path, *all* in all the caches
+        of the delivery path regardless of where the hit was and *miss* in
+        the edge cache, only if the content was retrieved from the source
     """
 
+    group_lookup = False
+    neighbor_positions = ()
+    neighbor_get = 'get_content'
+    copy_positions = ()
+    local_hits = frozenset()
+    insertion = 'edge'
+
     @inheritdoc(Strategy)
-    def __init__(self, view, controller):
-        super(MeshEdge, self).__init__(view, controller)
+    def __init__(self, view, controller, **kwargs):
+        super(CooperativeEdge, self).__init__(view, controller)
+        # Probe plans and the path records they were compiled from, keyed by
+        # receiver and source
+        self._plans = {}
+
+    def _compile(self, record):
+        """Return the probe plan of a path, i.e. the tuple of the probes to
+        execute in order. Each probe is a tuple with the position and the
+        identifier of a node, whether it has a cache and the tuple of its
+        neighbor caches to probe"""
+        plan = []
+        for i, v in enumerate(record.path[1:], 1):
+            own = self.view.has_cache(v)
+            if self.neighbor_positions is None:
+                neighbors = self.view.cache_neighbors(v) if own else ()
+            elif i in self.neighbor_positions:
+                neighbors = self.view.cache_neighbors(v)
+            else:
+                neighbors = ()
+            if own or neighbors:
+                plan.append((i, v, own, neighbors))
+        return tuple(plan)
+
+    def plan(self, receiver, source):
+        """Return the path record and the probe plan of a receiver and a
+        source, compiling the plan if the path changed since it was last
+        compiled.
+
+        Parameters
+        ----------
+        receiver : any hashable type
+            The receiver
+        source : any hashable type
+            The source
+
+        Returns
+        -------
+        record : PathRecord
+            The record of the shortest path from the receiver to the source
+        plan : tuple
+            The probe plan
+        """
+        record = self.view.path_record(receiver, source)
+        compiled = self._plans.get((receiver, source))
+        if compiled is None or compiled[0] is not record:
+            compiled = (record, self._compile(record))
+            self._plans[(receiver, source)] = compiled
+        return compiled
+
+    def _probe(self, plan):
+        """Execute a probe plan and return the serving node, the kind of hit
+        and the position of the probed node, or *None* if no cache hit"""
+        neighbor_get = getattr(self.controller, self.neighbor_get)
+        for i, v, own, neighbors in plan:
+            if self.group_lookup:
+                serving_node = self.controller.lookup_many((v,) + neighbors)
+                if serving_node is not None:
+                    return serving_node, \
+                           'cache' if serving_node == v else 'neighbor', i
+                continue
+            if own and self.controller.get_content(v):
+                return v, 'cache', i
+            for neighbor in neighbors:
+                if neighbor_get(neighbor):
+                    return neighbor, 'neighbor', i
+        return None
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log):
-        # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
+        record, plan = self.plan(receiver, source)
+        edge_cache = record.edge_cache
         self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            if self.view.has_cache(v):
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    break
+        hit = self._probe(plan)
+        if hit is not None:
+            serving_node, kind, position = hit
+            if kind == 'neighbor' and position in self.copy_positions:
+                self.controller.put_content(record.path[position])
+        else:
             # No cache hits, get content from source
-        if tag == False:
+            serving_node, kind, position = source, 'source', len(record.path) - 1
             self.controller.get_content(source)
-            serving_node = source
-
+            if self.insertion == 'miss':
+                self.controller.put_content(edge_cache)
+        insert = serving_node != edge_cache and \
+                 (kind, position) not in self.local_hits
         # Return content
         path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache:
-            self.controller.put_content(edge_cache)
+        if self.insertion == 'all':
+            for u, v in path_links(path):
+                self.controller.forward_content_hop(u, v)
+                if self.view.has_cache(v):
+                    self.controller.put_content(v)
+        else:
+            self.controller.forward_content_path(serving_node, receiver, path)
+            if self.insertion == 'edge' and insert:
+                self.controller.put_content(edge_cache)
+            elif self.insertion == 'path' and insert:
+                for v in path[1:]:
+                    if self.view.has_cache(v):
+                        self.controller.put_content(v)
         self.controller.end_session()
 
 
 # new strategy added by Jiang Xiaolan
-@register_strategy('CMEDGE')
-class CoorMeshEdge(Strategy):
-    """Coordinated Edge caching strategy for mesh topology.
+@register_strategy('MEDGE')
+class MeshEdge(CooperativeEdge):
+    """Edge caching strategy for mesh topology.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the mesh topology.
@@ -182,492 +285,173 @@ class CoorMeshEdge(Strategy):
 
     @inheritdoc(Strategy)
     def __init__(self, view, controller):
-        super(CoorMeshEdge, self).__init__(view, controller)
+        super(MeshEdge, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        count = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    if path_count == 2:
-                        count = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag_neigh = True
-                        if path_count == 2:
-                            count = True
-                            self.controller.put_content(v)
-                        break
-                if tag_neigh:
-                    break
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
 
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache and count == False:
-            self.controller.put_content(edge_cache)
-        self.controller.end_session()
+# new strategy added by Jiang Xiaolan
+@register_strategy('CMEDGE')
+class CoorMeshEdge(CooperativeEdge):
+    """Coordinated Edge caching strategy for mesh topology.
 
+    In this strategy the content requested will only be cached in the cache near the 
+    consumer. And this strategy will be used in the mesh topology.
+
+    Each cache of the path is looked up together with its neighbor caches. A
+    content found in a neighbor of the second node of the path is copied in
+    the cache of that node rather than in the edge cache.
+    """
+
+    group_lookup = True
+    neighbor_positions = None
+    copy_positions = (2,)
+    local_hits = frozenset([('cache', 2), ('neighbor', 2)])
+
+    @inheritdoc(Strategy)
+    def __init__(self, view, controller):
+        super(CoorMeshEdge, self).__init__(view, controller)
 
 
 # new strategy added by Jiang Xiaolan
 @register_strategy('CMEDGECF')
-class CoorMeshEdge(Strategy):
+class CoorMeshEdgeCF(CoorMeshEdge):
     """Coordinated Edge caching strategy for mesh topology with cuckoo filter for information exchange.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the mesh topology.
+
+    Neighbor caches are looked up only if the summary of their content reports
+    the requested content. Summaries are enabled by the *summary* attribute of
+    the cache policy, otherwise all neighbor caches are looked up.
     """
 
-    @inheritdoc(Strategy)
-    def __init__(self, view, controller):
-        super(CoorMeshEdge, self).__init__(view, controller)
+    group_lookup = False
+    neighbor_get = 'get_content_from_neighbor'
 
     @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        count = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    if path_count == 2:
-                        count = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag_neigh = True
-                        if path_count == 2:
-                            count = True
-                            self.controller.put_content(v)
-                        break
-                if tag_neigh:
-                    break
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache and count == False:
-            self.controller.put_content(edge_cache)
-        self.controller.end_session()
+    def __init__(self, view, controller):
+        super(CoorMeshEdgeCF, self).__init__(view, controller)
 
 
 # new strategy added by Jiang Xiaolan
 @register_strategy('NCMEDGE')
-class NewCoorMeshEdge(Strategy):
+class NewCoorMeshEdge(CooperativeEdge):
     """Coordinated Edge caching strategy for mesh topology.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the mesh topology.
+
+    Unlike CMEDGE, contents found in a neighbor of the edge cache are not
+    inserted in the edge cache.
     """
 
+    group_lookup = True
+    neighbor_positions = None
+    local_hits = frozenset([('cache', 2), ('neighbor', 1)])
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller):
         super(NewCoorMeshEdge, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        count = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    if path_count == 2:
-                        count = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag_neigh = True
-                        if path_count == 1:
-                            count = True
-                            # self.controller.put_content(v)
-                        break
-                if tag_neigh:
-                    break
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache and count == False:
-            self.controller.put_content(edge_cache)
-        self.controller.end_session()
-
 
 @register_strategy('CTEDGE')
-class CoorTelstraEdge(Strategy):
+class CoorTelstraEdge(CooperativeEdge):
     """Coordinated Edge caching strategy for tree topology.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the tree topology.
+
+    Only the neighbor caches of the second node of the path are looked up and
+    contents found there are copied in the cache of that node.
     """
 
+    neighbor_positions = (2,)
+    copy_positions = (2,)
+    local_hits = frozenset((kind, position)
+                           for kind in ('cache', 'neighbor', 'source')
+                           for position in (1, 2))
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller):
         super(CoorTelstraEdge, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    break
-            if path_count == 2:
-                neighbors = self.controller.get_neighbors(v)
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        self.controller.put_content(v)
-                        serving_node = neigh
-                        tag_neigh = True
-                        break
-            if tag_neigh:
-                break
-
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache and path_count > 2:
-            self.controller.put_content(edge_cache)
-        self.controller.end_session()
-
 
 @register_strategy('NCTEDGE')
-class NewCoorTelstraEdge(Strategy):
+class NewCoorTelstraEdge(CooperativeEdge):
     """Coordinated Edge caching strategy for tree topology.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the tree topology.
+
+    Only the neighbor caches of the second node of the path are looked up and
+    contents found there are not inserted in any cache.
     """
 
+    neighbor_positions = (2,)
+    local_hits = frozenset([('neighbor', 2)])
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller):
         super(NewCoorTelstraEdge, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    break
-            if path_count == 2:
-                neighbors = self.controller.get_neighbors(v)
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        # self.controller.put_content(v)
-                        serving_node = neigh
-                        tag_neigh = True
-                        break
-            if tag_neigh:
-                break
-
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        if serving_node != edge_cache and tag_neigh == False:
-            self.controller.put_content(edge_cache)
-        self.controller.end_session()
-
-
 
 @register_strategy('CLCE')
-class CoorLeaveCopyEverywhere(Strategy):
-    """Leave Copy Everywhere (LCE) strategy.
+class CoorLeaveCopyEverywhere(CooperativeEdge):
+    """Coordinated Leave Copy Everywhere strategy.
 
-    In this strategy a copy of a content is replicated at any cache on the
+    In this strategy each cache on the path is looked up together with its
+    neighbor caches and a copy of a content is replicated at any cache on the
     path between serving node and receiver.
     """
 
+    group_lookup = True
+    neighbor_positions = None
+    insertion = 'all'
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller, **kwargs):
         super(CoorLeaveCopyEverywhere, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        serving_node = None
-        tag = False
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag = True
-                        break
-                if tag:
-                    break
-        if tag == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        for u, v in path_links(path):
-            self.controller.forward_content_hop(u, v)
-            if self.view.has_cache(v):
-                # insert content
-                self.controller.put_content(v)
-        self.controller.end_session()
-
 
 @register_strategy('CB')
-class CoorCacheBit(Strategy):
-    """Leave Copy Everywhere (LCE) strategy.
+class CoorCacheBit(CooperativeEdge):
+    """Coordinated edge caching strategy inserting contents only on misses.
 
-    In this strategy a copy of a content is replicated at any cache on the
-    path between serving node and receiver.
+    In this strategy each cache on the path is looked up together with its
+    neighbor caches and a content is inserted in the edge cache only if it
+    is not found in any of them.
     """
 
+    group_lookup = True
+    neighbor_positions = None
+    insertion = 'miss'
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller, **kwargs):
         super(CoorCacheBit, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        serving_node = None
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        tag = False
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag = True
-                        break
-                if tag:
-                    break
-
-        if tag == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            self.controller.put_content(edge_cache)
-            serving_node = source
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        self.controller.end_session()
-
-
 
 # new strategy added by Jiang Xiaolan
 @register_strategy('CCLCE')
-class CCLeaveCopyEverywhere(Strategy):
+class CCLeaveCopyEverywhere(CooperativeEdge):
     """Coordinated Edge caching strategy for mesh topology.
 
     In this strategy the content requested will only be cached in the cache near the 
     consumer. And this strategy will be used in the mesh topology.
+
+    Contents are inserted in all the caches of the delivery path, unless they
+    are found at the edge cache or at the second node of the path or in its
+    neighbors.
     """
 
+    group_lookup = True
+    neighbor_positions = None
+    local_hits = frozenset([('cache', 2), ('neighbor', 2)])
+    insertion = 'path'
+
     @inheritdoc(Strategy)
     def __init__(self, view, controller):
         super(CCLeaveCopyEverywhere, self).__init__(view, controller)
 
-    @inheritdoc(Strategy)
-    def process_event(self, time, receiver, content, log):
-        # get all required data
-        source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
-        # Route requests to original source and queries caches on the path
-        self.controller.start_session(time, receiver, content, log)
-        edge_cache = None
-        serving_node = None
-        # First find the edge cache
-        for u, v in path_links(path):
-            if self.view.has_cache(v):
-                edge_cache = v
-                break
-        # Then get the content from the source, and cache it on the edge cache
-        tag = False
-        tag_neigh = False
-        count = False
-        path_count = 0
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            path_count = path_count + 1
-            if self.view.has_cache(v):
-                neighbors = self.controller.get_neighbors(v)
-                if self.controller.get_content(v):
-                    serving_node = v
-                    tag = True
-                    if path_count == 2:
-                        count = True
-                    break
-                for neigh in neighbors:
-                    if self.controller.get_content(neigh):
-                        serving_node = neigh
-                        tag_neigh = True
-                        if path_count == 2:
-                            count = True
-                            # self.controller.put_content(v)
-                        break
-                if tag_neigh:
-                    break
-        if tag == False and tag_neigh == False:
-            # No cache hits, get content from source
-            self.controller.get_content(source)
-            serving_node = source
-
-        # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        self.controller.forward_content_path(serving_node, receiver, path)
-        for u, v in path_links(path):
-            # self.controller.forward_content_hop(u, v)
-            if self.view.has_cache(v):
-                if serving_node != edge_cache and count == False:
-                    self.controller.put_content(v)
-        self.controller.end_session()
-
 
 @register_strategy('LCE')
 class LeaveCopyEverywhere(Strategy):
@@ -730,19 +514,16 @@ class LeaveCopyDown(Strategy):
     def process_event(self, time, receiver, content, log):
         # get all required data
         source = self.view.content_source(content)
-        path = self.view.shortest_path(receiver, source)
         # Route requests to original source and queries caches on the path
         self.controller.start_session(time, receiver, content, log)
-        for u, v in path_links(path):
-            # self.controller.forward_request_hop(u, v)
-            if self.view.has_cache(v):
-                if self.controller.get_content(v):
-                    serving_node = v
-                    break
+        for v in self.view.path_record(receiver, source).cache_nodes:
+            if self.controller.get_content(v):
+                serving_node = v
+                break
         else:
             # No cache hits, get content from source
-            self.controller.get_content(v)
-            serving_node = v
+            self.controller.get_content(source)
+            serving_node = source
         # Return content
         path = list(reversed(self.view.shortest_path(receiver, serving_node)))
         # Leave a copy of the content only in the cache one level down the hit
@@ -785,6 +566,62 @@ class ProbCache(Strategy):
         super(ProbCache, self).__init__(view, controller)
         self.t_tw = t_tw
         self.cache_size = view.cache_nodes(size=True)
+        # Insertion probabilities and the path records they were computed
+        # from, keyed by receiver and serving node
+        self._probs = {}
+
+    def _compile(self, record):
+        """Return the tuple of the (node, probability) pairs of the caches in
+        which a content delivered along a path is inserted, in delivery order.
+
+        The path of the record goes from the receiver to the serving node.
+        The capacity *N* seen at each hop is the suffix sum of the capacity of
+        the caches from the previous node to the receiver.
+        """
+        path = record.path[::-1]
+        receiver = path[-1]
+        c = len(record.cache_nodes)
+        # suffix[i] is the capacity of the caches in path[i:]
+        suffix = [0] * (len(path) + 1)
+        for i in range(len(path) - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + self.cache_size.get(path[i], 0)
+        probs = []
+        x = 0.0
+        for hop in range(1, len(path)):
+            v = path[hop]
+            if v not in self.cache_size:
+                continue
+            x += 1
+            if v != receiver:
+                # The (x/c) factor raised to the power of "c" according to the
+                # extended version of ProbCache published in IEEE TPDS
+                probs.append((v, float(suffix[hop - 1]) /
+                              (self.t_tw * self.cache_size[v]) * (x / c) ** c))
+        return tuple(probs)
+
+    def insertion_probabilities(self, receiver, serving_node):
+        """Return the caches in which a content delivered from a serving node
+        to a receiver may be inserted and their insertion probabilities,
+        computing them if the path changed since they were last computed.
+
+        Parameters
+        ----------
+        receiver : any hashable type
+            The receiver
+        serving_node : any hashable type
+            The serving node
+
+        Returns
+        -------
+        probs : tuple
+            Tuple of (node, probability) pairs, in delivery order
+        """
+        record = self.view.path_record(receiver, serving_node)
+        compiled = self._probs.get((receiver, serving_node))
+        if compiled is None or compiled[0] is not record:
+            compiled = (record, self._compile(record))
+            self._probs[(receiver, serving_node)] = compiled
+        return compiled[1]
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log):
@@ -806,23 +643,10 @@ class ProbCache(Strategy):
             self.controller.get_content(v)
             serving_node = v
         # Return content
-        path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        c = len([v for v in path if self.view.has_cache(v)])
-        x = 0.0
-        for hop in range(1, len(path)):
-            u = path[hop - 1]
-            v = path[hop]
-            N = sum([self.cache_size[n] for n in path[hop - 1:]
-                     if n in self.cache_size])
-            if v in self.cache_size:
-                x += 1
-            # self.controller.forward_content_hop(u, v)
-            if v != receiver and v in self.cache_size:
-                # The (x/c) factor raised to the power of "c" according to the
-                # extended version of ProbCache published in IEEE TPDS
-                prob_cache = float(N) / (self.t_tw * self.cache_size[v]) * (x / c) ** c
-                if random.random() < prob_cache:
-                    self.controller.put_content(v)
+        for v, prob_cache in self.insertion_probabilities(receiver,
+                                                          serving_node):
+            if random.random() < prob_cache:
+                self.controller.put_content(v)
         self.controller.end_session()
 
 
@@ -834,7 +658,13 @@ class CacheLessForMore(Strategy):
     node with the greatest betweenness centrality (i.e., that is traversed by
     the greatest number of shortest paths). If the argument *use_ego_betw* is
     set to *True* then the betweenness centrality of the ego-network is used
-    instead.
+    instead. On large topologies, betweenness centrality can be approximated
+    by sampling *betw_samples* origin nodes.
+
+    Centralities are shared by all experiments run on the same topology (see
+    `cached_betweenness_centrality`) and the cache designated on the path
+    between each pair of serving node and receiver is looked up once and
+    stored until the path changes.
 
     References
     ----------
@@ -843,15 +673,68 @@ class CacheLessForMore(Strategy):
           Available: http://www.ee.ucl.ac.uk/~uceeips/centrality-networking12.pdf
     """
 
-    @inheritdoc(Strategy)
-    def __init__(self, view, controller, use_ego_betw=False, **kwargs):
+    def __init__(self, view, controller, use_ego_betw=False, betw_samples=None,
+                 betw_seed=None, **kwargs):
+        """Constructor
+
+        Parameters
+        ----------
+        view : NetworkView
+            An instance of the network view
+        controller : NetworkController
+            An instance of the network controller
+        use_ego_betw : bool, optional
+            If *True*, the betweenness centrality of the ego-network of each
+            node is used
+        betw_samples : int, optional
+            If specified, betweenness centrality is approximated from the
+            shortest paths originating from this number of nodes
+        betw_seed : int, optional
+            The seed of the sampling of the origin nodes
+        """
         super(CacheLessForMore, self).__init__(view, controller)
-        topology = view.topology()
-        if use_ego_betw:
-            self.betw = dict((v, nx.betweenness_centrality(nx.ego_graph(topology, v))[v])
-                             for v in topology.nodes_iter())
-        else:
-            self.betw = nx.betweenness_centrality(topology)
+        self.betw = cached_betweenness_centrality(view.topology(),
+                                                  ego=use_ego_betw,
+                                                  k=betw_samples,
+                                                  seed=betw_seed)
+        # Designated caches and the path records they were looked up from,
+        # keyed by receiver and serving node
+        self._designated = {}
+
+    def designated_cache(self, receiver, serving_node):
+        """Return the cache in which a content delivered from a serving node
+        to a receiver is inserted, i.e. the cache of the delivery path, other
+        than the serving node, with the greatest betweenness centrality. If
+        more than one cache has the greatest centrality, the one closest to
+        the receiver is returned.
+
+        Parameters
+        ----------
+        receiver : any hashable type
+            The receiver
+        serving_node : any hashable type
+            The serving node
+
+        Returns
+        -------
+        cache : any hashable type
+            The designated cache or *None* if the path has no cache other
+            than the serving node
+        """
+        record = self.view.path_record(receiver, serving_node)
+        designated = self._designated.get((receiver, serving_node))
+        if designated is None or designated[0] is not record:
+            cache = None
+            max_betw = -1
+            # Visit caches from the receiver, so that ties are broken in
+            # favor of the cache closest to it
+            for v in record.cache_nodes:
+                if v != serving_node and self.betw[v] > max_betw:
+                    max_betw = self.betw[v]
+                    cache = v
+            designated = (record, cache)
+            self._designated[(receiver, serving_node)] = designated
+        return designated[1]
 
     @inheritdoc(Strategy)
     def process_event(self, time, receiver, content, log):
@@ -871,17 +754,8 @@ class CacheLessForMore(Strategy):
             self.controller.get_content(v)
             serving_node = v
         # Return content
+        designated_cache = self.designated_cache(receiver, serving_node)
         path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        # get the cache with maximum betweenness centrality
-        # if there are more than one cache with max betw then pick the one
-        # closer to the receiver
-        max_betw = -1
-        designated_cache = None
-        for v in path[1:]:
-            if self.view.has_cache(v):
-                if self.betw[v] >= max_betw:
-                    max_betw = self.betw[v]
-                    designated_cache = v
         # Forward content
         for u, v in path_links(path):
             self.controller.forward_content_hop(u, v)
@@ -960,7 +834,8 @@ class RandomChoice(Strategy):
             serving_node = v
         # Return content
         path = list(reversed(self.view.shortest_path(receiver, serving_node)))
-        caches = [v for v in path[1:-1] if self.view.has_cache(v)]
+        caches = [v for v in reversed(self.view.path_record(receiver, serving_node).cache_nodes)
+                  if v != receiver and v != serving_node]
         designated_cache = random.choice(caches) if len(caches) > 0 else None
         for u, v in path_links(path):
             self.controller.forward_content_hop(u, v)
@@ -4,7 +4,44 @@ import fnss
 
 from icarus.scenarios import IcnTopology
 import icarus.models as strategy
-from icarus.execution import NetworkModel, NetworkView, NetworkController, TestCollector
+from icarus.execution import NetworkModel, NetworkView, NetworkController, TestCollector, \
+                             LatencyCollector
+
+
+class TestHashMapping(unittest.TestCase):
+
+    def test_modulo(self):
+        mapping = strategy.HashMapping(['a', 'b', 'c'])
+        self.assertEqual(['b', 'c', 'a', 'b'],
+                         [mapping.lookup(k) for k in range(1, 5)])
+        self.assertEqual(mapping.lookup('content'), mapping.lookup('content'))
+
+    def test_weighted(self):
+        mapping = strategy.HashMapping(['a', 'b', 'c'], 'weighted', [1, 0, 3])
+        nodes = [mapping.lookup(k) for k in range(4000)]
+        self.assertEqual(0, nodes.count('b'))
+        self.assertAlmostEqual(0.25, nodes.count('a') / 4000.0, delta=0.03)
+        self.assertRaises(ValueError, strategy.HashMapping, ['a', 'b'],
+                          'weighted', [0, 0])
+
+    def test_consistent(self):
+        mapping = strategy.HashMapping(['a', 'b', 'c', 'd'], 'consistent')
+        other = strategy.HashMapping(['a', 'b', 'c'], 'consistent')
+        for k in range(1000):
+            if mapping.lookup(k) != 'd':
+                self.assertEqual(mapping.lookup(k), other.lookup(k))
+
+    def test_dense_table(self):
+        for method in ('modulo', 'weighted', 'consistent'):
+            mapping = strategy.HashMapping([1, 2, 3], method, [1, 2, 3])
+            table = strategy.HashMapping([1, 2, 3], method, [1, 2, 3],
+                                         dense=100)
+            for k in range(120):
+                self.assertEqual(mapping.lookup(k), table.lookup(k))
+            self.assertEqual(mapping.lookup('k'), table.lookup('k'))
+
+    def test_invalid_method(self):
+        self.assertRaises(ValueError, strategy.HashMapping, [1, 2], 'random')
 
 
 class TestHashroutingEdge(unittest.TestCase):
@@ -1450,6 +1487,86 @@ class TestOnPath(unittest.TestCase):
         self.assertSetEqual(set(exp_cont_hops), set(cont_hops))
         self.assertEqual(2, summary['serving_node'])
 
+    def test_coor_lce(self):
+        hr = strategy.CoorLeaveCopyEverywhere(self.view, self.controller)
+        # receiver 0 requests 2, expect miss
+        hr.process_event(1, 0, 2, True)
+        loc = self.view.content_locations(2)
+        self.assertEquals(len(loc), 4)
+        self.assertIn(1, loc)
+        self.assertIn(2, loc)
+        self.assertIn(3, loc)
+        self.assertIn(4, loc)
+        summary = self.collector.session_summary()
+        self.assertEqual([1, 2, 3], summary['cache_misses'])
+        self.assertEqual(4, summary['serving_node'])
+        # receiver 5 requests 2, expect hit
+        hr.process_event(1, 5, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual([], summary['cache_misses'])
+        self.assertEqual(2, summary['serving_node'])
+        self.assertEqual([(2, 5)], summary['content_hops'])
+
+    def test_coor_mesh_edge(self):
+        hr = strategy.CoorMeshEdge(self.view, self.controller)
+        # receiver 0 requests 3, expect miss and insertion at edge cache 1
+        hr.process_event(1, 0, 3, True)
+        self.assertEqual({1, 4}, self.view.content_locations(3))
+        # receiver 5 requests 3, expect hit at 1, neighbor of edge cache 2
+        hr.process_event(1, 5, 3, True)
+        summary = self.collector.session_summary()
+        self.assertEqual(1, summary['serving_node'])
+        self.assertEqual({1, 2, 4}, self.view.content_locations(3))
+        # content 2 is only in cache 3, neighbor of the second node of the
+        # path of receiver 0, hence it is copied there and not at the edge
+        self.controller.start_session(1, 0, 2, False)
+        self.controller.put_content(3)
+        self.controller.end_session()
+        hr.process_event(1, 0, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual(3, summary['serving_node'])
+        self.assertEqual({2, 3, 4}, self.view.content_locations(2))
+
+    def test_cooperative_edge_plan(self):
+        hr = strategy.CoorMeshEdge(self.view, self.controller)
+        record, plan = hr.plan(0, 4)
+        self.assertEqual(1, record.edge_cache)
+        self.assertEqual(((1, 1, True, (2,)), (2, 2, True, (1, 3)),
+                          (3, 3, True, (2,))), plan)
+        self.assertIs(plan, hr.plan(0, 4)[1])
+        telstra = strategy.CoorTelstraEdge(self.view, self.controller)
+        self.assertEqual(((1, 1, True, ()), (2, 2, True, (1, 3)),
+                          (3, 3, True, ())), telstra.plan(0, 4)[1])
+        self.controller.remove_link(1, 2)
+        self.controller.restore_link(1, 2)
+        self.assertIsNot(plan, hr.plan(0, 4)[1])
+        self.assertEqual([(i, v, set(n)) for i, v, _, n in plan],
+                         [(i, v, set(n)) for i, v, _, n in hr.plan(0, 4)[1]])
+        hr = strategy.MeshEdge(self.view, self.controller)
+        self.assertEqual(((1, 2, True, ()), (2, 3, True, ())), hr.plan(5, 4)[1])
+
+    def test_prob_cache_insertion_probabilities(self):
+        hr = strategy.ProbCache(self.view, self.controller)
+        probs = hr.insertion_probabilities(0, 4)
+        self.assertEqual([3, 2, 1], [v for v, _ in probs])
+        for (_, p), exp_p in zip(probs, [0.3 / 27, 0.3 * 8 / 27, 0.2]):
+            self.assertAlmostEqual(exp_p, p)
+        self.assertIs(probs, hr.insertion_probabilities(0, 4))
+        probs = hr.insertion_probabilities(0, 2)
+        self.assertEqual(1, len(probs))
+        self.assertEqual(1, probs[0][0])
+        self.assertAlmostEqual(0.05, probs[0][1])
+        self.assertEqual((), hr.insertion_probabilities(5, 2))
+
+    def test_cl4m_designated_cache(self):
+        hr = strategy.CacheLessForMore(self.view, self.controller)
+        self.assertEqual(2, hr.designated_cache(0, 4))
+        self.assertEqual(1, hr.designated_cache(0, 2))
+        self.assertIsNone(hr.designated_cache(5, 2))
+        hr.betw[1] = hr.betw[2]
+        hr._designated.clear()
+        self.assertEqual(1, hr.designated_cache(0, 4))
+
     def test_lcd(self):
         hr = strategy.LeaveCopyDown(self.view, self.controller)
         # receiver 0 requests 2, expect miss
@@ -1833,6 +1950,68 @@ class TestNrr(unittest.TestCase):
         self.assertEqual(3, summary['serving_node'])
 
 
+    def test_nearest_replica(self):
+        hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCE')
+        self.assertEqual("s", hr.nearest_replica(0, 1))
+        self.controller.start_session(1, 0, 1, True)
+        # Cache 5 is as close to receiver 0 as the source
+        self.controller.put_content(5)
+        self.assertEqual(5, hr.nearest_replica(0, 1))
+        self.assertEqual(5, hr.nearest_replica(1, 1))
+        self.controller.put_content(3)
+        self.assertEqual(3, hr.nearest_replica(0, 1))
+        self.controller.end_session()
+
+    def test_approx_1(self):
+        hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCE',
+                                            implementation='approx_1', radius=2)
+        # receiver 0 requests 2, no replica within 2 hops other than the source
+        hr.process_event(1, 0, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual([(0, 2, None)], summary['floods'])
+        self.assertEqual("s", summary['serving_node'])
+        self.assertSetEqual({(0, 2), (2, 4), (4, "s")}, set(summary['request_hops']))
+        self.assertSetEqual({("s", 4), (4, 2), (2, 0)}, set(summary['content_hops']))
+        # receiver 1 reaches cache 2 by flooding the request
+        hr.process_event(1, 1, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual([(1, 2, None)], summary['floods'])
+        self.assertEqual(2, summary['serving_node'])
+        self.assertEqual([], summary['request_hops'])
+        self.assertSetEqual({(2, 3), (3, 1)}, set(summary['content_hops']))
+
+    def test_approx_2(self):
+        hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCE',
+                                            implementation='approx_2', radius=2,
+                                            meta_size=40)
+        hr.process_event(1, 0, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual([(0, 2, 40)], summary['floods'])
+        self.assertEqual("s", summary['serving_node'])
+        self.assertSetEqual({(0, 2), (2, 4), (4, "s")}, set(summary['request_hops']))
+        hr.process_event(1, 1, 2, True)
+        summary = self.collector.session_summary()
+        self.assertEqual([(1, 2, 40)], summary['floods'])
+        self.assertEqual(2, summary['serving_node'])
+        self.assertSetEqual({(1, 3), (3, 2)}, set(summary['request_hops']))
+        self.assertSetEqual({(2, 3), (3, 1)}, set(summary['content_hops']))
+
+    def test_approx_flood_latency(self):
+        collector = LatencyCollector(self.view, cdf=True)
+        self.controller.attach_collector(collector)
+        hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCE',
+                                            implementation='approx_1', radius=2)
+        hr.process_event(1, 0, 2, True)
+        hr.process_event(1, 1, 2, True)
+        hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCE',
+                                            implementation='approx_2', radius=2)
+        # The receiver waits for nodes 2 and 4 to reply to the meta-request
+        hr.process_event(1, 0, 3, True)
+        # Cache 3 replies to the meta-request
+        hr.process_event(1, 1, 2, True)
+        self.assertEqual([3 + 3, 2 + 2, 2 * 2 + 3 + 3, 2 * 1 + 1 + 1],
+                         list(collector.latency_data))
+
     def test_lcd(self):
         hr = strategy.NearestReplicaRouting(self.view, self.controller, metacaching='LCD')
         # receiver 0 requests 2, expect miss
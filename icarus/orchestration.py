@@ -15,8 +15,10 @@ import traceback
 
 from icarus.execution import exec_experiment
 from icarus.registry import TOPOLOGY_FACTORY, CACHE_PLACEMENT, CONTENT_PLACEMENT, \
-                            CACHE_POLICY, WORKLOAD, DATA_COLLECTOR, STRATEGY
+                            CACHE_POLICY, CACHE_ADMISSION, WORKLOAD, DATA_COLLECTOR, \
+                            STRATEGY
 from icarus.results import ResultSet
+from icarus.scenarios.cacheplacement import scale_cache_placement
 from icarus.util import SequenceNumber, timestr
 
 
@@ -218,7 +220,12 @@ def run_scenario(settings, params, curr_exp, n_exp):
             # Cache budget is the cumulative number of cache entries across
             # the whole network
             cachepl_spec['cache_budget'] = workload.n_contents * network_cache
+            # Weights of cache sizes by role of nodes or by node, if any
+            role_weights = cachepl_spec.pop('roles', None)
+            node_weights = cachepl_spec.pop('nodes', None)
             CACHE_PLACEMENT[cachepl_name](topology, **cachepl_spec)
+            if role_weights or node_weights:
+                scale_cache_placement(topology, role_weights, node_weights)
 
         # Assign contents to sources
         # If there are many contents, after doing this, performing operations
@@ -240,9 +247,20 @@ def run_scenario(settings, params, curr_exp, n_exp):
 
         # cache eviction policy definition
         cache_policy = tree['cache_policy']
-        if cache_policy['name'] not in CACHE_POLICY:
-            logger.error('No implementation of cache policy %s was found.' % cache_policy['name'])
-            return None
+        policies = [cache_policy]
+        policies.extend(cache_policy.get('roles', {}).values())
+        policies.extend(cache_policy.get('nodes', {}).values())
+        for policy in policies:
+            if policy['name'] not in CACHE_POLICY:
+                logger.error('No implementation of cache policy %s was found.' % policy['name'])
+                return None
+            if 'admission' in policy:
+                admission = policy['admission']
+                admission_name = admission['name'] if isinstance(admission, dict) else admission
+                if admission_name not in CACHE_ADMISSION:
+                    logger.error('No implementation of cache admission policy %s was found.'
+                                 % admission_name)
+                    return None
 
         # Configuration parameters of network model
         netconf = tree['netconf']
@@ -11,6 +11,7 @@ import networkx as nx
 from icarus.util import iround
 from icarus.registry import register_cache_placement
 from icarus.scenarios.algorithms import compute_clusters, compute_p_median, deploy_clusters
+from icarus.scenarios.topology import node_role
 
 __all__ = [
     'uniform_cache_placement',
@@ -21,6 +22,7 @@ __all__ = [
     'optimal_median_cache_placement',
     'optimal_hashrouting_cache_placement',
     'clustered_hashrouting_cache_placement',
+    'scale_cache_placement',
           ]
 
 
@@ -330,3 +332,37 @@ def clustered_hashrouting_cache_placement(topology, cache_budget, n_clusters,
     else:
         raise ValueError('clustering policy %s not supported' % policy)
 
+
+def scale_cache_placement(topology, roles=None, nodes=None):
+    """Scales the cache sizes deployed by a cache placement by a weight
+    depending on the role of each node or on the node itself, keeping the
+    cumulative cache budget.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology object, whose caches have already been placed
+    roles : dict, optional
+        Weight of the cache size of nodes keyed by role (see `node_role`).
+        Nodes whose role is not listed have weight 1
+    nodes : dict, optional
+        Weight of the cache size of nodes keyed by node, overriding the
+        weight of their role
+    """
+    roles = roles or {}
+    nodes = nodes or {}
+    cache_size = {v: topology.node[v]['stack'][1]['cache_size']
+                  for v in topology
+                  if 'stack' in topology.node[v]
+                  and 'cache_size' in topology.node[v]['stack'][1]}
+    weight = {v: nodes.get(v, roles.get(node_role(topology, v), 1))
+              for v in cache_size}
+    if any(w < 0 for w in weight.values()):
+        raise ValueError('Cache size weights must not be negative')
+    scaled = sum(cache_size[v] * weight[v] for v in cache_size)
+    if scaled == 0:
+        raise ValueError('Cache size weights must not be all 0')
+    ratio = sum(cache_size.values()) / scaled
+    for v in cache_size:
+        topology.node[v]['stack'][1]['cache_size'] = \
+                iround(cache_size[v] * weight[v] * ratio)
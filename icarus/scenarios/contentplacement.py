@@ -2,15 +2,312 @@
 
 This module contains function to decide the allocation of content objects to
 source nodes.
+
+Placements of integer content identifiers are stored in a content catalog
+rather than in a set of contents per source. A catalog either stores the
+source of each content in a numpy array, filled with vectorized operations,
+or computes it from a hash of the content identifier, without storing
+anything per content. The catalog is stored in the *content_catalog* graph
+attribute of the topology and the *contents* stack attribute of each source
+is a view of the contents the catalog assigns to it.
 """
+from __future__ import division
+import bisect
 import random
+import numbers
 import collections
 
+import numpy as np
+
 from fnss.util import random_from_pdf
 from icarus.registry import register_content_placement
+from icarus.util import key_to_int, keys_to_array, mix64, mix64_many
+
+
+try:
+    _range = xrange
+except NameError:
+    _range = range
+
+
+__all__ = [
+    'ContentCatalog',
+    'ArrayContentCatalog',
+    'HashContentCatalog',
+    'SourceContents',
+    'uniform_content_placement',
+    'weighted_content_placement',
+           ]
+
+
+class ContentCatalog(object):
+    """Base class of catalogs mapping content objects to the source nodes
+    storing them.
+
+    Subclasses must implement the `source` and `iter_keys` methods and the
+    `_positions` method, returning the position in *sources* of the source
+    of each of a batch of contents.
+    """
+
+    def __init__(self, sources):
+        """Constructor
+
+        Parameters
+        ----------
+        sources : list
+            The source nodes
+        """
+        self.sources = list(sources)
+
+    def source(self, k):
+        """Return the source of a content.
+
+        Parameters
+        ----------
+        k : any hashable type
+            The content identifier
+
+        Returns
+        -------
+        source : any hashable type
+            The source storing the content or *None* if the content is not in
+            the catalog
+        """
+        raise NotImplementedError('This method must be implemented')
+
+    def iter_keys(self):
+        """Return an iterator over the contents of the catalog, in batches.
+
+        Returns
+        -------
+        keys : iterator
+            Iterator over numpy arrays of contents
 
+        Raises
+        ------
+        ValueError
+            If the contents of the catalog are not known
+        """
+        raise NotImplementedError('This method must be implemented')
 
-__all__ = ['uniform_content_placement', 'weighted_content_placement']
+    def _positions(self, keys):
+        """Return the positions in *sources* of the sources of an array of
+        contents of the catalog"""
+        raise NotImplementedError('This method must be implemented')
+
+    def contents(self, v):
+        """Return the contents stored by a source.
+
+        Parameters
+        ----------
+        v : any hashable type
+            The source node
+
+        Returns
+        -------
+        contents : SourceContents
+            A view of the contents stored by the source
+        """
+        return SourceContents(self, v)
+
+    def iter_contents(self, v):
+        """Return an iterator over the contents stored by a source"""
+        if v not in self.sources:
+            return
+        i = self.sources.index(v)
+        for keys in self.iter_keys():
+            for k in keys[self._positions(keys) == i]:
+                yield k.item()
+
+    def count(self, v):
+        """Return the number of contents stored by a source"""
+        if v not in self.sources:
+            return 0
+        i = self.sources.index(v)
+        return sum(int(np.count_nonzero(self._positions(keys) == i))
+                   for keys in self.iter_keys())
+
+
+class SourceContents(object):
+    """Read-only set-like view of the contents a catalog assigns to a source.
+
+    Membership tests take constant time, while iterating and counting the
+    contents take time proportional to the size of the catalog.
+    """
+
+    def __init__(self, catalog, v):
+        self.catalog = catalog
+        self.node = v
+
+    def __contains__(self, k):
+        return self.catalog.source(k) == self.node
+
+    def __iter__(self):
+        return self.catalog.iter_contents(self.node)
+
+    def __len__(self):
+        return self.catalog.count(self.node)
+
+
+class ArrayContentCatalog(ContentCatalog):
+    """Catalog storing the source of each content in a numpy array.
+
+    If contents are consecutive integers, the position of the source of
+    content *k* is the element *k - first* of the array. Otherwise, contents
+    are stored in a sorted array and looked up by binary search.
+    """
+
+    def __init__(self, sources, index, keys=None, first=0):
+        """Constructor
+
+        Parameters
+        ----------
+        sources : list
+            The source nodes
+        index : numpy.ndarray
+            The position in *sources* of the source of each content
+        keys : numpy.ndarray, optional
+            The sorted array of the contents. If not specified, contents are
+            the consecutive integers starting from *first*
+        first : int, optional
+            The first content, if contents are consecutive integers
+        """
+        super(ArrayContentCatalog, self).__init__(sources)
+        self.index = index
+        self.keys = keys
+        self.first = first
+
+    def source(self, k):
+        if not isinstance(k, numbers.Integral):
+            return None
+        if self.keys is None:
+            i = k - self.first
+        else:
+            i = int(np.searchsorted(self.keys, k))
+            if i == len(self.keys) or self.keys[i] != k:
+                return None
+        if 0 <= i < len(self.index):
+            return self.sources[self.index[i]]
+        return None
+
+    def iter_keys(self):
+        if self.keys is None:
+            yield np.arange(self.first, self.first + len(self.index))
+        else:
+            yield self.keys
+
+    def _positions(self, keys):
+        return self.index
+
+    def count(self, v):
+        if v not in self.sources:
+            return 0
+        return int(np.count_nonzero(self.index == self.sources.index(v)))
+
+
+class HashContentCatalog(ContentCatalog):
+    """Catalog computing the source of each content from a hash of its
+    identifier, without storing anything per content.
+
+    Each source is assigned a share of the 64-bit hash space proportional to
+    its weight, so that the fraction of contents stored by a source tends to
+    its weight.
+    """
+
+    # Number of contents hashed at once when iterating the catalog
+    batch_size = 2 ** 16
+
+    def __init__(self, sources, contents=None, weights=None, seed=None):
+        """Constructor
+
+        Parameters
+        ----------
+        sources : list
+            The source nodes
+        contents : iterable, optional
+            The contents of the catalog. If a range, only its elements are in
+            the catalog, otherwise any content is mapped to a source.
+            Contents need to be specified only to iterate or count the
+            contents of a source
+        weights : list, optional
+            The weight of each source. If not specified, sources are equally
+            likely
+        seed : any hashable type, optional
+            The seed of the hash function
+        """
+        super(HashContentCatalog, self).__init__(sources)
+        self.contents_iterable = contents
+        self.seed = 0 if seed is None else key_to_int(seed)
+        if weights is None:
+            weights = [1] * len(self.sources)
+        cumulative = np.cumsum(weights, dtype=float) / float(sum(weights))
+        # Upper bounds of the hash values mapped to each source
+        self.bounds = [int(x * 2 ** 64) for x in cumulative[:-1]]
+
+    def source(self, k):
+        contents = self.contents_iterable
+        if isinstance(contents, _range) and k not in contents:
+            return None
+        h = mix64(key_to_int(k) ^ self.seed)
+        return self.sources[bisect.bisect_right(self.bounds, h)]
+
+    def iter_keys(self):
+        if self.contents_iterable is None:
+            raise ValueError('The contents of the catalog are not known')
+        batch = []
+        for k in self.contents_iterable:
+            batch.append(k)
+            if len(batch) == self.batch_size:
+                yield np.asarray(batch)
+                batch = []
+        if batch:
+            yield np.asarray(batch)
+
+    def _positions(self, keys):
+        h = mix64_many(keys_to_array(keys) ^ np.uint64(self.seed))
+        return np.searchsorted(np.asarray(self.bounds, dtype=np.uint64), h,
+                               side='right')
+
+
+def _index_dtype(n_sources):
+    """Return the smallest integer type of an index of a number of sources"""
+    return np.int16 if n_sources < 2 ** 15 else np.int32
+
+
+def _integer_contents(contents):
+    """Return the sorted array of contents, or the first content and the
+    number of contents if they are consecutive integers, or *None* if
+    contents are not integers. Contents must be a range, a numpy array or a
+    list"""
+    if isinstance(contents, _range) and getattr(contents, 'step', None) == 1:
+        return None, (contents.start, len(contents))
+    if isinstance(contents, np.ndarray):
+        if not np.issubdtype(contents.dtype, np.integer):
+            return None, None
+    elif not all(isinstance(c, numbers.Integral) for c in contents):
+        return None, None
+    try:
+        keys = np.unique(np.asarray(contents, dtype=np.int64))
+    except OverflowError:
+        return None, None
+    if len(keys) == 0 or keys[-1] - keys[0] + 1 == len(keys):
+        return None, (int(keys[0]) if len(keys) else 0, len(keys))
+    return keys, None
+
+
+def apply_catalog(catalog, topology):
+    """Apply a content catalog to a topology
+
+    Parameters
+    ----------
+    catalog : ContentCatalog
+        The catalog
+    topology : Topology
+        The topology
+    """
+    topology.graph['content_catalog'] = catalog
+    for v in catalog.sources:
+        topology.node[v]['stack'][1]['contents'] = catalog.contents(v)
 
 
 def apply_content_placement(placement, topology):
@@ -23,6 +320,7 @@ def apply_content_placement(placement, topology):
     topology : Topology
         The topology
     """
+    topology.graph.pop('content_catalog', None)
     for v, contents in placement.items():
         topology.node[v]['stack'][1]['contents'] = contents
 
@@ -30,8 +328,51 @@ def get_sources(topology):
     return [v for v in topology if 'stack' in topology.node[v]
                                 and topology.node[v]['stack'][0] == 'source']
 
+
+def _place_contents(topology, contents, sources, weights, seed, catalog):
+    """Place contents on sources according to their weights, in a catalog
+    if possible and in a set of contents per source otherwise"""
+    if catalog not in ('array', 'hash'):
+        raise ValueError('catalog must be either array or hash')
+    if catalog == 'hash':
+        apply_catalog(HashContentCatalog(sources, contents, weights, seed),
+                      topology)
+        return
+    if not isinstance(contents, (_range, np.ndarray)):
+        contents = list(contents)
+    keys, consecutive = _integer_contents(contents)
+    if keys is None and consecutive is None:
+        # Contents which are not integers are placed one by one
+        random.seed(seed)
+        pdf = {i: w / float(sum(weights)) for i, w in enumerate(weights)} \
+              if weights is not None else None
+        content_placement = collections.defaultdict(set)
+        for c in contents:
+            i = random_from_pdf(pdf) if pdf is not None \
+                else random.randrange(len(sources))
+            content_placement[sources[i]].add(c)
+        apply_content_placement(content_placement, topology)
+        return
+    n = len(keys) if keys is not None else consecutive[1]
+    dtype = _index_dtype(len(sources))
+    # Numpy generators only accept 32-bit integer seeds
+    rand = np.random.RandomState(None if seed is None
+                                 else key_to_int(seed) & 0xFFFFFFFF)
+    if weights is None:
+        index = rand.randint(len(sources), size=n, dtype=dtype)
+    else:
+        cumulative = np.cumsum(weights, dtype=float) / float(sum(weights))
+        index = np.searchsorted(cumulative[:-1], rand.random_sample(n),
+                                side='right').astype(dtype)
+    if keys is None:
+        catalog = ArrayContentCatalog(sources, index, first=consecutive[0])
+    else:
+        catalog = ArrayContentCatalog(sources, index, keys=keys)
+    apply_catalog(catalog, topology)
+
+
 @register_content_placement('UNIFORM')
-def uniform_content_placement(topology, contents, seed=None):
+def uniform_content_placement(topology, contents, seed=None, catalog='array'):
     """Places content objects to source nodes randomly following a uniform
     distribution.
 
@@ -41,29 +382,25 @@ def uniform_content_placement(topology, contents, seed=None):
         The topology object
    contents : iterable
         Iterable of content objects
-    source_nodes : list
-        List of nodes of the topology which are content sources
-
-    Returns
-    -------
-    cache_placement : dict
-        Dictionary mapping content objects to source nodes
+    seed : any hashable type, optional
+        The seed of the placement
+    catalog : str, optional
+        How integer contents are placed. If *array*, the source of each
+        content is drawn at random and stored in an array. If *hash*, it is
+        computed from a hash of the content and not stored
 
     Notes
     -----
     A deterministic placement of objects (e.g., for reproducing results) can be
     achieved by using a fix seed value
     """
-    random.seed(seed)
-    source_nodes = get_sources(topology)
-    content_placement = collections.defaultdict(set)
-    for c in contents:
-        content_placement[random.choice(source_nodes)].add(c)
-    apply_content_placement(content_placement, topology)
+    _place_contents(topology, contents, get_sources(topology), None, seed,
+                    catalog)
 
 
 @register_content_placement('WEIGHTED')
-def weighted_content_placement(topology, contents, source_weights, seed=None):
+def weighted_content_placement(topology, contents, source_weights, seed=None,
+                               catalog='array'):
     """Places content objects to source nodes randomly according to the weight
     of the source node.
 
@@ -76,21 +413,18 @@ def weighted_content_placement(topology, contents, source_weights, seed=None):
     source_weights : dict
         Dict mapping nodes nodes of the topology which are content sources and
         the weight according to which content placement decision is made.
-
-    Returns
-    -------
-    cache_placement : dict
-        Dictionary mapping content objects to source nodes
+    seed : any hashable type, optional
+        The seed of the placement
+    catalog : str, optional
+        How integer contents are placed. If *array*, the source of each
+        content is drawn at random and stored in an array. If *hash*, it is
+        computed from a hash of the content and not stored
 
     Notes
     -----
     A deterministic placement of objects (e.g., for reproducing results) can be
     achieved by using a fix seed value
     """
-    random.seed(seed)
-    norm_factor = float(sum(source_weights.values()))
-    source_pdf = dict((k, v / norm_factor) for k, v in source_weights.items())
-    content_placement = collections.defaultdict(set)
-    for c in contents:
-        content_placement[random_from_pdf(source_pdf)].add(c)
-    apply_content_placement(content_placement, topology)
+    sources = list(source_weights.keys())
+    _place_contents(topology, contents, sources,
+                    [source_weights[v] for v in sources], seed, catalog)
@@ -44,6 +44,33 @@ class TestRadomCachePlacement(unittest.TestCase):
         self.verify_random_assignment(self.topo, 100, 4)
 
 
+class TestScaleCachePlacement(unittest.TestCase):
+
+    def setUp(self):
+        self.topo = fnss.line_topology(6)
+        fnss.add_stack(self.topo, 0, 'receiver')
+        self.topo.graph['icr_candidates'] = list(range(1, 5))
+        for i in range(1, 5):
+            fnss.add_stack(self.topo, i, 'router', {'cache_size': 10})
+        fnss.add_stack(self.topo, 5, 'source')
+
+    def cache_size(self):
+        return [self.topo.node[i]['stack'][1]['cache_size'] for i in range(1, 5)]
+
+    def test_roles(self):
+        cacheplacement.scale_cache_placement(self.topo, roles={'edge': 4})
+        self.assertEqual([23, 6, 6, 6], self.cache_size())
+
+    def test_nodes(self):
+        cacheplacement.scale_cache_placement(self.topo, roles={'edge': 4},
+                                             nodes={1: 1, 4: 0})
+        self.assertEqual([13, 13, 13, 0], self.cache_size())
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, cacheplacement.scale_cache_placement,
+                          self.topo, {'edge': 0, 'core': 0})
+
+
 class TestOptimalHashroutingCachePlacement(unittest.TestCase):
 
     def setUp(self):
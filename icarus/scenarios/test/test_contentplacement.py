@@ -59,3 +59,123 @@ class TestWeighted(unittest.TestCase):
         c2 = t.node[2]['stack'][1]['contents'] if 'contents' in t.node[2]['stack'][1] else set()
         self.assertEqual(len(c1) + len(c2), 10)
 
+
+
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.topology = fnss.line_topology(4)
+        fnss.add_stack(self.topology, 0, 'router')
+        fnss.add_stack(self.topology, 1, 'source')
+        fnss.add_stack(self.topology, 2, 'source')
+        fnss.add_stack(self.topology, 3, 'receiver')
+
+    def assert_partition(self, contents):
+        catalog = self.topology.graph['content_catalog']
+        c1 = self.topology.node[1]['stack'][1]['contents']
+        c2 = self.topology.node[2]['stack'][1]['contents']
+        self.assertEqual(set(contents), set(c1) | set(c2))
+        self.assertEqual(len(contents), len(c1) + len(c2))
+        for c in contents:
+            self.assertIn(catalog.source(c), (1, 2))
+            self.assertIn(c, c1 if catalog.source(c) == 1 else c2)
+            self.assertNotIn(c, c2 if catalog.source(c) == 1 else c1)
+
+    def test_array_consecutive(self):
+        contentplacement.uniform_content_placement(self.topology, range(1, 101), seed=1)
+        catalog = self.topology.graph['content_catalog']
+        self.assertIsInstance(catalog, contentplacement.ArrayContentCatalog)
+        self.assertIsNone(catalog.keys)
+        self.assert_partition(range(1, 101))
+        self.assertIsNone(catalog.source(0))
+        self.assertIsNone(catalog.source(101))
+        self.assertIsNone(catalog.source('a'))
+        self.assertIsNone(catalog.source(1.5))
+        self.assertEqual(list(range(1, 101)),
+                         [k for keys in catalog.iter_keys() for k in keys])
+
+    def test_array_sparse(self):
+        contents = [5, 1000, 7, 3, 10 ** 9]
+        contentplacement.uniform_content_placement(self.topology, contents, seed=1)
+        catalog = self.topology.graph['content_catalog']
+        self.assertIsNotNone(catalog.keys)
+        self.assert_partition(contents)
+        self.assertIsNone(catalog.source(4))
+        self.assertIsNone(catalog.source(10 ** 10))
+
+    def test_array_seed(self):
+        placements = []
+        for _ in range(2):
+            contentplacement.uniform_content_placement(self.topology, range(50), seed=3)
+            catalog = self.topology.graph['content_catalog']
+            placements.append([catalog.source(c) for c in range(50)])
+        self.assertEqual(placements[0], placements[1])
+        for _ in range(2):
+            contentplacement.uniform_content_placement(self.topology, range(50), seed='abc')
+            catalog = self.topology.graph['content_catalog']
+            placements.append([catalog.source(c) for c in range(50)])
+        self.assertEqual(placements[2], placements[3])
+
+    def test_not_integers(self):
+        contents = ['a', 'b', 'c']
+        contentplacement.uniform_content_placement(self.topology, contents)
+        self.assertNotIn('content_catalog', self.topology.graph)
+        c1 = self.topology.node[1]['stack'][1].get('contents', set())
+        c2 = self.topology.node[2]['stack'][1].get('contents', set())
+        self.assertEqual(set(contents), c1 | c2)
+
+    def test_not_integer_numbers(self):
+        for contents in ([1.5, 2.7, 9.2], ['1', '2', '5']):
+            self.setUp()
+            contentplacement.uniform_content_placement(self.topology, contents)
+            self.assertNotIn('content_catalog', self.topology.graph)
+            c1 = self.topology.node[1]['stack'][1].get('contents', set())
+            c2 = self.topology.node[2]['stack'][1].get('contents', set())
+            self.assertEqual(set(contents), c1 | c2)
+
+    def test_not_integers_generator(self):
+        contents = ['a', 'b', 'c']
+        contentplacement.uniform_content_placement(self.topology,
+                                                   (c for c in contents))
+        c1 = self.topology.node[1]['stack'][1].get('contents', set())
+        c2 = self.topology.node[2]['stack'][1].get('contents', set())
+        self.assertEqual(set(contents), c1 | c2)
+
+    def test_weighted_not_integers(self):
+        contents = ['a', 'b', 'c']
+        contentplacement.weighted_content_placement(self.topology, contents,
+                                                    {1: 3, 2: 1}, seed=1)
+        c1 = self.topology.node[1]['stack'][1].get('contents', set())
+        c2 = self.topology.node[2]['stack'][1].get('contents', set())
+        self.assertEqual(set(contents), c1 | c2)
+        contentplacement.weighted_content_placement(self.topology, contents, {1: 3})
+        self.assertEqual(set(contents), self.topology.node[1]['stack'][1]['contents'])
+
+    def test_hash(self):
+        contentplacement.uniform_content_placement(self.topology, range(1, 201),
+                                                   catalog='hash')
+        catalog = self.topology.graph['content_catalog']
+        self.assertIsInstance(catalog, contentplacement.HashContentCatalog)
+        self.assert_partition(range(1, 201))
+        self.assertIsNone(catalog.source(201))
+        self.assertEqual(list(range(1, 201)),
+                         [k for keys in catalog.iter_keys() for k in keys])
+        self.assertGreater(len(self.topology.node[1]['stack'][1]['contents']), 60)
+        self.assertGreater(len(self.topology.node[2]['stack'][1]['contents']), 60)
+
+    def test_weighted_hash(self):
+        contentplacement.weighted_content_placement(self.topology, range(10000),
+                                                    {1: 0.8, 2: 0.2},
+                                                    catalog='hash')
+        self.assertAlmostEqual(0.8, len(self.topology.node[1]['stack'][1]['contents'])
+                               / 10000.0, delta=0.02)
+
+    def test_weighted_array(self):
+        contentplacement.weighted_content_placement(self.topology, range(10000),
+                                                    {1: 0.8, 2: 0.2}, seed=1)
+        self.assertAlmostEqual(0.8, len(self.topology.node[1]['stack'][1]['contents'])
+                               / 10000.0, delta=0.02)
+
+    def test_invalid_catalog(self):
+        self.assertRaises(ValueError, contentplacement.uniform_content_placement,
+                          self.topology, range(10), catalog='dict')
@@ -21,6 +21,19 @@ class TestPath(unittest.TestCase):
         self.assertEqual(1, len(t.receivers()))
 
 
+class TestNodeRole(unittest.TestCase):
+
+    def test_assigned_roles(self):
+        t = topology.topology_asymmetric_tree_coor_edge()
+        self.assertEqual('aggregation', topology.node_role(t, 4))
+        self.assertEqual('edge', topology.node_role(t, 8))
+
+    def test_default_roles(self):
+        t = topology.topology_path(5)
+        roles = {v: topology.node_role(t, v) for v in t.graph['icr_candidates']}
+        self.assertEqual({1: 'edge', 2: 'core', 3: 'core'}, roles)
+
+
 class TestRing(unittest.TestCase):
 
     def test_ring(self):
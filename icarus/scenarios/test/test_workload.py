@@ -1,5 +1,8 @@
 import unittest
 
+import networkx as nx
+import fnss
+
 import icarus.scenarios as workload
 
 
@@ -69,3 +72,83 @@ class TestYCBS(unittest.TestCase):
         self.assertTrue(ev_3['log'])
         self.assertIn(ev_3['item'], range(1, n_items + 1))
         self.assertEqual(ev_3['op'], "READ")
+
+
+class TestFailure(unittest.TestCase):
+
+    def setUp(self):
+        # Ring of routers, with a receiver attached to each router and a
+        # source attached to router 0
+        topology = workload.IcnTopology(fnss.ring_topology(6))
+        for v in range(6):
+            topology.add_edge(v, 'r%d' % v)
+            fnss.add_stack(topology, v, 'router')
+            fnss.add_stack(topology, 'r%d' % v, 'receiver')
+        topology.add_edge(0, 's')
+        fnss.add_stack(topology, 's', 'source')
+        self.topology = topology
+
+    def test_link_failures(self):
+        events = list(workload.FailureWorkload(
+                    self.topology, {'name': 'STATIONARY', 'n_contents': 10,
+                                    'alpha': 0.8, 'n_warmup': 50, 'n_measured': 200},
+                    failure_rate=0.5, repair_time=2, seed=1))
+        changes = [e for _, e in events if 'changes' in e]
+        requests = [e for _, e in events if 'changes' not in e]
+        self.assertEqual(250, len(requests))
+        self.assertGreater(len(changes), 0)
+        times = [t for t, _ in events]
+        self.assertEqual(sorted(times), times)
+        failed = set()
+        for event in changes:
+            for change in event['changes']:
+                self.assertIn(change[0], ('remove_link', 'restore_link'))
+                link = frozenset(change[1:])
+                if change[0] == 'remove_link':
+                    self.assertNotIn(link, failed)
+                    failed.add(link)
+                else:
+                    failed.remove(link)
+
+    def test_node_failures_keep_connectivity(self):
+        wl = workload.FailureWorkload(
+                    self.topology, {'name': 'STATIONARY', 'n_contents': 10,
+                                    'alpha': 0.8, 'n_warmup': 0, 'n_measured': 300},
+                    failure_rate=1, repair_time=5, target='node', seed=1)
+        self.assertEqual(10, wl.n_contents)
+        graph = self.topology.copy()
+        for _, event in wl:
+            for change in event.get('changes', ()):
+                if change[0] == 'remove_node':
+                    self.assertEqual('router',
+                                     self.topology.node[change[1]]['stack'][0])
+                    graph.remove_node(change[1])
+                else:
+                    graph.add_edges_from((change[1], v)
+                                         for v in self.topology.edge[change[1]]
+                                         if v in graph)
+                self.assertTrue(nx.is_connected(graph))
+
+    def test_restore_adjacent_failed_nodes(self):
+        wl = workload.FailureWorkload(
+                    self.topology, {'name': 'STATIONARY', 'n_contents': 10,
+                                    'alpha': 0.8, 'n_measured': 10},
+                    failure_rate=1, repair_time=5, target='node')
+        graph = nx.Graph(self.topology)
+        # Node 1 fails, then its neighbor 2 fails
+        links = {1: list(graph.neighbors(1))}
+        graph.remove_node(1)
+        links[2] = list(graph.neighbors(2))
+        graph.remove_node(2)
+        # Repairing 1 restores link 1-2 only when 2 is repaired too
+        wl._restore(graph, 1, links)
+        self.assertFalse(graph.has_edge(1, 2))
+        wl._restore(graph, 2, links)
+        self.assertEqual(set(frozenset(e) for e in self.topology.edges()),
+                         set(frozenset(e) for e in graph.edges()))
+        self.assertEqual({}, links)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, workload.FailureWorkload, self.topology,
+                          {'name': 'STATIONARY', 'n_contents': 10, 'alpha': 0.8},
+                          failure_rate=1, repair_time=5, target='switch')
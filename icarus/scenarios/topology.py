@@ -25,6 +25,7 @@ from icarus.registry import register_topology_factory
 
 __all__ = [
         'IcnTopology',
+        'node_role',
         'topology_random',
         'topology_random2',
         'topology_random3',
@@ -112,6 +113,34 @@ class IcnTopology(fnss.Topology):
                    if 'stack' in self.node[v]
                    and self.node[v]['stack'][0] == 'receiver')
 
+def node_role(topology, v):
+    """Return the role of a node in a topology, e.g. *edge* or *core*.
+
+    The role is the *role* attribute of the node, if the topology factory
+    assigned it. Otherwise, a node is an *edge* node if it is attached to a
+    receiver and a *core* node if it is not.
+
+    Parameters
+    ----------
+    topology : Topology
+        The topology object
+    v : any hashable type
+        The node
+
+    Returns
+    -------
+    role : str
+        The role of the node
+    """
+    if 'role' in topology.node[v]:
+        return topology.node[v]['role']
+    for u in topology.neighbors(v):
+        if 'stack' in topology.node[u] and \
+                topology.node[u]['stack'][0] == 'receiver':
+            return 'edge'
+    return 'core'
+
+
 @register_topology_factory('TREE')
 def topology_tree(k, h, delay=1, **kwargs):
     """Returns a tree topology, with a source at the root, receivers at the
@@ -1160,6 +1189,7 @@ def topology_sinet_edge(delay=1, **kwargs):
         fnss.add_stack(topology, v, 'receiver')
     for v in routers:
         fnss.add_stack(topology, v, 'router')
+        topology.node[v]['role'] = 'core' if v <= 8 else 'edge'
     # set weights and delays on all links
     fnss.set_weights_constant(topology, 1.0)
     fnss.set_delays_constant(topology, delay, 'ms')
@@ -1316,6 +1346,7 @@ def topology_asymmetric_tree_edge(delay=1, **kwargs):
         fnss.add_stack(topology, v, 'receiver')
     for v in routers:
         fnss.add_stack(topology, v, 'router')
+        topology.node[v]['role'] = 'edge'
     for v in gateways:
         fnss.add_stack(topology, v, 'gateway')
     # set weights and delays on all links
@@ -1396,6 +1427,7 @@ def topology_asymmetric_tree_coor_edge(delay=1, **kwargs):
         fnss.add_stack(topology, v, 'receiver')
     for v in routers:
         fnss.add_stack(topology, v, 'router')
+        topology.node[v]['role'] = 'aggregation' if v < 8 else 'edge'
     for v in gateways:
         fnss.add_stack(topology, v, 'gateway')
     # set weights and delays on all links
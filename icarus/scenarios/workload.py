@@ -19,17 +19,19 @@ all content identifiers. This is needed for content placement.
 """
 import random
 import csv
+import heapq
 
 import networkx as nx
 
 from icarus.tools import TruncatedZipfDist
-from icarus.registry import register_workload
+from icarus.registry import register_workload, WORKLOAD
 
 __all__ = [
         'StationaryWorkload',
         'GlobetraffWorkload',
         'TraceDrivenWorkload',
-        'YCSBWorkload'
+        'YCSBWorkload',
+        'FailureWorkload',
            ]
 
 
@@ -119,7 +121,6 @@ class StationaryWorkload(object):
             event = {'receiver': receiver, 'content': content, 'log': log}
             yield (t_event, event)
             req_counter += 1
-        raise StopIteration()
 
 
 @register_workload('GLOBETRAFF')
@@ -155,6 +156,11 @@ class GlobetraffWorkload(object):
         Iterator of events. Each event is a 2-tuple where the first element is
         the timestamp at which the event occurs and the second element is a
         dictionary of event attributes.
+
+    Notes
+    -----
+    The size of each content object, read from the contents file, is stored
+    in the *content_size* attribute.
     """
 
     def __init__(self, topology, reqs_file, contents_file, beta=0, **kwargs):
@@ -165,9 +171,13 @@ class GlobetraffWorkload(object):
                      if 'stack' in topology.node[v]
                      and topology.node[v]['stack'][0] == 'receiver']
         self.n_contents = 0
+        # Size (in bytes) of each content object
+        self.content_size = {}
         with open(contents_file, 'r') as f:
             reader = csv.reader(f, delimiter='\t')
             for content, popularity, size, app_type in reader:
+                content = int(content)
+                self.content_size[content] = int(size)
                 self.n_contents = max(self.n_contents, content)
         self.n_contents += 1
         self.contents = range(self.n_contents)
@@ -188,9 +198,8 @@ class GlobetraffWorkload(object):
                     receiver = random.choice(self.receivers)
                 else:
                     receiver = self.receivers[self.receiver_dist.rv() - 1]
-                event = {'receiver': receiver, 'content': content, 'size': size}
-                yield (timestamp, event)
-        raise StopIteration()
+                event = {'receiver': receiver, 'content': int(content), 'log': True}
+                yield (float(timestamp), event)
 
 
 @register_workload('TRACE_DRIVEN')
@@ -286,7 +295,7 @@ class TraceDrivenWorkload(object):
                 yield (t_event, event)
                 req_counter += 1
                 if(req_counter >= self.n_warmup + self.n_measured):
-                    raise StopIteration()
+                    return
             raise ValueError("Trace did not contain enough requests")
 
 
@@ -359,4 +368,147 @@ class YCSBWorkload(object):
             event = {'op': op, 'item': item, 'log': log}
             yield event
             req_counter += 1
-        raise StopIteration()
+
+
+@register_workload('FAILURE')
+class FailureWorkload(object):
+    """Workload interleaving the requests of another workload with failures
+    and repairs of links or nodes of the topology.
+
+    Failures occur as a Poisson process and each failed link or node is
+    repaired after an exponentially distributed time. Only links between
+    routers, or routers, fail and only if the topology remains connected
+    after their failure, so that all requests can still be served.
+
+    Failure and repair events are dictionaries with a single *changes*
+    attribute, i.e. the list of topology changes to apply, which is passed
+    to `NetworkController.update_topology`. All failures and repairs
+    occurring between two consecutive requests are applied in a single
+    event, so that shortest paths are repaired only once for all of them.
+
+    Parameters
+    ----------
+    topology : fnss.Topology
+        The topology to which the workload refers
+    workload : dict
+        The workload whose requests are issued. It is a dictionary with the
+        name of the workload and its arguments
+    failure_rate : float
+        The mean rate of failures per second
+    repair_time : float
+        The mean time to repair a failed link or node, in seconds
+    target : str, optional
+        The elements failing, either *link* or *node*
+    seed : any hashable type, optional
+        The seed of the random number generator of failures, which is
+        independent of that of requests
+
+    Returns
+    -------
+    events : iterator
+        Iterator of events. Each event is a 2-tuple where the first element is
+        the timestamp at which the event occurs and the second element is a
+        dictionary of event attributes.
+    """
+    def __init__(self, topology, workload, failure_rate, repair_time,
+                 target='link', seed=None, **kwargs):
+        if failure_rate <= 0 or repair_time <= 0:
+            raise ValueError('failure_rate and repair_time must be positive')
+        if target not in ('link', 'node'):
+            raise ValueError('target must be either link or node')
+        workload = dict(workload)
+        workload_name = workload.pop('name')
+        if workload_name not in WORKLOAD:
+            raise ValueError('No workload named %s' % str(workload_name))
+        self.workload = WORKLOAD[workload_name](topology, **workload)
+        self.topology = topology
+        self.failure_rate = failure_rate
+        self.repair_time = repair_time
+        self.target = target
+        self.seed = seed
+        routers = set(v for v in topology.nodes_iter()
+                      if topology.node[v]['stack'][0] == 'router')
+        if target == 'node':
+            self.candidates = sorted(routers, key=str)
+        else:
+            self.candidates = sorted((tuple(e) for e in topology.edges_iter()
+                                      if e[0] in routers and e[1] in routers),
+                                     key=str)
+        # Attributes of the requests workload needed for content placement
+        for attr in ('contents', 'n_contents', 'content_size'):
+            if hasattr(self.workload, attr):
+                setattr(self, attr, getattr(self.workload, attr))
+
+    def _fail(self, graph, rand):
+        """Remove a random link or node from a working copy of the topology
+        whose removal keeps it connected and return it, or return *None* if
+        there is none"""
+        candidates = [c for c in self.candidates
+                      if (graph.has_edge(*c) if self.target == 'link'
+                          else c in graph)]
+        rand.shuffle(candidates)
+        for c in candidates:
+            trial = graph.copy()
+            if self.target == 'link':
+                trial.remove_edge(*c)
+            else:
+                trial.remove_node(c)
+            if nx.is_connected(trial):
+                return c, trial
+        return None, graph
+
+    def _restore(self, graph, c, links):
+        """Restore a repaired link or node in a working copy of the topology.
+
+        The links of a node are restored only towards the nodes which are not
+        failed. The links towards failed nodes are instead recorded among the
+        links of those nodes, so that they are restored when those nodes are
+        repaired, as `NetworkController.restore_node` does.
+        """
+        if self.target == 'link':
+            graph.add_edge(*c)
+            return
+        graph.add_node(c)
+        for u in links.pop(c):
+            if u in graph:
+                graph.add_edge(c, u)
+            else:
+                links[u].append(c)
+
+    def __iter__(self):
+        rand = random.Random(self.seed)
+        graph = nx.Graph(self.topology)
+        # Failed links or nodes by time of repair, and the links of failed
+        # nodes, needed to restore them in the working copy
+        repairs = []
+        links = {}
+        remove, restore = ('remove_link', 'restore_link') \
+                          if self.target == 'link' \
+                          else ('remove_node', 'restore_node')
+        t_failure = rand.expovariate(self.failure_rate)
+        for t_event, event in self.workload:
+            changes = []
+            t_change = None
+            while True:
+                if repairs and repairs[0][0] <= min(t_event, t_failure):
+                    t_change, c = heapq.heappop(repairs)
+                    self._restore(graph, c, links)
+                    changes.append((restore,) + (c if self.target == 'link'
+                                                 else (c,)))
+                elif t_failure <= t_event:
+                    t_change = t_failure
+                    c, trial = self._fail(graph, rand)
+                    if c is not None:
+                        if self.target == 'node':
+                            links[c] = list(graph.neighbors(c))
+                        graph = trial
+                        heapq.heappush(repairs, (t_failure + rand.expovariate(
+                                                 1.0 / self.repair_time), c))
+                        changes.append((remove,) + (c if self.target == 'link'
+                                                    else (c,)))
+                    t_failure += rand.expovariate(self.failure_rate)
+                else:
+                    break
+            if changes:
+                yield (t_change, {'changes': changes})
+            yield (t_event, event)
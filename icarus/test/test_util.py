@@ -1,5 +1,6 @@
 import unittest
 
+import numpy as np
 import networkx as nx
 import fnss
 
@@ -48,3 +49,43 @@ class TestUtil(unittest.TestCase):
     def test_apportionment(self):
         self.assertEqual(util.apportionment(10, [0.53, 0.47]), [5, 5])
         self.assertEqual(util.apportionment(100, [0.4, 0.21, 0.39]), [40, 21, 39])
+
+    def test_topology_hash(self):
+        topo = fnss.Topology()
+        topo.add_path([1, 2, 3])
+        other = fnss.Topology()
+        other.add_edge(3, 2)
+        other.add_edge(2, 1)
+        self.assertEqual(util.topology_hash(topo), util.topology_hash(other))
+        other.add_edge(1, 3)
+        self.assertNotEqual(util.topology_hash(topo), util.topology_hash(other))
+
+    def test_cached_betweenness_centrality(self):
+        topo = fnss.Topology()
+        topo.add_path([1, 2, 3, 4])
+        betw = util.cached_betweenness_centrality(topo)
+        self.assertEqual(nx.betweenness_centrality(topo), betw)
+        betw[2] = 0
+        self.assertNotEqual(0, util.cached_betweenness_centrality(topo)[2])
+        ego = util.cached_betweenness_centrality(topo, ego=True)
+        self.assertEqual({1: 0, 2: 1, 3: 1, 4: 0}, ego)
+        self.assertEqual(nx.betweenness_centrality(topo),
+                         util.cached_betweenness_centrality(topo, k=4, seed=1))
+        approx = util.cached_betweenness_centrality(topo, k=2, seed=1)
+        self.assertEqual(approx,
+                         util.cached_betweenness_centrality(topo, k=2, seed=1))
+
+
+class TestHashing(unittest.TestCase):
+
+    def test_mix64_many(self):
+        keys = [0, 1, 2, 12345, -1, 2 ** 63, 'a', (1, 2)]
+        expected = [util.mix64(util.key_to_int(k)) for k in keys]
+        self.assertEqual(expected, [int(h) for h in
+                                    util.mix64_many(util.keys_to_array(keys))])
+
+    def test_integer_keys(self):
+        self.assertEqual(5, util.key_to_int(5))
+        self.assertEqual(5, util.key_to_int(np.int32(5)))
+        self.assertEqual(util.key_to_int('5'), util.key_to_int('5'))
+        self.assertNotEqual(util.key_to_int(5), util.key_to_int('5'))
@@ -5,7 +5,10 @@ import time
 import logging
 import collections
 import copy
+import hashlib
 import heapq
+import binascii
+import numbers
 
 import numpy as np
 import networkx as nx
@@ -22,9 +25,15 @@ __all__ = [
         'Tree',
         'can_import',
         'overlay_betweenness_centrality',
+        'topology_hash',
+        'cached_betweenness_centrality',
         'path_links',
         'multicast_tree',
-        'apportionment'
+        'apportionment',
+        'key_to_int',
+        'keys_to_array',
+        'mix64',
+        'mix64_many',
            ]
 
 class Tree(collections.defaultdict):
@@ -675,6 +684,78 @@ def overlay_betwenness_centrality(topology, origins=None, destinations=None,
     return betweenness
 
 
+def topology_hash(topology):
+    """Return a digest of the nodes and links of a topology, which does not
+    depend on the order in which they were added or on the hash seed of the
+    interpreter.
+
+    Parameters
+    ----------
+    topology : fnss.Topology
+        The topology
+
+    Returns
+    -------
+    digest : str
+        The hexadecimal digest
+    """
+    nodes = sorted(repr(v) for v in topology.nodes())
+    links = sorted(tuple(sorted((repr(u), repr(v))))
+                   if not topology.is_directed() else (repr(u), repr(v))
+                   for u, v in topology.edges())
+    return hashlib.sha1(repr((topology.is_directed(), nodes, links))
+                        .encode('utf-8')).hexdigest()
+
+
+# Betweenness centralities already calculated, keyed by topology digest and
+# calculation arguments
+_BETWEENNESS_CACHE = {}
+
+
+def cached_betweenness_centrality(topology, ego=False, k=None, seed=None):
+    """Calculate the betweenness centrality of the nodes of a topology,
+    reusing the result of a previous calculation on a topology with the same
+    nodes and links.
+
+    Results are kept for the lifetime of the process, so that experiments
+    run on the same topology calculate centralities only once.
+
+    Parameters
+    ----------
+    topology : fnss.Topology
+        The topology
+    ego : bool, optional
+        If *True*, the centrality of each node is its betweenness centrality
+        in its ego network, i.e. the subgraph of the node and its neighbors
+    k : int, optional
+        If specified, centralities are approximated from the shortest paths
+        originating from *k* nodes sampled at random, which is considerably
+        faster on large topologies. Ignored if *ego* is *True*
+    seed : int, optional
+        The seed of the sampling of nodes
+
+    Returns
+    -------
+    betw : dict
+        Dictionary of betweenness centralities keyed by node
+    """
+    if ego or (k is not None and k >= topology.number_of_nodes()):
+        k = None
+    if k is None:
+        seed = None
+    key = (topology_hash(topology), ego, k, seed)
+    if key not in _BETWEENNESS_CACHE:
+        if ego:
+            betw = dict((v, nx.betweenness_centrality(nx.ego_graph(topology, v))[v])
+                        for v in topology.nodes())
+        elif k is not None:
+            betw = nx.betweenness_centrality(topology, k=k, seed=seed)
+        else:
+            betw = nx.betweenness_centrality(topology)
+        _BETWEENNESS_CACHE[key] = betw
+    return dict(_BETWEENNESS_CACHE[key])
+
+
 def path_links(path):
     """Convert a path expressed as list of nodes into a path expressed as a
     list of edges.
@@ -735,11 +816,101 @@ def apportionment(n, fracs):
         Apportionment of items to buckets
     """
     ints, remainders = zip(*[divmod(n * f, 1) for f in fracs])
-    to_alloc = n - sum(ints)
-    ints = list(ints)
+    ints = [int(i) for i in ints]
+    to_alloc = int(round(n - sum(ints)))
     if to_alloc == 0:
         return ints
     idx = heapq.nlargest(to_alloc, range(len(remainders)), remainders.__getitem__)
     for i in idx:
         ints[i] += 1
     return ints
+
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+_GOLDEN = 0x9E3779B97F4A7C15
+_MUL1 = 0xBF58476D1CE4E5B9
+_MUL2 = 0x94D049BB133111EB
+
+
+def key_to_int(key):
+    """Return an unsigned 64-bit integer identifying a key.
+
+    Integer keys, e.g. content identifiers, are used as they are. Other keys
+    are mapped to a CRC32 checksum of their string representation, so that
+    the integer does not depend on the hash seed of the interpreter. Together
+    with *mix64*, this is the stable hash used wherever hashes of keys must
+    be reproducible.
+
+    Parameters
+    ----------
+    key : any hashable type
+        The key
+
+    Returns
+    -------
+    x : int
+        The integer
+    """
+    if isinstance(key, numbers.Integral):
+        return int(key) & _MASK64
+    return binascii.crc32(str(key).encode('utf-8')) & 0xFFFFFFFF
+
+
+def keys_to_array(keys):
+    """Return an array of unsigned 64-bit integers identifying keys.
+
+    Parameters
+    ----------
+    keys : iterable
+        The keys
+
+    Returns
+    -------
+    x : numpy.ndarray
+        The array of integers
+    """
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in 'iu':
+        return keys.astype(np.uint64)
+    return np.fromiter((key_to_int(k) for k in keys), dtype=np.uint64)
+
+
+def mix64(x):
+    """Return the splitmix64 hash of an unsigned 64-bit integer.
+
+    The splitmix64 finalizer maps integers to well mixed 64-bit integers.
+    *mix64_many* is its vectorized version, returning identical values.
+
+    Parameters
+    ----------
+    x : int
+        The integer
+
+    Returns
+    -------
+    h : int
+        The hash
+    """
+    z = (x + _GOLDEN) & _MASK64
+    z = ((z ^ (z >> 30)) * _MUL1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MUL2) & _MASK64
+    return z ^ (z >> 31)
+
+
+def mix64_many(x):
+    """Return the splitmix64 hashes of an array of unsigned 64-bit integers.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        The array of integers
+
+    Returns
+    -------
+    h : numpy.ndarray
+        The array of hashes
+    """
+    with np.errstate(over='ignore'):
+        z = np.asarray(x, dtype=np.uint64) + np.uint64(_GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MUL1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MUL2)
+        return z ^ (z >> np.uint64(31))